@@ -2,9 +2,11 @@
 """
 
 from __future__ import annotations
-from typing import List, Tuple, Dict
+from collections.abc import Sequence
+from typing import List, Tuple, Dict, Union, Set, Iterable
+from heapq import heappush, heappop
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from gitaudit.git.change_log_entry import ChangeLogEntry
 
@@ -16,6 +18,12 @@ class BucketEntry(BaseModel):
     branch_commits: List[ChangeLogEntry]
     children: List[BucketEntry] = Field(default_factory=list)
 
+    # pruned (tombstoned) branch commit and children merge shas that are not yet
+    # removed from branch_commits and children (see mark_pruned and compact)
+    _pruned_shas: Set[str] = PrivateAttr(default_factory=set)
+    _member_shas: Set[str] = PrivateAttr(default=None)
+    _remaining_count: int = PrivateAttr(default=None)
+
     @property
     def merge_sha(self):
         """The sha that was used for merging this bucket
@@ -46,19 +54,83 @@ class BucketEntry(BaseModel):
             bool: Indicator whether or not the bucket entry is now empty and pruning can
                 be collapsed upwards the bucket entry tree
         """
-        self.branch_commits = list(filter(
-            lambda x: x.sha != sha,
-            self.branch_commits,
-        ))
-        self.children = list(filter(
-            lambda x: x.merge_sha != sha,
-            self.children,
-        ))
+        return self.prune_shas({sha})
+
+    def prune_shas(self, shas: Set[str]) -> bool:
+        """Prune multiple commits from the bucket entry in one pass
+
+        Args:
+            shas (Set[str]): The shas of the commits to be pruned
+
+        Returns:
+            bool: Indicator whether or not the bucket entry is now empty and pruning can
+                be collapsed upwards the bucket entry tree
+        """
+        is_empty = self.mark_pruned(shas)
+        self.compact()
+        return is_empty
+
+    def mark_pruned(self, shas: Iterable[str]) -> bool:
+        """Marks commits of the bucket entry as pruned without removing them from
+        branch_commits and children yet (see compact). The number of remaining commits is
+        tracked, so that marking is independent of the bucket size.
+
+        Args:
+            shas (Iterable[str]): The shas of the commits to be pruned
+
+        Returns:
+            bool: Indicator whether or not the bucket entry is now empty and pruning can
+                be collapsed upwards the bucket entry tree
+        """
+        if self._member_shas is None:
+            self._member_shas = set(self.branch_shas).union(self.children_shas)
+            self._remaining_count = len(self._member_shas)
+
+        merge_pruned = False
+
+        for sha in shas:
+            if sha == self.merge_sha:
+                merge_pruned = True
+            elif sha in self._member_shas and sha not in self._pruned_shas:
+                self._pruned_shas.add(sha)
+                self._remaining_count -= 1
+
+        return merge_pruned or self._remaining_count == 0
+
+    @property
+    def has_pruned_shas(self) -> bool:
+        """Whether marked commits still need to be removed (see compact)
+        """
+        return bool(self._pruned_shas)
+
+    def compact(self):
+        """Removes the commits marked as pruned from branch_commits and children
+        """
+        if not self._pruned_shas:
+            return
 
-        if self.merge_sha == sha:
-            return True
+        self.branch_commits = [
+            x for x in self.branch_commits if x.sha not in self._pruned_shas]
+        self.children = [
+            x for x in self.children if x.merge_sha not in self._pruned_shas]
 
-        return not self.branch_commits and not self.children
+        self._member_shas -= self._pruned_shas
+        self._pruned_shas = set()
+
+    def copy_bucket_structure(self) -> BucketEntry:
+        """Copies the bucket hierarchy without copying the change log entries, e.g. for
+        pruning a bucket in multiple bucket lists independently
+
+        Returns:
+            BucketEntry: the copied bucket entry
+        """
+        self.compact()
+
+        return BucketEntry.construct(
+            merge_commit=self.merge_commit,
+            branch_commits=list(self.branch_commits),
+            children=[x.copy_bucket_structure() for x in self.children],
+        )
 
     @classmethod
     def from_change_log_entry(
@@ -187,19 +259,186 @@ def get_merge_sha_parent_bucket_map(buckets: List[BucketEntry]):
     return parent_map
 
 
-class BucketList:
-    """Stores a list of bucket entries in its hierarchy
+def numstat_to_sha1(entry: ChangeLogEntry, with_additions_deletions=True):
+    """Returns the sha1 hash of the numstat file changes (cached on the entry)
+
+    Args:
+        entry (ChangeLogEntry): Change Log Entry
+        with_additions_deletions (bool, optional): Whether additions and deletions shall be
+            accounted for. Defaults to True.
+
+    Returns:
+        str: sha1 hash
+    """
+    return entry.get_numstat_sha1(with_additions_deletions)
+
+
+class BucketList(Sequence):  # pylint: disable=too-many-instance-attributes
+    """Stores a list of bucket entries in its hierarchy.
+
+    Next to the bucket hierarchy the bucket list owns the indexes used by the matchers
+    (sha -> entry, sha -> bucket, cherry picked entries, and numstat sha1s). They are
+    created once and updated incrementally when shas are pruned.
+
+    The bucket list is a sequence of its (unpruned) top level bucket entries, so that
+    matchers written for a list of bucket entries keep working.
     """
 
     def __init__(self, hier_log) -> None:
-        self.entries = BucketEntry.list_from_change_log_list(hier_log)
-        self.bucket_map, self.entry_map = get_sha_to_bucket_entry_map(
-            self.entries)
-        self.linear_buckets = get_linear_bucket_list(self.entries)
+        self.top_bucket_map = {}
+        self.uncompacted_buckets = {}
+        self.bucket_map = {}
+        self.entry_map = {}
+        self.linear_buckets = []
+        self.merge_sha_parent_bucket_map = {}
+        self.merge_sha_bucket_map = {}
+        self.merge_commit_shas = set()
+        self.bucket_depth_map = {}
+        self.cherry_pick_entry_map = {}
+        self.numstat_sha1_maps = {}
+        self.numstat_index_maps = {}
+
+        self._set_entries(BucketEntry.list_from_change_log_list(hier_log))
+
+    @classmethod
+    def from_bucket_entries(cls, entries: List[BucketEntry]) -> BucketList:
+        """Creates a bucket list out of already created bucket entries
+
+        Args:
+            entries (List[BucketEntry]): List of bucket entries ordered in hierarchy
+
+        Returns:
+            BucketList: bucket list
+        """
+        bucket_list = cls([])
+        bucket_list._set_entries(entries)  # pylint: disable=protected-access
+        return bucket_list
+
+    def _set_entries(self, entries):
+        self.top_bucket_map = {x.merge_sha: x for x in entries}
+        # buckets with commits marked as pruned (compacted when the entries are read)
+        self.uncompacted_buckets = {}
+        self.bucket_map, self.entry_map = get_sha_to_bucket_entry_map(entries)
+        self.linear_buckets = get_linear_bucket_list(entries)
         self.merge_sha_parent_bucket_map = get_merge_sha_parent_bucket_map(
-            self.entries)
-        self.merge_commit_shas = list(
-            map(lambda x: x.merge_sha, self.linear_buckets))
+            entries)
+        self.merge_sha_bucket_map = {x.merge_sha: x for x in self.linear_buckets}
+        self.merge_commit_shas = set(self.merge_sha_bucket_map)
+
+        # depth of buckets in the hierarchy (parents are listed before their children)
+        self.bucket_depth_map = {}
+        for bucket in self.linear_buckets:
+            parent_bucket = self.merge_sha_parent_bucket_map.get(bucket.merge_sha, None)
+            self.bucket_depth_map[bucket.merge_sha] = \
+                self.bucket_depth_map[parent_bucket.merge_sha] + 1 if parent_bucket else 0
+
+        self.update_entry_indexes()
+
+    def update_entry_indexes(self):
+        """Recreates the indexes that depend on commit data (cherry pick and numstat
+        indexes), e.g. after the entries were hydrated with additional commit data
+        """
+        self.cherry_pick_entry_map = {
+            sha: entry for sha, entry in self.entry_map.items() if entry.cherry_pick_sha
+        }
+        self.numstat_sha1_maps = {}
+        self.numstat_index_maps = {}
+
+    def __len__(self):
+        return len(self.top_bucket_map)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        return self.entries[index]
+
+    @property
+    def entries(self) -> List[BucketEntry]:
+        """Top level bucket entries that are not pruned (yet)
+
+        Returns:
+            List[BucketEntry]: List of bucket entries ordered in hierarchy
+        """
+        self.compact()
+        return list(self.top_bucket_map.values())
+
+    def build_indexes(self):
+        """Compacts the bucket entries and builds all lazily created indexes, e.g. before
+        the bucket list is read by multiple threads
+        """
+        self.compact()
+        self.get_numstat_map(True)
+        self.get_numstat_map(False)
+
+    def compact(self):
+        """Removes the commits marked as pruned from the bucket entries (see
+        BucketEntry.compact). Pruning only marks commits, the bucket entries are
+        compacted once before they are read.
+        """
+        for bucket in self.uncompacted_buckets.values():
+            bucket.compact()
+
+        self.uncompacted_buckets = {}
+
+    def get_numstat_map(self, with_additions_deletions: bool = True) \
+            -> Dict[str, ChangeLogEntry]:
+        """Returns a numstat sha1 to change log entry map of all unpruned entries. Numstat
+        sha1s that belong to multiple entries are not part of the map. The numstat sha1s
+        are calculated once and the underlying index is updated when shas are pruned.
+
+        Args:
+            with_additions_deletions (bool, optional): Whether additions / deletions shall
+                be accounted for. Defaults to True.
+
+        Returns:
+            Dict[str, ChangeLogEntry]: Numstat sha1 to ChangeLogEntry map
+        """
+        if with_additions_deletions not in self.numstat_index_maps:
+            sha1_map = {}
+            index_map = {}
+
+            for sha, entry in self.entry_map.items():
+                if not entry.numstat:
+                    continue
+
+                stat_sha1 = numstat_to_sha1(entry, with_additions_deletions)
+                sha1_map[sha] = stat_sha1
+                index_map.setdefault(stat_sha1, {})[sha] = entry
+
+            self.numstat_sha1_maps[with_additions_deletions] = sha1_map
+            self.numstat_index_maps[with_additions_deletions] = index_map
+
+        return {
+            stat_sha1: next(iter(entries.values()))
+            for stat_sha1, entries in self.numstat_index_maps[with_additions_deletions].items()
+            if len(entries) == 1
+        }
+
+    def _remove_sha_from_indexes(self, sha):
+        self.bucket_map.pop(sha, None)
+        self.entry_map.pop(sha, None)
+        self.cherry_pick_entry_map.pop(sha, None)
+
+        for key, sha1_map in self.numstat_sha1_maps.items():
+            if sha not in sha1_map:
+                continue
+
+            stat_sha1 = sha1_map.pop(sha)
+            index_map = self.numstat_index_maps[key]
+            index_map[stat_sha1].pop(sha)
+
+            if not index_map[stat_sha1]:
+                index_map.pop(stat_sha1)
+
+    def _remove_bucket_from_indexes(self, bucket):
+        self._remove_sha_from_indexes(bucket.merge_sha)
+
+        for branch_commit in bucket.branch_commits:
+            self._remove_sha_from_indexes(branch_commit.sha)
+
+        for child in bucket.children:
+            self._remove_bucket_from_indexes(child)
 
     def prune_sha(self, sha):
         """Pune a sha from the bucket list
@@ -207,44 +446,63 @@ class BucketList:
         Args:
             sha (str): Sha of the commit to be pruned
         """
-        bucket = self.bucket_map.get(sha, None)
+        self.prune_many([sha])
 
-        if not bucket:
-            return
+    def prune_many(self, shas: Iterable[str]):
+        """Prunes multiple shas from the bucket list. The shas are grouped by their
+        buckets and every affected bucket is pruned only once (deepest buckets first so
+        that collapsing buckets are pruned from their parents in the same pass). Shas that
+        are unknown or already pruned are ignored. The pruned commits are only marked
+        within their bucket entries, so the effort is independent of the bucket sizes
+        (see compact).
 
-        collapse = bucket.prune_sha(sha)
+        Args:
+            shas (Iterable[str]): Shas of the commits to be pruned
+        """
+        pending_map = {}
+        queue = []
 
-        if collapse:
-            self._prune_upwards_from_bucket(bucket)
+        for sha in shas:
+            bucket = self.bucket_map.get(sha, None)
 
-    def _prune_upwards_from_bucket(self, bucket):
-        parent_bucket = self.merge_sha_parent_bucket_map.get(
-            bucket.merge_sha, None)
+            if not bucket:
+                continue
 
-        if parent_bucket:
-            collapse = parent_bucket.prune_sha(bucket.merge_sha)
-            if collapse:
-                self._prune_upwards_from_bucket(parent_bucket)
-        else:
-            self.entries = list(
-                filter(lambda x: x.merge_sha != bucket.merge_sha, self.entries))
+            self._remove_sha_from_indexes(sha)
+            self._add_pending_sha(pending_map, queue, bucket, sha)
+
+        while queue:
+            _, merge_sha = heappop(queue)
+            bucket = self.merge_sha_bucket_map[merge_sha]
+
+            if not bucket.mark_pruned(pending_map.pop(merge_sha)):
+                self.uncompacted_buckets[merge_sha] = bucket
+                continue
+
+            self._remove_bucket_from_indexes(bucket)
+            parent_bucket = self.merge_sha_parent_bucket_map.get(merge_sha, None)
+
+            if parent_bucket:
+                self._add_pending_sha(pending_map, queue, parent_bucket, merge_sha)
+            else:
+                self.top_bucket_map.pop(merge_sha, None)
+
+    def _add_pending_sha(self, pending_map, queue, bucket, sha):
+        if bucket.merge_sha not in pending_map:
+            pending_map[bucket.merge_sha] = set()
+            heappush(
+                queue, (-self.bucket_depth_map[bucket.merge_sha], bucket.merge_sha))
+
+        pending_map[bucket.merge_sha].add(sha)
 
     def prune_sha_merge_last(self, shas):
-        """prunes multiples shas by pruning the branch entries before the merge commits
+        """prunes multiples shas by pruning the branch entries before the merge commits.
+        As all shas are pruned at once (see prune_many) the order does not matter.
 
         Args:
             shas (List[str]): shas to be pruned from the list
         """
-        merge_shas = []
-
-        for sha in shas:
-            if sha in self.merge_commit_shas:
-                merge_shas.append(sha)
-            else:
-                self.prune_sha(sha)
-
-        for sha in merge_shas:
-            self.prune_sha(sha)
+        self.prune_many(shas)
 
     def get_branch_entries(self) -> List[ChangeLogEntry]:
         """Returns Branch entries as a linear list
@@ -260,3 +518,19 @@ class BucketList:
             lin_entries.extend(bucket.branch_commits)
 
         return lin_entries
+
+
+def get_bucket_list(buckets: Union[BucketList, List[BucketEntry]]) -> BucketList:
+    """Returns the bucket list itself or creates one for a list of bucket entries
+
+    Args:
+        buckets (Union[BucketList, List[BucketEntry]]): Bucket list or list of bucket
+            entries ordered in hierarchy
+
+    Returns:
+        BucketList: bucket list including its indexes
+    """
+    if isinstance(buckets, BucketList):
+        return buckets
+
+    return BucketList.from_bucket_entries(buckets)
@@ -0,0 +1,134 @@
+"""Demand driven hydration of commit data for the merge debt analysis
+"""
+
+from enum import Enum
+from typing import List, Set, Iterable
+
+from gitaudit.git.controller import Git
+from gitaudit.git.change_log_entry import ChangeLogEntry
+
+
+class CommitField(Enum):
+    """Commit data that matchers and pruners can require. The fields are ordered by
+    the effort that is needed to get them from git.
+
+    SHA: sha and parent shas (part of every parent log)
+    MESSAGE: subject, body, cherry pick sha, author, date, tags, and refs
+    NUMSTAT: file additions and deletions
+    SUBMODULE_UPDATES: submodule updates (requires the patch)
+    """
+    SHA = "SHA"
+    MESSAGE = "MESSAGE"
+    NUMSTAT = "NUMSTAT"
+    SUBMODULE_UPDATES = "SUBMODULE_UPDATES"
+
+
+ALL_COMMIT_FIELDS = frozenset(CommitField)
+
+COMMIT_FIELD_COSTS = {
+    CommitField.SHA: 0,
+    CommitField.MESSAGE: 1,
+    CommitField.NUMSTAT: 2,
+    CommitField.SUBMODULE_UPDATES: 3,
+}
+
+_MESSAGE_ATTRIBUTES = [
+    'subject',
+    'body',
+    'cherry_pick_sha',
+    'author_name',
+    'author_mail',
+    'commit_date',
+    'tags',
+    'refs',
+]
+
+
+class CommitHydrator:
+    """Hydrates change log entries of a parent log with the commit data that is required.
+    The entries are updated in place so that all references to them (hierarchy, buckets,
+    and indexes) stay valid. Data of a commit is only fetched once.
+    """
+
+    def __init__(self, git: Git, hydrated_fields: Iterable[CommitField] = None) -> None:
+        """Constructor
+
+        Args:
+            git (Git): Git instance
+            hydrated_fields (Iterable[CommitField], optional): Fields that all entries
+                already contain. Defaults to None (only sha and parent shas).
+        """
+        self.git = git
+        self.hydrated_fields = {CommitField.SHA}.union(
+            hydrated_fields if hydrated_fields else [])
+        self.sha_fields_map = {}
+
+    def missing_fields(self, entry: ChangeLogEntry, fields: Set[CommitField]) \
+            -> Set[CommitField]:
+        """Returns the fields an entry is still missing
+
+        Args:
+            entry (ChangeLogEntry): Change log entry
+            fields (Set[CommitField]): Required fields
+
+        Returns:
+            Set[CommitField]: Fields that need to be hydrated
+        """
+        return set(fields) - self.hydrated_fields \
+            - self.sha_fields_map.get(entry.sha, set())
+
+    def hydrate(self, entries: List[ChangeLogEntry], fields: Set[CommitField]) \
+            -> List[ChangeLogEntry]:
+        """Hydrates the required fields of the entries that are still missing them
+
+        Args:
+            entries (List[ChangeLogEntry]): Change log entries
+            fields (Set[CommitField]): Required fields
+
+        Returns:
+            List[ChangeLogEntry]: Entries that were hydrated
+        """
+        missing_fields = set()
+        missing_entries = []
+
+        for entry in entries:
+            entry_missing_fields = self.missing_fields(entry, fields)
+
+            if entry_missing_fields:
+                missing_fields.update(entry_missing_fields)
+                missing_entries.append(entry)
+
+        if not missing_entries:
+            return []
+
+        numstat = bool(missing_fields.intersection(
+            {CommitField.NUMSTAT, CommitField.SUBMODULE_UPDATES}))
+        patch = CommitField.SUBMODULE_UPDATES in missing_fields
+
+        changelog_map = {x.sha: x for x in self.git.log_changelog_entries(
+            shas=list(map(lambda x: x.sha, missing_entries)),
+            patch=patch,
+            numstat=numstat,
+        )}
+
+        fetched_fields = {CommitField.MESSAGE}
+
+        if numstat:
+            fetched_fields.add(CommitField.NUMSTAT)
+        if patch:
+            fetched_fields.add(CommitField.SUBMODULE_UPDATES)
+
+        for entry in missing_entries:
+            changelog_entry = changelog_map[entry.sha]
+
+            for attribute in _MESSAGE_ATTRIBUTES:
+                setattr(entry, attribute, getattr(changelog_entry, attribute))
+
+            if numstat:
+                entry.numstat = changelog_entry.numstat
+            if patch:
+                entry.submodule_updates = changelog_entry.submodule_updates
+
+            self.sha_fields_map.setdefault(entry.sha, set()).update(fetched_fields)
+
+        return missing_entries
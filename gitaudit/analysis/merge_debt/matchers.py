@@ -2,13 +2,15 @@
 """
 
 from enum import Enum
-from typing import List
-from hashlib import sha1
+from typing import List, Union
 
 from pydantic import BaseModel
 
 from gitaudit.git.change_log_entry import ChangeLogEntry
-from .buckets import BucketEntry, get_sha_to_bucket_entry_map
+from .buckets import BucketEntry, BucketList, get_bucket_list, numstat_to_sha1
+from .hydration import CommitField, ALL_COMMIT_FIELDS, COMMIT_FIELD_COSTS
+
+BucketsType = Union[BucketList, List[BucketEntry]]
 
 
 class MatchConfidence(Enum):
@@ -20,6 +22,14 @@ class MatchConfidence(Enum):
     LOW = "LOW"
 
 
+MATCH_CONFIDENCE_RANKS = {
+    MatchConfidence.ABSOLUTE: 0,
+    MatchConfidence.STRONG: 1,
+    MatchConfidence.GOOD: 2,
+    MatchConfidence.LOW: 3,
+}
+
+
 class MatchResult(BaseModel):
     """Match Result consisting of head, base, and confidence entries
     """
@@ -30,14 +40,32 @@ class MatchResult(BaseModel):
 
 class Matcher:  # pylint: disable=too-few-public-methods
     """Generic class for matching commits
+
+    required_fields lists the commit data a matcher needs. Only these fields are
+    hydrated (for the commits that are still unmatched) before the matcher is executed.
+    confidence is the best confidence of the matches a matcher returns. Together with
+    the cost they are used for ordering matchers in a pipeline.
     """
+    required_fields = ALL_COMMIT_FIELDS
+    confidence = MatchConfidence.LOW
 
-    def match(self, head: List[BucketEntry], base: List[BucketEntry]) -> List[MatchResult]:
-        """Match the bucket entries
+    @property
+    def cost(self) -> int:
+        """Relative cost of a matcher, by default the cost of the most expensive commit
+        data it requires
+
+        Returns:
+            int: cost
+        """
+        return max(map(lambda x: COMMIT_FIELD_COSTS[x], self.required_fields), default=0)
+
+    def match(self, head: BucketsType, base: BucketsType) -> List[MatchResult]:
+        """Match the bucket entries. A BucketList is a sequence of its top level bucket
+        entries, so matchers can use it like a list of bucket entries or its indexes.
 
         Args:
-            head (List[BucketEntry]): Head Bucket List
-            base (List[BucketEntry]): Base Bucket List
+            head (BucketsType): Head Bucket List (or list of bucket entries)
+            base (BucketsType): Base Bucket List (or list of bucket entries)
 
         Raises:
             NotImplementedError: Abstract Placeholder
@@ -56,27 +84,29 @@ class SameCommitMatcher(Matcher):  # pylint: disable=too-few-public-methods
 
     All matches will have an ABSOLUTE confidence level.
     """
+    required_fields = {CommitField.SHA}
+    confidence = MatchConfidence.ABSOLUTE
 
-    def match(self, head: List[BucketEntry], base: List[BucketEntry]) -> List[MatchResult]:
+    def match(self, head: BucketsType, base: BucketsType) -> List[MatchResult]:
         """Match the bucket entries
 
         Args:
-            head (List[BucketEntry]): Head Bucket List
-            base (List[BucketEntry]): Base Bucket List
+            head (BucketsType): Head Bucket List (or list of bucket entries)
+            base (BucketsType): Base Bucket List (or list of bucket entries)
 
         Returns:
             List[MatchResult]: List of commit Matches
         """
-        _, entry_head_map = get_sha_to_bucket_entry_map(head)
-        _, entry_base_map = get_sha_to_bucket_entry_map(base)
+        head = get_bucket_list(head)
+        base = get_bucket_list(base)
 
         matches = []
 
-        for sha, head_entry in entry_head_map.items():
-            if sha in entry_base_map:
+        for sha, head_entry in head.entry_map.items():
+            if sha in base.entry_map:
                 matches.append(MatchResult(
                     head=head_entry,
-                    base=entry_base_map[sha],
+                    base=base.entry_map[sha],
                     confidence=MatchConfidence.ABSOLUTE,
                 ))
 
@@ -92,6 +122,8 @@ class DirectCherryPickMatcher(Matcher):  # pylint: disable=too-few-public-method
 
     All matches will have an ABSOLUTE confidence level.
     """
+    required_fields = {CommitField.MESSAGE}
+    confidence = MatchConfidence.ABSOLUTE
 
     def __init__(self, head_to_base: bool = True, base_to_head: bool = True) -> None:
         """Constructor
@@ -105,12 +137,12 @@ class DirectCherryPickMatcher(Matcher):  # pylint: disable=too-few-public-method
         self.head_to_base = head_to_base
         self.base_to_head = base_to_head
 
-    def match(self, head: List[BucketEntry], base: List[BucketEntry]) -> List[MatchResult]:
+    def match(self, head: BucketsType, base: BucketsType) -> List[MatchResult]:
         """Match the bucket entries
 
         Args:
-            head (List[BucketEntry]): Head Bucket List
-            base (List[BucketEntry]): Base Bucket List
+            head (BucketsType): Head Bucket List (or list of bucket entries)
+            base (BucketsType): Base Bucket List (or list of bucket entries)
 
         Raises:
             NotImplementedError: Abstract Placeholder
@@ -119,31 +151,25 @@ class DirectCherryPickMatcher(Matcher):  # pylint: disable=too-few-public-method
             List[MatchResult]: List of commit Matches
         """
 
-        _, entry_head_map = get_sha_to_bucket_entry_map(head)
-        _, entry_base_map = get_sha_to_bucket_entry_map(base)
+        head = get_bucket_list(head)
+        base = get_bucket_list(base)
 
         matches = []
 
         if self.head_to_base:
-            for head_entry in entry_head_map.values():
-                if not head_entry.cherry_pick_sha:
-                    continue
-
-                if head_entry.cherry_pick_sha in entry_base_map:
+            for head_entry in head.cherry_pick_entry_map.values():
+                if head_entry.cherry_pick_sha in base.entry_map:
                     matches.append(MatchResult(
                         head=head_entry,
-                        base=entry_base_map[head_entry.cherry_pick_sha],
+                        base=base.entry_map[head_entry.cherry_pick_sha],
                         confidence=MatchConfidence.ABSOLUTE,
                     ))
 
         if self.base_to_head:
-            for base_entry in entry_base_map.values():
-                if not base_entry.cherry_pick_sha:
-                    continue
-
-                if base_entry.cherry_pick_sha in entry_head_map:
+            for base_entry in base.cherry_pick_entry_map.values():
+                if base_entry.cherry_pick_sha in head.entry_map:
                     matches.append(MatchResult(
-                        head=entry_head_map[base_entry.cherry_pick_sha],
+                        head=head.entry_map[base_entry.cherry_pick_sha],
                         base=base_entry,
                         confidence=MatchConfidence.ABSOLUTE,
                     ))
@@ -159,13 +185,15 @@ class ThirdPartyCherryPickMatcher(Matcher):  # pylint: disable=too-few-public-me
 
     All matches will have an ABSOLUTE confidence level.
     """
+    required_fields = {CommitField.MESSAGE}
+    confidence = MatchConfidence.ABSOLUTE
 
-    def match(self, head: List[BucketEntry], base: List[BucketEntry]) -> List[MatchResult]:
+    def match(self, head: BucketsType, base: BucketsType) -> List[MatchResult]:
         """Match the bucket entries
 
         Args:
-            head (List[BucketEntry]): Head Bucket List
-            base (List[BucketEntry]): Base Bucket List
+            head (BucketsType): Head Bucket List (or list of bucket entries)
+            base (BucketsType): Base Bucket List (or list of bucket entries)
 
         Raises:
             NotImplementedError: Abstract Placeholder
@@ -174,15 +202,15 @@ class ThirdPartyCherryPickMatcher(Matcher):  # pylint: disable=too-few-public-me
             List[MatchResult]: List of commit Matches
         """
 
-        _, entry_head_map = get_sha_to_bucket_entry_map(head)
-        _, entry_base_map = get_sha_to_bucket_entry_map(base)
+        head = get_bucket_list(head)
+        base = get_bucket_list(base)
 
         matches = []
 
-        cherry_picked_from_head_map = {x.cherry_pick_sha: x for x in filter(
-            lambda entry: entry.cherry_pick_sha, entry_head_map.values())}
-        cherry_picked_from_base_map = {x.cherry_pick_sha: x for x in filter(
-            lambda entry: entry.cherry_pick_sha, entry_base_map.values())}
+        cherry_picked_from_head_map = {
+            x.cherry_pick_sha: x for x in head.cherry_pick_entry_map.values()}
+        cherry_picked_from_base_map = {
+            x.cherry_pick_sha: x for x in base.cherry_pick_entry_map.values()}
 
         for cp_sha, head_entry in cherry_picked_from_head_map.items():
             if cp_sha not in cherry_picked_from_base_map:
@@ -197,25 +225,6 @@ class ThirdPartyCherryPickMatcher(Matcher):  # pylint: disable=too-few-public-me
         return matches
 
 
-def numstat_to_sha1(entry: ChangeLogEntry, with_additions_deletions=True):
-    """Calculates a sha1 hash out of the numstat file changes
-
-    Args:
-        entry (ChangeLogEntry): Change Log Entry
-        with_additions_deletions (bool, optional): Whether additions and deletions shall be
-            accounted for. Defaults to True.
-
-    Returns:
-        str: sha1 hash
-    """
-    if with_additions_deletions:
-        file_add_del_texts = map(
-            lambda x: f"{x.path}({x.additions}|{x.deletions})", entry.sorted_numstat)
-    else:
-        file_add_del_texts = map(lambda x: x.path, entry.sorted_numstat)
-    return sha1("".join(file_add_del_texts).encode('utf-8')).hexdigest()
-
-
 def create_numstat_map(entries: List[ChangeLogEntry], with_additions_deletions: bool = True):
     """Creates a numstat sha1 to change log entry map that can be used for commit matching
 
@@ -260,17 +269,20 @@ class FilesChangedMatcher(Matcher):  # pylint: disable=too-few-public-methods
     done for all matches automatically to proove confidence). In case the additions and deletions
     are not matched the confidence level is dropped to LOW.
     """
+    required_fields = {CommitField.NUMSTAT}
 
     def __init__(self, with_additions_deletions=True) -> None:
         super().__init__()
         self.with_additions_deletions = with_additions_deletions
+        self.confidence = MatchConfidence.STRONG \
+            if self.with_additions_deletions else MatchConfidence.GOOD
 
-    def match(self, head: List[BucketEntry], base: List[BucketEntry]) -> List[MatchResult]:
+    def match(self, head: BucketsType, base: BucketsType) -> List[MatchResult]:
         """Match the bucket entries
 
         Args:
-            head (List[BucketEntry]): Head Bucket List
-            base (List[BucketEntry]): Base Bucket List
+            head (BucketsType): Head Bucket List (or list of bucket entries)
+            base (BucketsType): Base Bucket List (or list of bucket entries)
 
         Raises:
             NotImplementedError: Abstract Placeholder
@@ -279,23 +291,14 @@ class FilesChangedMatcher(Matcher):  # pylint: disable=too-few-public-methods
             List[MatchResult]: List of commit Matches
         """
 
-        _, entry_head_map = get_sha_to_bucket_entry_map(head)
-        _, entry_base_map = get_sha_to_bucket_entry_map(base)
+        head = get_bucket_list(head)
+        base = get_bucket_list(base)
 
-        numstat_head_map = create_numstat_map(
-            list(entry_head_map.values()),
-            self.with_additions_deletions,
-        )
-        numstat_base_map = create_numstat_map(
-            list(entry_base_map.values()),
-            self.with_additions_deletions,
-        )
+        numstat_head_map = head.get_numstat_map(self.with_additions_deletions)
+        numstat_base_map = base.get_numstat_map(self.with_additions_deletions)
 
         matches = []
 
-        confidence = MatchConfidence.STRONG \
-            if self.with_additions_deletions else MatchConfidence.GOOD
-
         for cp_sha, head_entry in numstat_head_map.items():
             if cp_sha not in numstat_base_map:
                 continue
@@ -303,7 +306,7 @@ class FilesChangedMatcher(Matcher):  # pylint: disable=too-few-public-methods
             matches.append(MatchResult(
                 head=head_entry,
                 base=numstat_base_map[cp_sha],
-                confidence=confidence,
+                confidence=self.confidence,
             ))
 
         return matches
@@ -314,13 +317,15 @@ class WhitelistMatcher(Matcher):  # pylint: disable=too-few-public-methods
 
     All matches will have an ABSOLUTE confidene level.
     """
+    required_fields = {CommitField.SHA}
+    confidence = MatchConfidence.ABSOLUTE
 
-    def match(self, head: List[BucketEntry], base: List[BucketEntry]) -> List[MatchResult]:
+    def match(self, head: BucketsType, base: BucketsType) -> List[MatchResult]:
         """Match the bucket entries
 
         Args:
-            head (List[BucketEntry]): Head Bucket List
-            base (List[BucketEntry]): Base Bucket List
+            head (BucketsType): Head Bucket List (or list of bucket entries)
+            base (BucketsType): Base Bucket List (or list of bucket entries)
 
         Raises:
             NotImplementedError: Abstract Placeholder
@@ -338,13 +343,15 @@ class JiraIssueKeyMatcher(Matcher):  # pylint: disable=too-few-public-methods
     All matches will have a GOOD confidence level. In case the additions and deletions
     are not matched the confidence level is dropped to LOW.
     """
+    required_fields = {CommitField.MESSAGE, CommitField.NUMSTAT}
+    confidence = MatchConfidence.GOOD
 
-    def match(self, head: List[BucketEntry], base: List[BucketEntry]) -> List[MatchResult]:
+    def match(self, head: BucketsType, base: BucketsType) -> List[MatchResult]:
         """Match the bucket entries
 
         Args:
-            head (List[BucketEntry]): Head Bucket List
-            base (List[BucketEntry]): Base Bucket List
+            head (BucketsType): Head Bucket List (or list of bucket entries)
+            base (BucketsType): Base Bucket List (or list of bucket entries)
 
         Raises:
             NotImplementedError: Abstract Placeholder
@@ -360,13 +367,15 @@ class SubjectMatcher(Matcher):  # pylint: disable=too-few-public-methods
     All matches will have a GOOD confidence level. In case the additions and deletions
     are not matched the confidence level is dropped to LOW.
     """
+    required_fields = {CommitField.MESSAGE, CommitField.NUMSTAT}
+    confidence = MatchConfidence.GOOD
 
-    def match(self, head: List[BucketEntry], base: List[BucketEntry]) -> List[MatchResult]:
+    def match(self, head: BucketsType, base: BucketsType) -> List[MatchResult]:
         """Match the bucket entries
 
         Args:
-            head (List[BucketEntry]): Head Bucket List
-            base (List[BucketEntry]): Base Bucket List
+            head (BucketsType): Head Bucket List (or list of bucket entries)
+            base (BucketsType): Base Bucket List (or list of bucket entries)
 
         Raises:
             NotImplementedError: Abstract Placeholder
@@ -0,0 +1,216 @@
+"""Merge debt analysis of many head / base ref pairs (e.g. all release branches against
+main) out of a single history load
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+from gitaudit.git.controller import Git
+from gitaudit.branch.hierarchy import get_ref_hierarchy_logs
+
+from .buckets import BucketEntry, BucketList
+from .hydration import CommitHydrator
+from .matchers import Matcher
+from .merge_debt import MergeDebt
+
+
+def get_fork_depth(head_log, base_log) -> int:
+    """Depth (counted from the root commit) of the last first parent commit two
+    hierarchy logs of a single history walk share. As the logs share their first parent
+    entries up to this commit and differ afterwards, the depth is found by a binary
+    search.
+
+    Args:
+        head_log (Sequence[ChangeLogEntry]): head hierarchy log
+        base_log (Sequence[ChangeLogEntry]): base hierarchy log
+
+    Returns:
+        int: depth of the fork commit, -1 in case the logs do not share a commit
+    """
+    head_len = len(head_log)
+    base_len = len(base_log)
+
+    low = -1
+    high = min(head_len, base_len) - 1
+
+    while low < high:
+        depth = (low + high + 1) // 2
+
+        if head_log[head_len - 1 - depth].sha == base_log[base_len - 1 - depth].sha:
+            low = depth
+        else:
+            high = depth - 1
+
+    return low
+
+
+def _execute_merge_debt(merge_debt: MergeDebt, matchers: List[Matcher]) -> MergeDebt:
+    merge_debt.execute_matchers(matchers)
+    return merge_debt
+
+
+class MergeDebtMatrix:
+    """Merge debt analysis of multiple head / base ref pairs. The history of all refs is
+    loaded with a single git log walk. The first parent lines after the fork point of
+    each pair are sliced out of the shared hierarchy logs, the buckets of every first
+    parent commit are created only once and all pairs share the same change log entries
+    so that the commit data is hydrated at most once per commit.
+    """
+
+    def __init__(
+        self,
+        git: Git,
+        pairs: List[Tuple[str, str]],
+        prunable_confidences=None,
+    ) -> None:
+        """Constructor
+
+        Args:
+            git (Git): Git instance
+            pairs (List[Tuple[str, str]]): (head ref, base ref) pairs
+            prunable_confidences (List[MatchConfidence], optional): Confidences of matches
+                that are pruned. Defaults to None.
+        """
+        self.git = git
+        self.pairs = list(pairs)
+        self.prunable_confidences = prunable_confidences
+
+        refs = list(dict.fromkeys(ref for pair in self.pairs for ref in pair))
+        self.ref_log_map = get_ref_hierarchy_logs(git, refs)
+
+        self.hydrator = CommitHydrator(git)
+        self.commit_store = {}
+        self.bucket_cache = {}
+
+    def get_pair_hier_logs(self, head_ref: str, base_ref: str):
+        """Gets the head and base first parent lines after the fork point of two refs
+
+        Args:
+            head_ref (str): name of the head ref
+            base_ref (str): name of the base ref
+
+        Returns:
+            Tuple[List[ChangeLogEntry], List[ChangeLogEntry]]: head and base
+                hierarchy log
+        """
+        head_log = self.ref_log_map[head_ref]
+        base_log = self.ref_log_map[base_ref]
+
+        fork_depth = get_fork_depth(head_log, base_log)
+
+        return (
+            list(head_log[:len(head_log) - 1 - fork_depth]),
+            list(base_log[:len(base_log) - 1 - fork_depth]),
+        )
+
+    def _get_bucket(self, entry) -> BucketEntry:
+        if entry.sha not in self.bucket_cache:
+            bucket = BucketEntry.from_change_log_entry(entry)
+            self._share_entries(bucket)
+            self.bucket_cache[entry.sha] = bucket
+
+        return self.bucket_cache[entry.sha].copy_bucket_structure()
+
+    def _share_entries(self, bucket: BucketEntry):
+        # the same commit can be part of the hierarchy of multiple first parent lines
+        # --> all buckets refer to one entry per sha
+        bucket.merge_commit = self.commit_store.setdefault(
+            bucket.merge_commit.sha, bucket.merge_commit)
+        bucket.branch_commits = [
+            self.commit_store.setdefault(x.sha, x) for x in bucket.branch_commits
+        ]
+
+        for child in bucket.children:
+            self._share_entries(child)
+
+    def get_bucket_list(self, hier_log) -> BucketList:
+        """Creates a bucket list out of the cached buckets of the first parent commits.
+        Every bucket list can be pruned independently.
+
+        Args:
+            hier_log (List[ChangeLogEntry]): hierarchy log
+
+        Returns:
+            BucketList: bucket list
+        """
+        return BucketList.from_bucket_entries(list(map(self._get_bucket, hier_log)))
+
+    def create_merge_debt(self, head_ref: str, base_ref: str, hydrator=None) -> MergeDebt:
+        """Creates the merge debt analysis of a ref pair
+
+        Args:
+            head_ref (str): name of the head ref
+            base_ref (str): name of the base ref
+            hydrator (CommitHydrator, optional): Hydrator for on demand hydration.
+                Defaults to None (shared hydrator of the matrix).
+
+        Returns:
+            MergeDebt: merge debt analysis
+        """
+        head_hier_log, base_hier_log = self.get_pair_hier_logs(head_ref, base_ref)
+
+        merge_debt = MergeDebt.from_bucket_lists(
+            self.get_bucket_list(head_hier_log),
+            self.get_bucket_list(base_hier_log),
+            self.prunable_confidences,
+            hydrator=hydrator if hydrator else self.hydrator,
+        )
+        merge_debt.head_hier_log = head_hier_log
+        merge_debt.base_hier_log = base_hier_log
+
+        return merge_debt
+
+    def execute_matchers(
+        self,
+        matchers: List[Matcher],
+        use_processes: bool = False,
+        max_workers: int = None,
+    ) -> Dict[Tuple[str, str], MergeDebt]:
+        """Executes the matchers for all ref pairs
+
+        Sequentially, the commit data is hydrated on demand and the analysis of a pair is
+        created right before its execution (the bucket indexes are created out of
+        the already hydrated data). In worker processes, the commit data required by the
+        matchers is hydrated for all commits of all pairs upfront.
+
+        Args:
+            matchers (List[Matcher]): List of matchers
+            use_processes (bool, optional): Whether the pairs are analysed in worker
+                processes (matchers need to be picklable). Defaults to False.
+            max_workers (int, optional): Maximum number of worker processes. Defaults
+                to None (see concurrent.futures).
+
+        Returns:
+            Dict[Tuple[str, str], MergeDebt]: (head ref, base ref) -> merge debt analysis
+        """
+        if not use_processes:
+            pair_merge_debt_map = {}
+
+            for pair in self.pairs:
+                pair_merge_debt_map[pair] = _execute_merge_debt(
+                    self.create_merge_debt(*pair), matchers)
+
+            return pair_merge_debt_map
+
+        merge_debts = [self.create_merge_debt(*pair) for pair in self.pairs]
+
+        self.hydrator.hydrate(
+            list(self.commit_store.values()),
+            set().union(*map(lambda x: x.required_fields, matchers)),
+        )
+
+        for merge_debt in merge_debts:
+            merge_debt.hydrator = None
+            merge_debt.head_buckets.update_entry_indexes()
+            merge_debt.base_buckets.update_entry_indexes()
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_execute_merge_debt, merge_debt, matchers)
+                for merge_debt in merge_debts
+            ]
+
+            return {
+                pair: future.result() for pair, future in zip(self.pairs, futures)
+            }
@@ -3,7 +3,8 @@ in main that have already been merged in a
 release branch
 """
 from __future__ import annotations
-from typing import List
+from typing import List, TextIO
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 from gitaudit.branch.hierarchy import linear_log_to_hierarchy_log, changelog_hydration
 from gitaudit.git.controller import Git
@@ -13,9 +14,45 @@ from .matchers import Matcher, MatchConfidence, MatchResult
 from .buckets import BucketList
 from .report import MergeDebtReport, MergeDebtAlert
 from .pruners import Pruner
+from .hydration import CommitHydrator, CommitField
 
 
-def get_head_base_hier_logs(git: Git, head_ref: str, base_ref: str):
+def get_symmetric_difference_hier_logs(git: Git, head_ref: str, base_ref: str):
+    """Gets the head and base hierarchy logs of the commits that are only reachable
+    from one of the refs. The merge bases are calculated first and only base..head and
+    head..base are logged so that the log volume is proportional to the divergence of
+    the refs and not to the age of the repository. Boundary commits are attached as
+    branch offs.
+
+    Args:
+        git (Git): Git instance
+        head_ref (str): name of the head ref
+        base_ref (str): name of the base ref
+
+    Returns:
+        Tuple[List[ChangeLogEntry], List[ChangeLogEntry]]: head and base
+            hierarchy log (not hydrated)
+    """
+    merge_bases = git.merge_bases(head_ref, base_ref)
+
+    head_lin_log, head_boundary_log = git.log_parentlog_exclusive(
+        head_ref, merge_bases)
+    base_lin_log, base_boundary_log = git.log_parentlog_exclusive(
+        base_ref, merge_bases)
+
+    return (
+        linear_log_to_hierarchy_log(head_lin_log, head_boundary_log),
+        linear_log_to_hierarchy_log(base_lin_log, base_boundary_log),
+    )
+
+
+def get_head_base_hier_logs(
+    git: Git,
+    head_ref: str,
+    base_ref: str,
+    hydrate: bool = True,
+    symmetric_difference: bool = False,
+):
     """Gets the head and base hierarchy logs from a git instance
     as preparation for the merge debt analysis
 
@@ -23,33 +60,48 @@ def get_head_base_hier_logs(git: Git, head_ref: str, base_ref: str):
         git (Git): Git instance
         head_ref (str): name of the head ref
         base_ref (str): name of the base ref
+        hydrate (bool, optional): Whether the hierarchy logs shall be hydrated with the
+            full changelog. Otherwise, the entries only contain sha and parent
+            information. Defaults to True.
+        symmetric_difference (bool, optional): Whether only the commits that are not
+            reachable from the other ref shall be part of the logs (see
+            get_symmetric_difference_hier_logs). Otherwise, the full history of both
+            refs is loaded and the first parent lines after their branch point are
+            used. Defaults to False.
 
     Returns:
         Tuple[List[ChangeLogEntry], List[ChangeLogEntry]]: head and base
             hierarchy log
     """
-    head_hier_log = linear_log_to_hierarchy_log(git.log_parentlog(head_ref))
-    base_hier_log = linear_log_to_hierarchy_log(git.log_parentlog(base_ref))
+    if symmetric_difference:
+        head_hier_log, base_hier_log = get_symmetric_difference_hier_logs(
+            git, head_ref, base_ref)
+    else:
+        head_hier_log = linear_log_to_hierarchy_log(git.log_parentlog(head_ref))
+        base_hier_log = linear_log_to_hierarchy_log(git.log_parentlog(base_ref))
 
-    tree = Tree()
-    tree.append_log(base_hier_log, base_ref)
-    tree.append_log(head_hier_log, head_ref)
+        tree = Tree()
+        tree.append_log(base_hier_log, base_ref)
+        tree.append_log(head_hier_log, head_ref)
 
-    ref_segment_map = {
-        x.branch_name: x for x in tree.root.children.values()
-    }
+        ref_segment_map = {
+            x.branch_name: x for x in tree.root.children.values()
+        }
 
-    head_segment = ref_segment_map[head_ref]
-    base_segment = ref_segment_map[base_ref]
+        head_hier_log = ref_segment_map[head_ref].entries
+        base_hier_log = ref_segment_map[base_ref].entries
+
+    if not hydrate:
+        return head_hier_log, base_hier_log
 
     head_hier_log = changelog_hydration(
-        head_segment.entries,
+        head_hier_log,
         git,
-    )
+    ) if head_hier_log else []
     base_hier_log = changelog_hydration(
-        base_segment.entries,
+        base_hier_log,
         git,
-    )
+    ) if base_hier_log else []
 
     return head_hier_log, base_hier_log
 
@@ -58,7 +110,28 @@ class MergeDebt:
     """Calculates the merge debt by finding commits that are merged in head but not in base
     """
 
-    def __init__(self, head_hier_log, base_hier_log, prunable_confidences=None) -> None:
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        head_hier_log,
+        base_hier_log,
+        prunable_confidences=None,
+        git: Git = None,
+        hydrated_fields=None,
+    ) -> None:
+        """Constructor
+
+        Args:
+            head_hier_log (List[ChangeLogEntry]): head hierarchy log
+            base_hier_log (List[ChangeLogEntry]): base hierarchy log
+            prunable_confidences (List[MatchConfidence], optional): Confidences of matches
+                that are pruned. Defaults to None (ABSOLUTE and STRONG).
+            git (Git, optional): If set, the commit data required by matchers and pruners
+                is hydrated on demand for the commits that are not pruned yet.
+                Defaults to None (the hierarchy logs are already hydrated).
+            hydrated_fields (List[CommitField], optional): Commit data the hierarchy logs
+                already contain in case of on demand hydration. Defaults to None (only sha
+                and parent shas).
+        """
         self.head_hier_log = head_hier_log
         self.base_hier_log = base_hier_log
 
@@ -70,8 +143,90 @@ class MergeDebt:
         self.head_buckets = BucketList(self.head_hier_log)
         self.base_buckets = BucketList(self.base_hier_log)
 
+        self.hydrator = CommitHydrator(git, hydrated_fields) if git else None
+
         self.report = MergeDebtReport()
 
+    @classmethod
+    def from_git(  # pylint: disable=too-many-arguments
+        cls,
+        git: Git,
+        head_ref: str,
+        base_ref: str,
+        prunable_confidences=None,
+        symmetric_difference: bool = False,
+    ):
+        """Creates a merge debt analysis whose commit data is hydrated on demand
+
+        Args:
+            git (Git): Git instance
+            head_ref (str): name of the head ref
+            base_ref (str): name of the base ref
+            prunable_confidences (List[MatchConfidence], optional): Confidences of matches
+                that are pruned. Defaults to None.
+            symmetric_difference (bool, optional): Whether only the commits that are not
+                reachable from the other ref are analysed. Defaults to False.
+
+        Returns:
+            MergeDebt: merge debt analysis
+        """
+        head_hier_log, base_hier_log = get_head_base_hier_logs(
+            git, head_ref, base_ref,
+            hydrate=False,
+            symmetric_difference=symmetric_difference,
+        )
+        return cls(head_hier_log, base_hier_log, prunable_confidences, git=git)
+
+    @classmethod
+    def from_bucket_lists(
+        cls,
+        head_buckets: BucketList,
+        base_buckets: BucketList,
+        prunable_confidences=None,
+        hydrator: CommitHydrator = None,
+    ):
+        """Creates a merge debt analysis out of already created bucket lists
+
+        Args:
+            head_buckets (BucketList): head bucket list
+            base_buckets (BucketList): base bucket list
+            prunable_confidences (List[MatchConfidence], optional): Confidences of matches
+                that are pruned. Defaults to None.
+            hydrator (CommitHydrator, optional): Hydrator for on demand hydration (can
+                be shared by multiple analyses). Defaults to None.
+
+        Returns:
+            MergeDebt: merge debt analysis
+        """
+        merge_debt = cls([], [], prunable_confidences)
+        merge_debt.head_buckets = head_buckets
+        merge_debt.base_buckets = base_buckets
+        merge_debt.hydrator = hydrator
+        return merge_debt
+
+    def hydrate(self, fields):
+        """Hydrates the required commit data of all commits that are not pruned yet
+        (only in case of on demand hydration)
+
+        Args:
+            fields (Set[CommitField]): Required commit data
+        """
+        if not self.hydrator:
+            return
+
+        self._hydrate_entries(
+            list(self.head_buckets.entry_map.values())
+            + list(self.base_buckets.entry_map.values()),
+            fields,
+        )
+
+    def _hydrate_entries(self, entries, fields):
+        if not self.hydrator or not self.hydrator.hydrate(entries, fields):
+            return
+
+        self.head_buckets.update_entry_indexes()
+        self.base_buckets.update_entry_indexes()
+
     # def ignore_shas(self, head_shas, base_shas=None):
     #     """Ability to set shas to be ignored for head and base. These are pruned and no longer
     #     part of the analysis.
@@ -110,7 +265,7 @@ class MergeDebt:
         Returns:
             MatchResult: Augmented Match Result
         """
-        if match.head.sorted_numstat != match.base.sorted_numstat:
+        if match.head.get_numstat_sha1() != match.base.get_numstat_sha1():
             if match.confidence in self.prunable_confidences:
                 self.report.append_alert(MergeDebtAlert.warning(
                     match,
@@ -131,22 +286,50 @@ class MergeDebt:
             matcher (Matcher): Matcher which will return commit match results
             prune (bool, optional): Whether or not the match results shall be prune immediately.
                 Defaults to True.
+
+        Returns:
+            List[MatchResult]: match results of the matcher
         """
-        sub_matches = matcher.match(
-            self.head_buckets.entries, self.base_buckets.entries)
+        self.hydrate(matcher.required_fields)
 
-        if not prune:
-            return
+        sub_matches = matcher.match(self.head_buckets, self.base_buckets)
+
+        if prune:
+            self._apply_matches(sub_matches)
+
+        return sub_matches
+
+    def _apply_matches(self, sub_matches: List[MatchResult]):
+        # match results refer to copies of the entries (pydantic validation or
+        # process pools) --> refer to the entries of the bucket lists again
+        for match in sub_matches:
+            match.head = self.head_buckets.entry_map.get(match.head.sha, match.head)
+            match.base = self.base_buckets.entry_map.get(match.base.sha, match.base)
+
+        # numstats are required for validating matches of different commits
+        self._hydrate_entries(
+            [
+                entry for match in sub_matches if match.head.sha != match.base.sha
+                for entry in [match.head, match.base]
+            ],
+            {CommitField.NUMSTAT},
+        )
+
+        head_prune_shas = []
+        base_prune_shas = []
 
         for match in sub_matches:
             match = self.validate_match(match)
 
             if match.confidence in self.prunable_confidences:
-                self.prune_head_sha(match.head.sha)
-                self.prune_base_sha(match.base.sha)
+                head_prune_shas.append(match.head.sha)
+                base_prune_shas.append(match.base.sha)
 
             self.report.append_match(match)
 
+        self.head_buckets.prune_many(head_prune_shas)
+        self.base_buckets.prune_many(base_prune_shas)
+
     def execute_matchers(self, matchers: List[Matcher], prune=True):
         """Executed a list of matchers
 
@@ -158,31 +341,113 @@ class MergeDebt:
         for matcher in matchers:
             self.execute_matcher(matcher, prune)
 
+    def execute_matchers_parallel(
+        self,
+        matchers: List[Matcher],
+        prune=True,
+        max_workers: int = None,
+        use_processes: bool = False,
+    ):
+        """Executes a group of independent matchers in parallel. All matchers match the
+        same (frozen) state of the head and base bucket lists, nothing is pruned while
+        they are running. Afterwards the results are merged in the order of the matchers
+        (priority): matches of commits that are pruned by the results of a previous
+        matcher are dropped. All remaining matches are pruned at once. Therefore, the
+        result is deterministic but can contain fewer matches than a sequential
+        execution (e.g. numstats that are only unique after pruning).
+
+        Args:
+            matchers (List[Matcher]): List of matchers ordered by priority
+            prune (bool, optional): Whether or not the match results shall be pruned.
+                Defaults to True.
+            max_workers (int, optional): Maximum number of workers. Defaults to None
+                (see concurrent.futures).
+            use_processes (bool, optional): Whether a process pool is used instead of a
+                thread pool (matchers and bucket lists need to be picklable).
+                Defaults to False.
+        """
+        self.hydrate(set().union(*map(lambda x: x.required_fields, matchers)))
+
+        # lazily created indexes must not be created concurrently
+        self.head_buckets.build_indexes()
+        self.base_buckets.build_indexes()
+
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+        with executor_cls(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(matcher.match, self.head_buckets, self.base_buckets)
+                for matcher in matchers
+            ]
+            matcher_results = [x.result() for x in futures]
+
+        if not prune:
+            return
+
+        merged_matches = []
+        pruned_head_shas = set()
+        pruned_base_shas = set()
+
+        for sub_matches in matcher_results:
+            sub_matches = [
+                x for x in sub_matches
+                if x.head.sha not in pruned_head_shas
+                and x.base.sha not in pruned_base_shas
+            ]
+
+            for match in sub_matches:
+                if match.confidence in self.prunable_confidences:
+                    pruned_head_shas.add(match.head.sha)
+                    pruned_base_shas.add(match.base.sha)
+
+            merged_matches.extend(sub_matches)
+
+        self._apply_matches(merged_matches)
+
     def execute_pruner(self, pruner: Pruner):
         """Prunes shas after running a provided pruner for selection
 
         Args:
             pruner (Pruner): The pruner to select the entries to be removed
         """
+        self.hydrate(pruner.required_fields)
+
         head_prunes, base_prunes = pruner.prune(
             self.head_buckets.entries,
             self.base_buckets.entries,
         )
 
         for entry in head_prunes:
-            self.prune_head_sha(entry.sha)
             self.report.append_head_prune(entry)
         for entry in base_prunes:
-            self.prune_base_sha(entry.sha)
             self.report.append_base_prune(entry)
 
+        self.head_buckets.prune_many(map(lambda x: x.sha, head_prunes))
+        self.base_buckets.prune_many(map(lambda x: x.sha, base_prunes))
+
     def report_dict(self) -> dict:
         """Creates a report dict
 
         Returns:
             dict: report dictionary
         """
+        self.hydrate({CommitField.MESSAGE})
+
         return self.report.dict(
             head_entries=self.head_buckets.get_branch_entries(),
             base_entries=self.base_buckets.get_branch_entries(),
         )
+
+    def write_report(self, stream: TextIO):
+        """Writes the report as JSON lines (see MergeDebtReport.write_jsonl)
+
+        Args:
+            stream (TextIO): stream the report is written to (e.g. an opened file)
+        """
+        self.hydrate({CommitField.MESSAGE})
+
+        self.report.write_jsonl(
+            stream,
+            head_entries=self.head_buckets.get_branch_entries(),
+            base_entries=self.base_buckets.get_branch_entries(),
+        )
@@ -0,0 +1,70 @@
+"""Cost aware execution of matchers
+"""
+
+from time import perf_counter
+from typing import List
+
+from .matchers import Matcher, MATCH_CONFIDENCE_RANKS
+from .report import MatcherStats
+
+
+class MatcherPipeline:  # pylint: disable=too-few-public-methods
+    """Executes matchers ordered by the confidence of their matches (best first) and
+    their cost (cheapest first). Once all head or all base commits are pruned the
+    remaining matchers are skipped. Execution statistics of every matcher are appended
+    to the merge debt report.
+    """
+
+    def __init__(self, matchers: List[Matcher], order: bool = True) -> None:
+        """Constructor
+
+        Args:
+            matchers (List[Matcher]): matchers to be executed
+            order (bool, optional): Whether the matchers shall be ordered by confidence
+                and cost. Otherwise, the given order is kept. Defaults to True.
+        """
+        self.matchers = sorted(
+            matchers,
+            key=lambda x: (MATCH_CONFIDENCE_RANKS[x.confidence], x.cost),
+        ) if order else list(matchers)
+
+    def execute(self, merge_debt, prune=True) -> List[MatcherStats]:
+        """Executes the matchers of the pipeline
+
+        Args:
+            merge_debt (MergeDebt): merge debt analysis
+            prune (bool, optional): Whether or not the match results shall be pruned.
+                Defaults to True.
+
+        Returns:
+            List[MatcherStats]: Statistics of the matchers (also part of the report)
+        """
+        stats_list = []
+
+        for matcher in self.matchers:
+            head_candidates = len(merge_debt.head_buckets.entry_map)
+            base_candidates = len(merge_debt.base_buckets.entry_map)
+
+            stats = MatcherStats(
+                matcher=type(matcher).__name__,
+                head_candidates=head_candidates,
+                base_candidates=base_candidates,
+            )
+
+            if not head_candidates or not base_candidates:
+                stats.skipped = True
+            else:
+                start_time = perf_counter()
+                sub_matches = merge_debt.execute_matcher(matcher, prune)
+
+                stats.wall_time = perf_counter() - start_time
+                stats.match_count = len(sub_matches)
+                stats.head_pruned = \
+                    head_candidates - len(merge_debt.head_buckets.entry_map)
+                stats.base_pruned = \
+                    base_candidates - len(merge_debt.base_buckets.entry_map)
+
+            merge_debt.report.append_matcher_stats(stats)
+            stats_list.append(stats)
+
+        return stats_list
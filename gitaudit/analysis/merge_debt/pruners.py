@@ -7,6 +7,7 @@ import re
 
 from gitaudit.git.change_log_entry import ChangeLogEntry
 from .buckets import BucketEntry, get_sha_to_bucket_entry_map
+from .hydration import CommitField, ALL_COMMIT_FIELDS
 
 
 class PruneBehavior(Enum):
@@ -19,7 +20,10 @@ class PruneBehavior(Enum):
 
 class Pruner:  # pylint: disable=too-few-public-methods
     """Generic class for pruning commits without matching
+
+    required_fields lists the commit data a pruner needs (see Matcher).
     """
+    required_fields = ALL_COMMIT_FIELDS
 
     def __init__(
         self,
@@ -86,6 +90,7 @@ class Pruner:  # pylint: disable=too-few-public-methods
 
 class CommitSubjectBodyPruner:  # pylint: disable=too-few-public-methods
     """Pruning based on subject / body content"""
+    required_fields = {CommitField.MESSAGE}
 
     def __init__(self, pattern) -> None:
         self.pattern = pattern
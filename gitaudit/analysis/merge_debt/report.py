@@ -1,10 +1,12 @@
 """Reporting code for merge debt
 """
 
+import json
 from enum import Enum
-from typing import List
+from typing import List, TextIO
 
 from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
 
 from gitaudit.git.change_log_entry import ChangeLogEntry
 from .matchers import MatchResult
@@ -77,6 +79,137 @@ class MergeDebtAlert(BaseModel):
         )
 
 
+class MatcherStats(BaseModel):
+    """Execution statistics of a matcher within a matcher pipeline
+
+    matcher: name of the matcher (class name)
+    wall_time: execution time in seconds (including hydration, validation, and pruning)
+    head_candidates / base_candidates: unpruned head / base commits before execution
+    match_count: number of returned matches
+    head_pruned / base_pruned: number of head / base commits pruned by the matches
+    skipped: matcher was not executed as head or base was already fully pruned
+    """
+    matcher: str
+    wall_time: float = 0.0
+    head_candidates: int = 0
+    base_candidates: int = 0
+    match_count: int = 0
+    head_pruned: int = 0
+    base_pruned: int = 0
+    skipped: bool = False
+
+
+class MergeDebtReportWriter:
+    """Streams a merge debt report as JSON lines. Every match, alert, prune, unmatched
+    entry, and matcher statistic is written as one compact record. Commits are only
+    referenced by their sha. Each commit is written once as a "commit" record (without
+    its hierarchy) before the first record that references it.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        """Constructor
+
+        Args:
+            stream (TextIO): stream the records are written to (e.g. an opened file)
+        """
+        self.stream = stream
+        self.written_shas = set()
+
+    def _write_record(self, record: dict):
+        self.stream.write(json.dumps(
+            record,
+            separators=(",", ":"),
+            default=pydantic_encoder,
+        ))
+        self.stream.write("\n")
+
+    def write_commit(self, entry: ChangeLogEntry) -> str:
+        """Writes the commit record of an entry if not already written
+
+        Args:
+            entry (ChangeLogEntry): change log entry
+
+        Returns:
+            str: sha of the entry
+        """
+        if entry.sha not in self.written_shas:
+            self.written_shas.add(entry.sha)
+            self._write_record({
+                "type": "commit",
+                **entry.dict(
+                    exclude={"other_parents", "branch_offs"},
+                    exclude_none=True,
+                ),
+            })
+
+        return entry.sha
+
+    def write_match(self, match: MatchResult):
+        """Writes a match record
+
+        Args:
+            match (MatchResult): Match Result
+        """
+        self._write_record({
+            "type": "match",
+            "head": self.write_commit(match.head),
+            "base": self.write_commit(match.base),
+            "confidence": match.confidence.value,
+        })
+
+    def write_alert(self, alert: MergeDebtAlert):
+        """Writes an alert record
+
+        Args:
+            alert (MergeDebtAlert): Merge Debt Report Alert
+        """
+        self._write_record({
+            "type": "alert",
+            "head": self.write_commit(alert.match.head),
+            "base": self.write_commit(alert.match.base),
+            "confidence": alert.match.confidence.value,
+            "severity": alert.severity.value,
+            "message": alert.message,
+        })
+
+    def write_prune(self, entry: ChangeLogEntry, side: str):
+        """Writes a prune record
+
+        Args:
+            entry (ChangeLogEntry): Pruned change log entry
+            side (str): "head" or "base"
+        """
+        self._write_record({
+            "type": "prune",
+            "side": side,
+            "sha": self.write_commit(entry),
+        })
+
+    def write_unmatched(self, entry: ChangeLogEntry, side: str):
+        """Writes an unmatched record
+
+        Args:
+            entry (ChangeLogEntry): Unmatched change log entry
+            side (str): "head" or "base"
+        """
+        self._write_record({
+            "type": "unmatched",
+            "side": side,
+            "sha": self.write_commit(entry),
+        })
+
+    def write_matcher_stats(self, stats: MatcherStats):
+        """Writes a matcher statistics record
+
+        Args:
+            stats (MatcherStats): Matcher statistics
+        """
+        self._write_record({
+            "type": "matcher_stats",
+            **stats.dict(),
+        })
+
+
 class MergeDebtReport:
     """Merge Debt Report
     """
@@ -88,6 +221,7 @@ class MergeDebtReport:
         self.head_prunes = []
         self.base_unmatched = []
         self.head_unmatched = []
+        self.matcher_stats = []
 
     def append_alert(self, alert: MergeDebtAlert):
         """Append merge debt report alert
@@ -105,6 +239,14 @@ class MergeDebtReport:
         """
         self.matches.append(match)
 
+    def append_matcher_stats(self, stats: MatcherStats):
+        """Appends execution statistics of a matcher
+
+        Args:
+            stats (MatcherStats): Matcher statistics
+        """
+        self.matcher_stats.append(stats)
+
     def append_head_prune(self, entry: ChangeLogEntry):
         """Append a head prune entry
 
@@ -163,4 +305,43 @@ class MergeDebtReport:
                 lambda x: x.dict(),
                 self.alerts,
             )),
+            "matcher_stats": list(map(
+                lambda x: x.dict(),
+                self.matcher_stats,
+            )),
         }
+
+    def write_jsonl(
+        self,
+        stream: TextIO,
+        head_entries: List[ChangeLogEntry],
+        base_entries: List[ChangeLogEntry],
+    ):
+        """Writes the report as JSON lines (see MergeDebtReportWriter). In contrast to
+        dict, no nested report dictionary is created and every commit is only
+        serialized once.
+
+        Args:
+            stream (TextIO): stream the report is written to (e.g. an opened file)
+            head_entries (List[ChangeLogEntry]): Unmatched head entries
+            base_entries (List[ChangeLogEntry]): Unmatched base entries
+        """
+        self.base_unmatched = base_entries
+        self.head_unmatched = head_entries
+
+        writer = MergeDebtReportWriter(stream)
+
+        for entry in head_entries:
+            writer.write_unmatched(entry, "head")
+        for entry in base_entries:
+            writer.write_unmatched(entry, "base")
+        for entry in self.head_prunes:
+            writer.write_prune(entry, "head")
+        for entry in self.base_prunes:
+            writer.write_prune(entry, "base")
+        for match in self.matches:
+            writer.write_match(match)
+        for alert in self.alerts:
+            writer.write_alert(alert)
+        for stats in self.matcher_stats:
+            writer.write_matcher_stats(stats)
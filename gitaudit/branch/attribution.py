@@ -0,0 +1,104 @@
+"""Attribute commits to the merge commits that brought them into the mainline
+"""
+
+from typing import List, Optional
+
+from gitaudit.git.change_log_entry import ChangeLogEntry
+
+
+class MergeAttributionIndex:
+    """Precomputed index over a hierarchy log which maps every sha to its enclosing
+    merge commits. Next to the direct enclosing merge commit every sha stores a skip
+    pointer to the first parent (mainline) commit of the hierarchy log that introduced
+    it, so that the introducing merge can be looked up without walking the hierarchy.
+    """
+
+    def __init__(self, hier_log: List[ChangeLogEntry]) -> None:
+        self.entry_map = {}
+        self.enclosing_map = {}
+        self.mainline_map = {}
+        self.depth_map = {}
+
+        for entry in hier_log:
+            self._add_entry(entry, None)
+
+        stack = list(reversed(hier_log))
+
+        while stack:
+            merge_entry = stack.pop()
+            for p_hier_log in merge_entry.other_parents:
+                for entry in p_hier_log:
+                    self._add_entry(entry, merge_entry)
+                    if entry.other_parents:
+                        stack.append(entry)
+
+    def _add_entry(self, entry, merge_entry):
+        self.entry_map[entry.sha] = entry
+
+        if merge_entry:
+            self.enclosing_map[entry.sha] = merge_entry.sha
+            self.mainline_map[entry.sha] = self.mainline_map[merge_entry.sha]
+            self.depth_map[entry.sha] = self.depth_map[merge_entry.sha] + 1
+        else:
+            self.enclosing_map[entry.sha] = None
+            self.mainline_map[entry.sha] = entry.sha
+            self.depth_map[entry.sha] = 0
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self.entry_map
+
+    def __len__(self) -> int:
+        return len(self.entry_map)
+
+    def depth(self, sha: str) -> int:
+        """Merge nesting depth of a commit (0 for first parent / mainline commits)
+
+        Args:
+            sha (str): sha of the commit
+
+        Returns:
+            int: nesting depth
+        """
+        return self.depth_map[sha]
+
+    def enclosing_merge(self, sha: str) -> Optional[ChangeLogEntry]:
+        """The merge commit that directly merged the commit
+
+        Args:
+            sha (str): sha of the commit
+
+        Returns:
+            Optional[ChangeLogEntry]: enclosing merge commit, None for mainline commits
+        """
+        merge_sha = self.enclosing_map[sha]
+        return self.entry_map[merge_sha] if merge_sha else None
+
+    def introducing_merge(self, sha: str) -> ChangeLogEntry:
+        """The mainline commit that brought the commit into the hierarchy log.
+        For mainline commits this is the commit itself.
+
+        Args:
+            sha (str): sha of the commit
+
+        Returns:
+            ChangeLogEntry: introducing mainline commit
+        """
+        return self.entry_map[self.mainline_map[sha]]
+
+    def merge_chain(self, sha: str) -> List[ChangeLogEntry]:
+        """Chain of enclosing merge commits from the innermost to the mainline merge
+
+        Args:
+            sha (str): sha of the commit
+
+        Returns:
+            List[ChangeLogEntry]: enclosing merge commits, empty for mainline commits
+        """
+        chain = []
+        merge_sha = self.enclosing_map[sha]
+
+        while merge_sha:
+            chain.append(self.entry_map[merge_sha])
+            merge_sha = self.enclosing_map[merge_sha]
+
+        return chain
@@ -1,6 +1,10 @@
 """Analyse git logs to create hiearchy
 """
 
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import chain
+
 
 def take_first_parent_log(initial_sha, take_map, full_map):
     """Creates first parent log of git entries
@@ -41,40 +45,366 @@ def take_first_parent_log(initial_sha, take_map, full_map):
     return fp_log, take_map
 
 
-def _recursive_hierarchy_log(initial_sha, take_map, full_map):
-    hie_log, take_map = take_first_parent_log(initial_sha, take_map, full_map)
-
-    for entry in reversed(hie_log):
+def _iter_other_parent_shas(hier_log):
+    for entry in reversed(hier_log):
         for p_sha in entry.parent_shas[1:]:
+            yield entry, p_sha
+
+
+def _attach_other_parents(hie_log, take_map, full_map):
+    """Attaches the merged in side branches (other parents) to a first parent log.
+    Uses an explicit stack instead of recursion so that arbitrarily deep nested
+    merges do not hit the recursion limit
+
+    Args:
+        hie_log (List[ChangeLogEntry]): first parent log
+        take_map (Dict[str, ChangeLogEntry]): sha map with git
+            entry already considered
+        full_map (Dict[str, ChangeLogEntry]): full sha map
+
+    Returns:
+        Dict[str, ChangeLogEntry]: take_map update
+    """
+    stack = [_iter_other_parent_shas(hie_log)]
+
+    while stack:
+        for entry, p_sha in stack[-1]:
             if p_sha not in take_map:
                 entry.branch_offs.append(full_map[p_sha])
             else:
-                sub_log, take_map = _recursive_hierarchy_log(
+                sub_log, take_map = take_first_parent_log(
                     p_sha, take_map, full_map)
                 entry.other_parents.append(sub_log)
+                stack.append(_iter_other_parent_shas(sub_log))
+                break
+        else:
+            stack.pop()
+
+    return take_map
+
+
+def _iter_hierarchy_entries(hier_log):
+    stack = [iter(hier_log)]
+
+    while stack:
+        for entry in stack[-1]:
+            yield entry
+            if entry.other_parents:
+                stack.append(chain.from_iterable(entry.other_parents))
+                break
+        else:
+            stack.pop()
+
+
+class _LazyHierarchyShaMap:
+    """sha -> ChangeLogEntry lookup which only walks as much of an
+    existing hierarchy log as required to find the requested sha
+    """
+
+    def __init__(self, sha_map, hier_log):
+        self.sha_map = sha_map
+        self.entry_iter = _iter_hierarchy_entries(hier_log)
+
+    def get(self, sha, default=None):
+        """Get entry for sha
+
+        Args:
+            sha (str): sha of the entry
+            default (ChangeLogEntry, optional): returned in case sha is unknown.
+                Defaults to None.
+
+        Returns:
+            ChangeLogEntry: the entry
+        """
+        if sha in self.sha_map:
+            return self.sha_map[sha]
 
-    return hie_log, take_map
+        for entry in self.entry_iter:
+            self.sha_map[entry.sha] = entry
+            if entry.sha == sha:
+                return entry
 
+        return default
 
-def linear_log_to_hierarchy_log(lin_log):
+    def __getitem__(self, sha):
+        entry = self.get(sha)
+
+        if entry is None:
+            raise KeyError(sha)
+
+        return entry
+
+
+def linear_log_to_hierarchy_log(lin_log, boundary_log=None):
     """Creates Hierarchy Log from linear log
 
     Args:
         lin_log (List[ChangeLogEntry]): Linear Log
+        boundary_log (List[ChangeLogEntry], optional): Boundary entries of a partial
+            linear log (e.g. git log --boundary). They are not part of the hierarchy log
+            but are attached as branch offs. Defaults to None.
 
     Returns:
         List[ChangeLogEntry]: Hierarchy Log
     """
+    if not lin_log:
+        return []
 
-    full_map = {x.sha: x for x in lin_log}
+    full_map = {x.sha: x for x in chain(boundary_log if boundary_log else [], lin_log)}
     take_map = {x.sha: x for x in lin_log}
 
-    hie_log, take_map = _recursive_hierarchy_log(
+    hie_log, take_map = take_first_parent_log(
         lin_log[0].sha, take_map, full_map)
+    take_map = _attach_other_parents(hie_log, take_map, full_map)
 
     return hie_log
 
 
+def extend_hierarchy_log(hier_log, new_lin_log):
+    """Extends an existing hierarchy log by the commits a ref has advanced.
+    Only the new commits are processed, the existing hierarchy log entries
+    are reused and left untouched.
+
+    Args:
+        hier_log (List[ChangeLogEntry]): Hierarchy log of the old ref tip
+        new_lin_log (List[ChangeLogEntry]): Linear log of the new commits
+            (e.g. git.log_parentlog(new_tip, old_tip))
+
+    Returns:
+        List[ChangeLogEntry]: Hierarchy log of the new ref tip
+    """
+    if not new_lin_log:
+        return list(hier_log)
+
+    if not hier_log:
+        return linear_log_to_hierarchy_log(new_lin_log)
+
+    take_map = {x.sha: x for x in new_lin_log}
+    full_map = _LazyHierarchyShaMap(dict(take_map), hier_log)
+
+    new_fp_log = []
+    curr_sha = new_lin_log[0].sha
+
+    while curr_sha in take_map:
+        curr_entry = take_map.pop(curr_sha)
+        new_fp_log.append(curr_entry)
+        curr_sha = curr_entry.parent_shas[0] if curr_entry.parent_shas else None
+
+    assert curr_sha == hier_log[0].sha, \
+        "New first parent line does not continue the existing hierarchy log!"
+
+    _attach_other_parents(new_fp_log, take_map, full_map)
+
+    return new_fp_log + hier_log
+
+
+class _FirstParentPath(Sequence):
+    """Hierarchy log (first parent line, tip first) of a ref whose entries are
+    stored in first parent chains shared with other refs
+    """
+
+    def __init__(self, path_chains, tip_depth) -> None:
+        self.chain_starts = [x[0] for x in path_chains]
+        self.chains = [x[1] for x in path_chains]
+        self.tip_depth = tip_depth
+
+    def __len__(self):
+        return self.tip_depth + 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[x] for x in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        depth = self.tip_depth - index
+        chain_index = bisect_right(self.chain_starts, depth) - 1
+        return self.chains[chain_index][depth - self.chain_starts[chain_index]]
+
+
+def _first_parent_trie(lin_log_map, ref_sha_map):
+    children_map = {}
+    roots = []
+
+    for sha in ref_sha_map.values():
+        prev_sha = None
+
+        while sha not in children_map:
+            children_map[sha] = [prev_sha] if prev_sha else []
+            parent_shas = lin_log_map[sha].parent_shas
+
+            if not parent_shas or parent_shas[0] not in lin_log_map:
+                roots.append(sha)
+                prev_sha = None
+                break
+
+            prev_sha, sha = sha, parent_shas[0]
+
+        if prev_sha:
+            children_map[sha].append(prev_sha)
+
+    return children_map, roots
+
+
+def _consumed_shas(entry):
+    return [entry.sha] + [
+        x.sha for x in _iter_hierarchy_entries(chain.from_iterable(entry.other_parents))
+    ]
+
+
+def _restore_consumed_entries(sha, take_map, full_map):
+    # restore fresh entries for the remaining first parent lines
+    for c_sha in _consumed_shas(full_map[sha]):
+        fresh_entry = full_map[c_sha].copy(
+            update={'other_parents': [], 'branch_offs': []})
+        take_map[c_sha] = fresh_entry
+        full_map[c_sha] = fresh_entry
+
+
+class _FirstParentWalk:  # pylint: disable=too-few-public-methods
+    """Depth first walk over the first parent trie of multiple refs. The entries
+    of every first parent line are stored in chains (start depth, entries, parent
+    chain index) which are shared by all refs branching off below them.
+    """
+
+    def __init__(self, lin_log_map, children_map) -> None:
+        self.children_map = children_map
+        self.take_map = dict(lin_log_map)
+        self.full_map = dict(lin_log_map)
+        self.depth_map = {}
+        self.chain_index_map = {}
+        self.chains = []
+
+    def walk_root(self, root_sha, restore_all=False):
+        """Creates the chains of all first parent lines starting at a root commit
+
+        Args:
+            root_sha (str): sha of the root commit
+            restore_all (bool, optional): Whether the consumed entries are restored
+                even after the last first parent line of this root, e.g. as a later
+                root can be part of its hierarchy. Defaults to False.
+        """
+        # frame: sha, depth, children, next child index
+        stack = [[root_sha, 0, self.children_map[root_sha], 0]]
+        pending_count = 0
+        self.chain_index_map[root_sha] = len(self.chains)
+        self.chains.append((0, [], None))
+
+        while stack:
+            frame = stack[-1]
+            sha, depth, children, child_index = frame
+
+            if child_index == 0:
+                entry = self.take_map.pop(sha)
+                self.depth_map[sha] = depth
+                self.chains[self.chain_index_map[sha]][1].append(entry)
+                _attach_other_parents([entry], self.take_map, self.full_map)
+                if children:
+                    pending_count += 1
+
+            if child_index < len(children):
+                frame[3] += 1
+                if frame[3] == len(children):
+                    pending_count -= 1
+
+                child_sha = children[child_index]
+                if child_index == 0:
+                    self.chain_index_map[child_sha] = self.chain_index_map[sha]
+                else:
+                    self.chain_index_map[child_sha] = len(self.chains)
+                    self.chains.append((depth + 1, [], self.chain_index_map[sha]))
+
+                stack.append(
+                    [child_sha, depth + 1, self.children_map[child_sha], 0])
+                continue
+
+            stack.pop()
+
+            if pending_count or restore_all:
+                _restore_consumed_entries(sha, self.take_map, self.full_map)
+
+    def hierarchy_log(self, tip_sha):
+        """Hierarchy log of a walked first parent line
+
+        Args:
+            tip_sha (str): sha of the first parent line tip
+
+        Returns:
+            Sequence[ChangeLogEntry]: hierarchy log
+        """
+        path_chains = []
+        chain_index = self.chain_index_map[tip_sha]
+
+        while chain_index is not None:
+            path_chains.append(self.chains[chain_index])
+            chain_index = self.chains[chain_index][2]
+
+        return _FirstParentPath(list(reversed(path_chains)), self.depth_map[tip_sha])
+
+
+def linear_log_to_ref_hierarchy_logs(lin_log, ref_sha_map):
+    """Creates the hierarchy logs of multiple refs out of the union of their
+    histories (e.g. git.log_parentlog_refs). The hierarchy below a first parent
+    commit only depends on its ancestors, therefore it is only created once and
+    the returned hierarchy logs share their entries.
+
+    Args:
+        lin_log (List[ChangeLogEntry]): Linear log of all refs
+        ref_sha_map (Dict[str, str]): ref name -> tip sha
+
+    Returns:
+        Dict[str, Sequence[ChangeLogEntry]]: ref name -> hierarchy log
+    """
+    lin_log_map = {x.sha: x for x in lin_log}
+    children_map, roots = _first_parent_trie(lin_log_map, ref_sha_map)
+
+    walk = _FirstParentWalk(lin_log_map, children_map)
+
+    for root_index, root_sha in enumerate(roots):
+        # a later root can be part of the hierarchy of this root (e.g. unrelated
+        # histories merged) and needs the consumed entries as well
+        walk.walk_root(root_sha, restore_all=root_index < len(roots) - 1)
+
+    return {
+        ref_name: walk.hierarchy_log(sha) for ref_name, sha in ref_sha_map.items()
+    }
+
+
+def get_ref_hierarchy_logs(git, refs):
+    """Creates the hierarchy logs of multiple refs with a single git log walk
+    over all refs. Use Tree.from_logs to create the branching tree out of them.
+
+    Args:
+        git (Git): Git instance
+        refs (List[str]): Refs (branch, tag, sha)
+
+    Returns:
+        Dict[str, Sequence[ChangeLogEntry]]: ref name -> hierarchy log
+    """
+    return linear_log_to_ref_hierarchy_logs(
+        git.log_parentlog_refs(refs),
+        git.rev_parse_commits(refs),
+    )
+
+
+def iter_hierarchy_log(hier_log):
+    """Flattens a hierarchy log without copying its entries. Yields views on the
+    original entries with the hierarchy elements (branch_offs, other_parents) hidden
+    in the same order as hierarchy_log_to_linear_log
+
+    Args:
+        hier_log (List[ChangeLogEntry]): the list of log entries
+
+    Yields:
+        ChangeLogEntryView: view on the log entry without hierarchy
+    """
+    for entry in _iter_hierarchy_entries(hier_log):
+        yield entry.view_without_hierarchy()
+
+
 def hierarchy_log_to_linear_log_entry(entry):
     """For a log entry remove hierarchy and return
     as linear log
@@ -85,14 +415,7 @@ def hierarchy_log_to_linear_log_entry(entry):
     Returns:
         List[ChangeLogEntry]: Linear Log
     """
-
-    parent_hier_logs = entry.other_parents
-    lin_log = [entry.copy_without_hierarchy()]
-
-    for p_hier_log in parent_hier_logs:
-        lin_log.extend(hierarchy_log_to_linear_log(p_hier_log))
-
-    return lin_log
+    return hierarchy_log_to_linear_log([entry])
 
 
 def hierarchy_log_to_linear_log(hier_log):
@@ -105,12 +428,9 @@ def hierarchy_log_to_linear_log(hier_log):
     Returns:
         List[ChangeLogEntry]: Linear Log
     """
-    lin_log = []
-
-    for entry in hier_log:
-        lin_log.extend(hierarchy_log_to_linear_log_entry(entry))
-
-    return lin_log
+    return [
+        x.copy_without_hierarchy() for x in _iter_hierarchy_entries(hier_log)
+    ]
 
 
 def changelog_hydration(log, git, changelog_map=None):
@@ -136,21 +456,26 @@ def changelog_hydration(log, git, changelog_map=None):
         )
         changelog_map = {x.sha: x for x in changelog}
 
-    for index, entry in enumerate(log):
-        if entry.sha in changelog_map:
-            changelog_entry = changelog_map[entry.sha]
-        else:
-            changelog_entry = git.show_changelog_entry(entry.sha)
+    # explicit stack instead of recursion (see _attach_other_parents)
+    stack = [log]
+
+    while stack:
+        sub_log = stack.pop()
+
+        for index, entry in enumerate(sub_log):
+            if entry.sha in changelog_map:
+                changelog_entry = changelog_map[entry.sha]
+            else:
+                changelog_entry = git.show_changelog_entry(entry.sha)
+
+            assert entry.sha == changelog_entry.sha
+            assert entry.parent_shas == changelog_entry.parent_shas
 
-        assert entry.sha == changelog_entry.sha
-        assert entry.parent_shas == changelog_entry.parent_shas
+            sub_log[index] = changelog_entry
 
-        log[index] = changelog_entry
+            for o_parent in entry.other_parents:
+                # hydrated in place once popped from the stack
+                changelog_entry.other_parents.append(o_parent)
+                stack.append(o_parent)
 
-        for o_parent in entry.other_parents:
-            changelog_entry.other_parents.append(changelog_hydration(
-                o_parent,
-                git,
-                changelog_map,
-            ))
     return log
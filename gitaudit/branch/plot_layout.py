@@ -0,0 +1,58 @@
+"""Incremental layout helpers of the tree plot
+"""
+
+from math import isclose
+from typing import Optional
+
+
+class ShiftTracker:  # pylint: disable=too-few-public-methods
+    """Detects during a top to bottom layout update from which item on the previous
+    layout of the remaining items is only shifted by a constant. This requires that the
+    last processed item of every lane with remaining items and the targets of pending
+    connections are shifted by the same amount.
+    """
+
+    def __init__(self, plot, affected_index: Optional[int]) -> None:
+        self.plot = plot
+        self.affected_index = affected_index
+        self.shift = None
+        self.lane_shift_map = {}
+        self.item_shift_map = {}
+
+        if affected_index is not None:
+            self.lane_remaining_map = {x.ref_name: len(x.items) for x in plot.lanes}
+
+    def _is_shifted(self, shift):
+        return shift is not None and isclose(shift, self.shift, abs_tol=1e-9)
+
+    def converged(self, index, item, prev_value, value, check_connections=True) -> bool:
+        """Registers the processed item and returns whether the layout converged
+
+        Returns:
+            bool: True if the remaining items can be shifted
+        """
+        if self.affected_index is None:
+            return False
+
+        ref_name = self.plot.id_lane_map[item.id].ref_name
+        self.lane_remaining_map[ref_name] -= 1
+        self.shift = None if prev_value is None else value - prev_value
+        self.lane_shift_map[ref_name] = self.shift
+        self.item_shift_map[item.id] = self.shift
+
+        if index <= self.affected_index or self.shift is None:
+            return False
+
+        for lane_ref_name, remaining in self.lane_remaining_map.items():
+            if remaining and lane_ref_name in self.lane_shift_map \
+                    and not self._is_shifted(self.lane_shift_map[lane_ref_name]):
+                return False
+
+        if check_connections:
+            for connection in self.plot.connections:
+                if connection.from_id not in self.item_shift_map \
+                        and connection.to_id in self.item_shift_map \
+                        and not self._is_shifted(self.item_shift_map[connection.to_id]):
+                    return False
+
+        return True
@@ -1,9 +1,12 @@
 """Plots a Tree
 """
 
-from datetime import timedelta
-from typing import List, Dict, Tuple, Optional
+import re
+from math import isclose
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple, Optional, TextIO
 from dataclasses import dataclass, field
+from xml.sax.saxutils import escape, quoteattr
 
 from svgdiagram.elements.circle import Circle
 from svgdiagram.elements.rect import Rect
@@ -15,27 +18,115 @@ from svgdiagram.elements.text import Text, HorizontalAlignment, VerticalAlignmen
 
 from gitaudit.git.change_log_entry import ChangeLogEntry
 from .tree import Tree
+from .plot_layout import ShiftTracker
 
 
 SECONDS_IN_DAY = timedelta(days=1).total_seconds()
 MAX_GAP = 50
 
+# text metrics used for streamed svgs (monospace)
+STREAM_FONT_SIZE = 16
+STREAM_CHAR_WIDTH = 0.6 * STREAM_FONT_SIZE
+
+
+class TextMetricsCache:
+    """Cache for the measured sizes of commit labels. For monospace fonts labels with the
+    same length and the same content class (word characters, whitespace and punctuation
+    at the same places) have the same size, so each label shape is measured only once.
+    """
+
+    def __init__(self) -> None:
+        self.size_map = {}
+
+    @staticmethod
+    def content_class(text: str, font_family: str) -> str:
+        """Returns the content class of a text
+
+        Args:
+            text (str): text content
+            font_family (str): font family
+
+        Returns:
+            str: content class (the text itself for non monospace fonts)
+        """
+        if font_family != 'monospace':
+            return text
+        return re.sub(r'\s', ' ', re.sub(r'\w', 'w', text))
+
+    def label_sizes(self, text: str, font_family: str = 'monospace'):
+        """Returns the sizes of a commit label text and of the label (text with
+        surrounding rounded rect)
+
+        Args:
+            text (str): label text
+            font_family (str, optional): font family. Defaults to 'monospace'.
+
+        Returns:
+            Tuple[Tuple[float, float], Tuple[float, float]]: text size and label size
+        """
+        key = (font_family, len(text), self.content_class(text, font_family))
+
+        if key not in self.size_map:
+            text_svg, label_svg = create_label_svg(text, font_family)
+            self.size_map[key] = (text_svg.size, label_svg.size)
+
+        return self.size_map[key]
+
+
+def create_label_svg(text: str, font_family: str = 'monospace', text_size=None):
+    """Creates a commit label (text with surrounding rounded rect)
+
+    Args:
+        text (str): label text
+        font_family (str, optional): font family. Defaults to 'monospace'.
+        text_size (Tuple[float, float], optional): known size of the text, measured
+            if not provided. Defaults to None.
+
+    Returns:
+        Tuple[Text, Group]: text element and label group
+    """
+    text_svg = Text(
+        15,
+        0,
+        text,
+        horizontal_alignment=HorizontalAlignment.LEFT,
+        font_family=font_family,
+    )
+    text_width, text_height = text_size if text_size else text_svg.size
+    rect = Rect(10, - text_height/2-2, text_width+10,
+                text_height+4, rx=8, ry=8, stroke="transparent")
+
+    return text_svg, Group([rect, text_svg])
+
+
+TEXT_METRICS_CACHE = TextMetricsCache()
+
 
 @dataclass
-class TreeLaneItem:
+class TreeLaneItem:  # pylint: disable=too-many-instance-attributes
     """TreeLaneItem
     """
     entry: ChangeLogEntry
     ypos: Optional[float] = None
     offset: Optional[float] = None
+    # vertical position before the linear position correction
+    raw_ypos: Optional[float] = None
+    # running vertical layout offset after positioning this item
+    layout_offset: Optional[float] = None
     commit_text_svg: Optional[SvgElement] = None
     commit_circle_svg: Optional[SvgElement] = None
+    commit_text_size: Optional[Tuple[float, float]] = None
     svgs: List[SvgElement] = field(default_factory=list)
+    collapsed_entries: List[ChangeLogEntry] = field(default_factory=list)
+    continuation_count: int = 0
+    continuation_ref_name: Optional[str] = None
 
     @property
     def id(self):  # pylint: disable=invalid-name
         """ID of the tree lane item
         """
+        if self.is_continuation:
+            return f"{self.entry.sha}~{self.continuation_ref_name}"
         return self.entry.sha
 
     @property
@@ -44,6 +135,18 @@ class TreeLaneItem:
         """
         return self.entry.commit_date
 
+    @property
+    def is_collapsed(self):
+        """Whether the item represents a run of collapsed commits
+        """
+        return bool(self.collapsed_entries)
+
+    @property
+    def is_continuation(self):
+        """Whether the item is a stub summarizing the commits outside of the viewport
+        """
+        return bool(self.continuation_count)
+
     @property
     def pos_info(self):
         """position info of the tree lane item
@@ -51,6 +154,27 @@ class TreeLaneItem:
         return self.ypos, self.offset
 
 
+@dataclass
+class Viewport:
+    """Visible part of a tree plot
+
+    since: commits before are not plotted but summarized as continuation stubs
+    refs: refs that are plotted (all if not set)
+    """
+    since: Optional[datetime] = None
+    refs: Optional[List[str]] = None
+
+    def contains_ref(self, ref_name: str) -> bool:
+        """Whether the lane of a ref is visible
+        """
+        return self.refs is None or ref_name in self.refs
+
+    def contains_entry(self, entry: ChangeLogEntry) -> bool:
+        """Whether a commit is visible
+        """
+        return not self.since or not entry.commit_date or entry.commit_date >= self.since
+
+
 @dataclass
 class TreeConnection:
     """Tree Connection
@@ -66,6 +190,7 @@ class TreeLane:  # pylint: disable=too-few-public-methods
     def __init__(self, ref_name: str, xpos: float, extend_to_top: bool = True) -> None:
         self.ref_name = ref_name
         self.items = []
+        self.item_index_map = {}
 
         self.xpos = xpos
         self.extend_to_top = extend_to_top
@@ -77,8 +202,20 @@ class TreeLane:  # pylint: disable=too-few-public-methods
         Args:
             item (TreeLaneItem): New tree item
         """
+        self.item_index_map[item.id] = len(self.items)
         self.items.append(item)
 
+    def index_of(self, item: TreeLaneItem) -> int:
+        """Position of an item within the lane
+
+        Args:
+            item (TreeLaneItem): tree lane item
+
+        Returns:
+            int: index in the lane items
+        """
+        return self.item_index_map[item.id]
+
 
 class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
     """Class for plotting a branching tree
@@ -95,7 +232,37 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
             show_commit_callback=None,
             sha_svg_append_callback=None,
             ref_name_formatting_callback=None,
+            collapse_min_count: int = None,
+            collapse_commit_callback=None,
+            viewport: Viewport = None,
     ) -> None:
+        """Constructor
+
+        Args:
+            tree (Tree): tree to be plotted
+            active_refs (List[str], optional): refs whose lanes are extended to the top.
+                Defaults to None.
+            ref_color_map (Dict[str, str], optional): ref name -> color. Defaults to None.
+            graph_stroke_width_px (int, optional): stroke width of the graph.
+                Defaults to 1.
+            column_spacing (float, optional): horizontal lane spacing. Defaults to 200.0.
+            apply_linear_vert_pos_correction (bool, optional): Defaults to True.
+            show_commit_callback (optional): whether a commit within a segment is
+                plotted. Defaults to None (only segment ends are plotted).
+            sha_svg_append_callback (optional): additional svg elements for a commit.
+                Defaults to None.
+            ref_name_formatting_callback (optional): svg element for a ref name.
+                Defaults to None.
+            collapse_min_count (int, optional): level of detail mode. Runs of at least
+                collapse_min_count consecutive collapsible commits in a segment are
+                plotted as a single "N commits" item. Defaults to None (disabled).
+            collapse_commit_callback (optional): whether a plotted commit may be
+                collapsed. Segment ends are never collapsed. Defaults to None (all
+                commits are collapsible).
+            viewport (Viewport, optional): only lanes of the viewport refs and commits
+                since the viewport date are laid out, older commits of a lane are
+                summarized in a continuation stub. Defaults to None (everything).
+        """
         super().__init__()
         self.tree = tree
         self.active_refs = active_refs if active_refs else []
@@ -104,31 +271,36 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
         self.apply_linear_vert_pos_correction = apply_linear_vert_pos_correction
         self.directly_connected_to_root_refs = []
         self.column_spacing = column_spacing
-        self.end_sha_seg_map = {
-            seg.end_sha: seg for seg in self.tree.flatten_segments()
-        }
         self.end_ref_name_seg_map = {
-            x.branch_name: x for x in self.tree.flatten_segments()}
+            x.branch_name: x for x in self.tree.iter_segments()}
 
         self.show_commit_callback = show_commit_callback
         self.sha_svg_append_callback = sha_svg_append_callback
         self.ref_name_formatting_callback = ref_name_formatting_callback
+        self.collapse_min_count = collapse_min_count
+        self.collapse_commit_callback = collapse_commit_callback
+        self.viewport = viewport if viewport else Viewport()
 
         self.lanes: List[TreeLane] = []
         self.connections = []
-        self.laned_segment_end_shas = []
+        self.laned_segment_end_shas = set()
         self.id_item_map = {}
         self.id_lane_map = {}
+        self.sorted_items = None
+        self.laid_out = False
 
         self.group_lines = Group()
         self.append_child(self.group_lines)
 
     def _sorted_items(self) -> List[TreeLaneItem]:
-        return sorted(
-            self.id_item_map.values(),
-            key=lambda x: x.date_time,
-            reverse=True,
-        )
+        # items do not change after the lanes are created --> sort only once
+        if self.sorted_items is None:
+            self.sorted_items = sorted(
+                self.id_item_map.values(),
+                key=lambda x: x.date_time,
+                reverse=True,
+            )
+        return self.sorted_items
 
     def _get_end_seg_counts(self) -> Dict[str, Tuple[int, int]]:
         """For the given tree return the segment / sha count from each end point to the root
@@ -154,7 +326,8 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
             while curr_segment.end_sha != root_end_segment.end_sha:
                 if curr_segment.branch_name != root_ref_name:
                     # go down
-                    curr_segment = self.end_sha_seg_map[curr_segment.start_entry.parent_shas[0]]
+                    curr_segment = self.tree.segment_of(
+                        curr_segment.start_entry.parent_shas[0])
                     if curr_segment.branch_name != root_ref_name:
                         seg_count += 1
                         sha_count += curr_segment.length
@@ -190,22 +363,67 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
 
         return sorted(end_ref_names, key=lambda x: ref_name_counts[x])
 
+    def _is_collapsible(self, entry: ChangeLogEntry) -> bool:
+        if not self.collapse_min_count:
+            return False
+        if self.collapse_commit_callback:
+            return self.collapse_commit_callback(entry)
+        return True
+
+    def _append_collapsed_run(self, lane: TreeLane, run: List[ChangeLogEntry]):
+        if len(run) >= self.collapse_min_count:
+            lane.append_item(TreeLaneItem(entry=run[0], collapsed_entries=run))
+        else:
+            for entry in run:
+                lane.append_item(TreeLaneItem(entry=entry))
+
+    def _append_segment_items(self, lane: TreeLane, segment):
+        run = []
+
+        for entry in segment.entries[1:]:
+            if not self.viewport.contains_entry(entry):
+                break
+
+            if not self.show_commit_callback(entry):
+                continue
+
+            if self._is_collapsible(entry):
+                run.append(entry)
+                continue
+
+            if run:
+                self._append_collapsed_run(lane, run)
+                run = []
+
+            lane.append_item(TreeLaneItem(entry=entry))
+
+        if run:
+            self._append_collapsed_run(lane, run)
+
     def _create_lane(self, ref_name, hpos):
         print(f'Create Lane: {ref_name}')
         lane = TreeLane(ref_name, hpos)
         segment = self.end_ref_name_seg_map[ref_name]
 
         while segment:
-            self.laned_segment_end_shas.append(segment.end_sha)
+            if not self.viewport.contains_entry(segment.end_entry):
+                lane.append_item(TreeLaneItem(
+                    entry=segment.end_entry,
+                    continuation_count=sum(
+                        x.length for x in self.tree.path_to_root(segment.end_sha)),
+                    continuation_ref_name=ref_name,
+                ))
+                break
+
+            self.laned_segment_end_shas.add(segment.end_sha)
             lane.append_item(TreeLaneItem(entry=segment.end_entry))
 
             if self.show_commit_callback:
-                for entry in segment.entries[1:]:
-                    if self.show_commit_callback(entry):
-                        lane.append_item(TreeLaneItem(entry=entry))
+                self._append_segment_items(lane, segment)
 
             if segment.start_entry.parent_shas:
-                new_segment = self.end_sha_seg_map[segment.start_entry.parent_shas[0]]
+                new_segment = self.tree.segment_of(
+                    segment.start_entry.parent_shas[0])
                 if new_segment.end_sha not in self.laned_segment_end_shas:
                     segment = new_segment
                 else:
@@ -215,7 +433,7 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
                         to_id=lane.items[-1].id,
                         from_id=from_id,
                     ))
-                    if self.end_sha_seg_map[from_id].branch_name == self.tree.root.branch_name:
+                    if self.tree.segment_of(from_id).branch_name == self.tree.root.branch_name:
                         self.directly_connected_to_root_refs.append(ref_name)
                     segment = None
             else:
@@ -227,6 +445,12 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
         ref_order_names = self.determine_ref_name_order()
         self.directly_connected_to_root_refs.append(self.tree.root.branch_name)
 
+        ref_order_names = list(filter(
+            lambda x: self.viewport.contains_ref(x)
+            and self.viewport.contains_entry(self.end_ref_name_seg_map[x].end_entry),
+            ref_order_names,
+        ))
+
         for index, ref_name in enumerate(ref_order_names):
             lane = self._create_lane(ref_name, index * 300)
 
@@ -236,31 +460,36 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
 
             self.lanes.append(lane)
 
+        self.sorted_items = None
+
+    @staticmethod
+    def _commit_label(item: TreeLaneItem) -> str:
+        if item.is_collapsed:
+            return f"{len(item.collapsed_entries)} commits"
+        if item.is_continuation:
+            return f"{item.continuation_count} earlier commits"
+        return f"{item.entry.sha[0:7]} ({item.entry.commit_date.date().isoformat()})"
+
     def _create_commit_svg_elems(self):
         for item in self._sorted_items():
             lane = self.id_lane_map[item.id]
             ref_color = self.ref_color_map.get(lane.ref_name, 'black')
-            if self.sha_svg_append_callback:
-                item.svgs = self.sha_svg_append_callback(item.entry)
-
-            item.commit_circle_svg = Circle(
-                0, 0, 5,
-                stroke=ref_color,
-                stroke_width_px=self.graph_stroke_width_px,
-            )
+            if item.is_collapsed or item.is_continuation:
+                item.commit_circle_svg = Rect(
+                    -5, -10, 10, 20, rx=5, ry=5, stroke=ref_color)
+            else:
+                if self.sha_svg_append_callback:
+                    item.svgs = self.sha_svg_append_callback(item.entry)
 
-            text = Text(
-                15,
-                0,
-                f"{item.entry.sha[0:7]} ({item.entry.commit_date.date().isoformat()})",
-                horizontal_alignment=HorizontalAlignment.LEFT,
-                font_family='monospace',
-            )
-            text_width, text_height = text.size
-            rect = Rect(10, - text_height/2-2, text_width+10,
-                        text_height+4, rx=8, ry=8, stroke="transparent")
+                item.commit_circle_svg = Circle(
+                    0, 0, 5,
+                    stroke=ref_color,
+                    stroke_width_px=self.graph_stroke_width_px,
+                )
 
-            item.commit_text_svg = Group([rect, text])
+            label = self._commit_label(item)
+            text_size, item.commit_text_size = TEXT_METRICS_CACHE.label_sizes(label)
+            _, item.commit_text_svg = create_label_svg(label, text_size=text_size)
 
     def _create_lane_ref_svg_elems(self):
         for lane in self.lanes:
@@ -279,7 +508,8 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
     def _create_commit_svg_element(self, xpos: float, ypos: float, item: TreeLaneItem):
         return_elems = []
 
-        _, text_height = item.commit_text_svg.size
+        _, text_height = item.commit_text_size if item.commit_text_size \
+            else item.commit_text_svg.size
         _, circle_height = item.commit_circle_svg.size
 
         commit_height = max(text_height, circle_height)
@@ -314,7 +544,23 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
 
         return return_elems
 
-    def _calculate_positions(self):  # pylint: disable=too-many-locals
+    def _calculate_positions(self, affected_index: int = None):  # pylint: disable=too-many-locals
+        """Calculates the vertical item positions from the top to the bottom.
+
+        Args:
+            affected_index (int, optional): In case of an update, index of the last
+                sorted item that is new or has changed connections. Once the layout below
+                is only shifted compared to the previous layout, the remaining items are
+                shifted instead of being recalculated. Defaults to None (full layout).
+
+        Returns:
+            Optional[Tuple[int, float]]: index from which on the previous layout was
+                shifted and the shift (None if all items were calculated)
+        """
+        if not self.lanes:
+            # no ref within the viewport
+            return None
+
         lane_progess_map = {}
         lane_initial_datetime_map = {
             x.ref_name: x.items[0].date_time for x in self.lanes
@@ -329,9 +575,11 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
             lane.xpos = index*self.column_spacing
 
         from_ids = {x.from_id: x for x in self.connections}
+        sorted_items = self._sorted_items()
+        shift_tracker = ShiftTracker(self, affected_index)
 
         # plot items
-        for item in self._sorted_items():
+        for index, item in enumerate(sorted_items):
             lane = self.id_lane_map[item.id]
 
             days_from_offset = (
@@ -348,11 +596,16 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
                 to_ypos, to_offset = self.id_item_map[connect.to_id].pos_info
                 curr_offset = max(curr_offset, to_ypos + to_offset + 20)
 
+            prev_raw_ypos = item.raw_ypos
+            prev_layout_offset = item.layout_offset
+
             item.ypos = max(
                 curr_offset,
                 lane_progess_map[lane.ref_name] +
                 10 if lane.ref_name in lane_progess_map else curr_offset,
             )
+            item.raw_ypos = item.ypos
+            item.layout_offset = curr_offset
 
             offset = 0
             if item.svgs:
@@ -366,37 +619,153 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
             curr_offset_date = item.date_time
             lane_progess_map[lane.ref_name] = item.ypos + offset
 
-    def _linear_position_correction(self):
-        if not self.apply_linear_vert_pos_correction:
-            return
+            if shift_tracker.converged(index, item, prev_raw_ypos, item.raw_ypos) \
+                    and isclose(
+                        item.layout_offset - prev_layout_offset,
+                        shift_tracker.shift, abs_tol=1e-9):
+                for rest_item in sorted_items[index+1:]:
+                    rest_item.raw_ypos += shift_tracker.shift
+                    rest_item.layout_offset += shift_tracker.shift
+                    rest_item.ypos = rest_item.raw_ypos
+                return index, shift_tracker.shift
+
+        return None
 
+    def _linear_position_correction(  # pylint: disable=too-many-locals
+            self, shifted_from=None, prev_ypos_map=None):
+        """Interpolates item positions linearly by date between their neighbours
+
+        Args:
+            shifted_from (Tuple[int, float], optional): In case of an update, index from
+                which on the positions before correction are shifted and the shift.
+                Defaults to None (full correction).
+            prev_ypos_map (Dict[str, float], optional): corrected positions of the
+                previous layout (required for updates). Defaults to None.
+        """
         items = self._sorted_items()
-        for index, item in enumerate(items):
-            if index in {0, len(items)-1}:
-                continue
+        shift_tracker = ShiftTracker(
+            self,
+            # the correction of an item depends on the position of the next item
+            max(shifted_from[0] - 2, 0) if shifted_from else None,
+        )
 
+        for index, item in enumerate(items):
             lane = self.id_lane_map[item.id]
 
-            prev_y = items[index+1].ypos
-            prev_d = items[index+1].date_time
-            next_y = items[index-1].ypos
-            next_d = items[index-1].date_time
+            if self.apply_linear_vert_pos_correction and 0 < index < len(items)-1:
+                prev_y = items[index+1].raw_ypos
+                prev_d = items[index+1].date_time
+                next_y = items[index-1].ypos
+                next_d = items[index-1].date_time
 
-            prev_next_ts = (next_d-prev_d).total_seconds()
+                prev_next_ts = (next_d-prev_d).total_seconds()
 
-            if prev_next_ts >= 0.001:
-                item.ypos = prev_y + (next_y-prev_y) * \
-                    (item.date_time-prev_d).total_seconds() / prev_next_ts
+                if prev_next_ts >= 0.001:
+                    item.ypos = prev_y + (next_y-prev_y) * \
+                        (item.date_time-prev_d).total_seconds() / prev_next_ts
+                else:
+                    item.ypos = (prev_y + next_y) / 2.0
+
+                item_lane_index = lane.index_of(item)
+                if item_lane_index > 0:
+                    prev_lane_item = lane.items[item_lane_index-1]
+                    item.ypos = max(
+                        item.ypos,
+                        prev_lane_item.ypos + prev_lane_item.offset + 20,
+                    )
             else:
-                item.ypos = (prev_y + next_y) / 2.0
-
-            item_lane_index = lane.items.index(item)
-            if item_lane_index > 0:
-                prev_lane_item = lane.items[item_lane_index-1]
-                item.ypos = max(
-                    item.ypos,
-                    prev_lane_item.ypos + prev_lane_item.offset + 20,
-                )
+                item.ypos = item.raw_ypos
+
+            if shift_tracker.converged(
+                    index, item, prev_ypos_map.get(item.id) if prev_ypos_map else None,
+                    item.ypos, check_connections=False) \
+                    and isclose(shift_tracker.shift, shifted_from[1], abs_tol=1e-9):
+                for rest_item in items[index+1:]:
+                    rest_item.ypos = prev_ypos_map[rest_item.id] + shift_tracker.shift
+                return
+
+    def layout(self):
+        """Creates the lanes and calculates the item positions (only once). The svg
+        element hierarchy is not created.
+        """
+        if self.laid_out:
+            return
+
+        self._create_lanes()
+        self._calculate_positions()
+        self._linear_position_correction()
+        self.laid_out = True
+
+    def _reset_layout(self):
+        self.end_ref_name_seg_map = {
+            x.branch_name: x for x in self.tree.iter_segments()}
+        self.directly_connected_to_root_refs = []
+        self.lanes = []
+        self.connections = []
+        self.laned_segment_end_shas = set()
+        self.id_item_map = {}
+        self.id_lane_map = {}
+        self.sorted_items = None
+        self.laid_out = False
+
+    def update(  # pylint: disable=too-many-locals
+            self, ref_log_map: Dict[str, List[ChangeLogEntry]]):
+        """Appends new hierarchy logs to the tree and updates the layout. The lanes are
+        recreated, but only the positions of the top region that is affected by the new
+        commits are recalculated, the positions below are shifted. In case existing lanes
+        are reordered a full layout is done.
+
+        Args:
+            ref_log_map (Dict[str, List[ChangeLogEntry]]): ref name -> hierarchy log
+        """
+        self.layout()
+
+        prev_item_map = self.id_item_map
+        prev_lane_names = [x.ref_name for x in self.lanes]
+        prev_item_lane_map = {
+            item_id: lane.ref_name for item_id, lane in self.id_lane_map.items()}
+        prev_connections = {(x.from_id, x.to_id) for x in self.connections}
+
+        for ref_name, hier_log in ref_log_map.items():
+            self.tree.append_log(hier_log, ref_name)
+
+        self._reset_layout()
+        self._create_lanes()
+
+        connections = {(x.from_id, x.to_id) for x in self.connections}
+
+        if [x.ref_name for x in self.lanes if x.ref_name in prev_lane_names] != prev_lane_names \
+                or not prev_item_map.keys() <= self.id_item_map.keys() \
+                or not prev_connections <= connections:
+            self._calculate_positions()
+            self._linear_position_correction()
+            self.laid_out = True
+            return
+
+        affected_index = 0
+        prev_ypos_map = {}
+
+        for index, item in enumerate(self._sorted_items()):
+            prev_item = prev_item_map.get(item.id)
+
+            if not prev_item or prev_item_lane_map[item.id] != self.id_lane_map[item.id].ref_name:
+                affected_index = index
+                continue
+
+            item.raw_ypos = prev_item.raw_ypos
+            item.layout_offset = prev_item.layout_offset
+            item.offset = prev_item.offset
+            prev_ypos_map[item.id] = prev_item.ypos
+
+        sorted_index_map = {x.id: index for index, x in enumerate(self._sorted_items())}
+
+        for from_id, to_id in connections - prev_connections:
+            affected_index = max(
+                affected_index, sorted_index_map[from_id], sorted_index_map[to_id])
+
+        shifted_from = self._calculate_positions(affected_index)
+        self._linear_position_correction(shifted_from, prev_ypos_map)
+        self.laid_out = True
 
     def _render_lanes(self):
         for lane in self.lanes:
@@ -465,13 +834,130 @@ class TreePlot(Svg):  # pylint: disable=too-many-instance-attributes
         Returns:
             Svg: Svg Object
         """
-        self._create_lanes()
+        # reuse the layout of layout(), update(), or write_svg()
+        self.layout()
         self._create_lane_ref_svg_elems()
         self._create_commit_svg_elems()
-        self._calculate_positions()
-        self._linear_position_correction()
+
+        if self.sha_svg_append_callback:
+            # appended svg elements change the item offsets
+            self._calculate_positions()
+            self._linear_position_correction()
+
         self._render_lanes()
         self._render_positions()
         self._render_connections()
 
         return super()._layout(x_con_min, x_con_max, y_con_min, y_con_max)
+
+    def _stream_viewbox(self):
+        if not self.lanes:
+            return (0, 0, 0, 0)
+
+        label_width = max(
+            (len(self._commit_label(x)) for x in self._sorted_items()), default=0,
+        ) * STREAM_CHAR_WIDTH + 20
+        ref_width = max(
+            (len(x.ref_name) for x in self.lanes), default=0,
+        ) * STREAM_CHAR_WIDTH
+
+        x_min = min(x.xpos for x in self.lanes) - ref_width / 2.0 - 10
+        x_max = max(x.xpos for x in self.lanes) + max(label_width, ref_width / 2.0) + 10
+        y_min = min(
+            -10 if x.ref_name in self.active_refs else x.items[0].ypos - 10
+            for x in self.lanes
+        ) - STREAM_FONT_SIZE - 10
+        y_max = max(x.ypos for x in self._sorted_items()) + STREAM_FONT_SIZE + 10
+
+        return tuple(round(x, 2) for x in (x_min, y_min, x_max - x_min, y_max - y_min))
+
+    def _stream_lanes(self, stream: TextIO):
+        lane_prev_ypos = {}
+
+        for item in self._sorted_items():
+            lane = self.id_lane_map[item.id]
+            ref_color = quoteattr(self.ref_color_map.get(lane.ref_name, 'black'))
+
+            if lane.ref_name in lane_prev_ypos:
+                from_ypos = lane_prev_ypos[lane.ref_name]
+            else:
+                from_ypos = 0 if lane.ref_name in self.active_refs else lane.items[0].ypos
+
+            stream.write(
+                f'<path d="M {lane.xpos} {from_ypos} L {lane.xpos} {item.ypos}" '
+                f'stroke={ref_color} stroke-width="{self.graph_stroke_width_px}" '
+                'fill="none"/>\n'
+            )
+            lane_prev_ypos[lane.ref_name] = item.ypos
+
+        for connection in self.connections:
+            f_lane = self.id_lane_map[connection.from_id]
+            f_y, _ = self.id_item_map[connection.from_id].pos_info
+            t_lane = self.id_lane_map[connection.to_id]
+            t_y, _ = self.id_item_map[connection.to_id].pos_info
+            ref_color = quoteattr(self.ref_color_map.get(t_lane.ref_name, 'black'))
+            stream.write(
+                f'<path d="M {f_lane.xpos} {f_y} L {t_lane.xpos} {f_y} '
+                f'L {t_lane.xpos} {t_y}" stroke={ref_color} '
+                f'stroke-width="{self.graph_stroke_width_px}" fill="none"/>\n'
+            )
+
+    def _stream_items(self, stream: TextIO):
+        for item in self._sorted_items():
+            lane = self.id_lane_map[item.id]
+            ref_color = quoteattr(self.ref_color_map.get(lane.ref_name, 'black'))
+            label = self._commit_label(item)
+            label_width = round(len(label) * STREAM_CHAR_WIDTH, 2)
+
+            if item.is_collapsed or item.is_continuation:
+                stream.write(
+                    f'<rect x="{lane.xpos - 5}" y="{item.ypos - 10}" width="10" '
+                    f'height="20" rx="5" ry="5" stroke={ref_color} fill="white"/>\n'
+                )
+            else:
+                stream.write(
+                    f'<circle cx="{lane.xpos}" cy="{item.ypos}" r="5" stroke={ref_color} '
+                    f'stroke-width="{self.graph_stroke_width_px}" fill="white"/>\n'
+                )
+
+            stream.write(
+                f'<rect x="{lane.xpos + 10}" y="{item.ypos - STREAM_FONT_SIZE / 2.0 - 2}" '
+                f'width="{label_width + 10}" height="{STREAM_FONT_SIZE + 4}" rx="8" ry="8" '
+                'stroke="transparent" fill="white"/>\n'
+                f'<text x="{lane.xpos + 15}" y="{item.ypos}" font-family="monospace" '
+                f'font-size="{STREAM_FONT_SIZE}" dominant-baseline="middle">'
+                f'{escape(label)}</text>\n'
+            )
+
+        for lane in self.lanes:
+            ypos = -10 if lane.ref_name in self.active_refs else lane.items[0].ypos - 10
+            stream.write(
+                f'<text x="{lane.xpos}" y="{ypos}" font-family="monospace" '
+                f'font-size="{STREAM_FONT_SIZE}" text-anchor="middle">'
+                f'{escape(lane.ref_name)}</text>\n'
+            )
+
+    def write_svg(self, stream: TextIO):
+        """Writes the plot as svg text directly to a stream. In contrast to rendering the
+        TreePlot as an Svg element, no svg element hierarchy is created and only the layout
+        coordinates are kept in memory. Custom svg elements (sha_svg_append_callback and
+        ref_name_formatting_callback) are not supported.
+
+        Args:
+            stream (TextIO): stream the svg text is written to (e.g. an opened file)
+        """
+        assert not self.sha_svg_append_callback and not self.ref_name_formatting_callback, \
+            "Svg element callbacks are not supported when streaming!"
+
+        self.layout()
+
+        x_min, y_min, width, height = self._stream_viewbox()
+
+        stream.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{width}" height="{height}" '
+            f'viewBox="{x_min} {y_min} {width} {height}">\n'
+        )
+        self._stream_lanes(stream)
+        self._stream_items(stream)
+        stream.write('</svg>\n')
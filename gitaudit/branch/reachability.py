@@ -0,0 +1,321 @@
+"""In-Memory commit graph index for answering ancestry queries
+"""
+
+from heapq import heappush, heappop
+from typing import List, Dict, Optional
+
+from gitaudit.git.change_log_entry import ChangeLogEntry
+
+
+_PARENT1 = 1
+_PARENT2 = 2
+_STALE = 4
+
+
+class CommitGraph:  # pylint: disable=too-many-instance-attributes
+    """Index over a commit DAG (e.g. created from a parent log) for ancestry queries.
+
+    For every commit the topological level (longest path to a root commit) and the
+    generation number (corrected commit date) are calculated. Additionally, each commit
+    is labelled with a depth first search interval so that most reachability queries
+    can be answered without walking the graph. Refs can be registered and are stored
+    as bitmaps per commit for answering which refs contain a commit.
+    """
+
+    def __init__(self, lin_log: List[ChangeLogEntry], refs: Dict[str, str] = None) -> None:
+        """Constructor
+
+        Args:
+            lin_log (List[ChangeLogEntry]): Linear log with sha and parent information.
+                Parents that are not part of the log are ignored.
+            refs (Dict[str, str], optional): ref name -> sha map. Refs found in the
+                entries of the log are registered automatically. Defaults to None.
+        """
+        self.shas = [x.sha for x in lin_log]
+        self.sha_index = {sha: index for index, sha in enumerate(self.shas)}
+        self.parents = [
+            [self.sha_index[p] for p in x.parent_shas if p in self.sha_index]
+            for x in lin_log
+        ]
+        self.commit_timestamps = [
+            int(x.commit_date.timestamp()) if x.commit_date else 0 for x in lin_log
+        ]
+
+        count = len(self.shas)
+        self.levels = [0] * count
+        self.generations = [0] * count
+        self.pre_order = [0] * count
+        self.post_order = [0] * count
+        self.low_order = [0] * count
+        self.topo_order = []
+
+        self._index_graph()
+
+        self.ref_names = []
+        self.ref_index = {}
+        self.ref_shas = []
+        self._ref_masks = None
+
+        for entry in lin_log:
+            for ref_name in entry.refs:
+                self.set_ref(ref_name, entry.sha)
+
+        for ref_name, sha in (refs if refs else {}).items():
+            self.set_ref(ref_name, sha)
+
+    def _index_graph(self):
+        pre_counter = 0
+        visited = [False] * len(self.shas)
+
+        for start in range(len(self.shas)):
+            if visited[start]:
+                continue
+
+            visited[start] = True
+            self.pre_order[start] = pre_counter
+            pre_counter += 1
+            stack = [(start, iter(self.parents[start]))]
+
+            while stack:
+                node, parent_iter = stack[-1]
+
+                for parent in parent_iter:
+                    if not visited[parent]:
+                        visited[parent] = True
+                        self.pre_order[parent] = pre_counter
+                        pre_counter += 1
+                        stack.append((parent, iter(self.parents[parent])))
+                        break
+                else:
+                    stack.pop()
+                    self._finish_node(node)
+
+    def _finish_node(self, node):
+        # all parents are finished before their children (post order)
+        parents = self.parents[node]
+        post = len(self.topo_order)
+
+        self.post_order[node] = post
+        self.topo_order.append(node)
+
+        if parents:
+            self.levels[node] = 1 + max(self.levels[p] for p in parents)
+            self.generations[node] = max(
+                self.commit_timestamps[node],
+                1 + max(self.generations[p] for p in parents),
+            )
+            self.low_order[node] = min(
+                post, min(self.low_order[p] for p in parents))
+        else:
+            self.levels[node] = 1
+            self.generations[node] = max(self.commit_timestamps[node], 1)
+            self.low_order[node] = post
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self.sha_index
+
+    def __len__(self) -> int:
+        return len(self.shas)
+
+    def level(self, sha: str) -> int:
+        """Topological level of a commit (1 for root commits)
+
+        Args:
+            sha (str): sha of the commit
+
+        Returns:
+            int: topological level
+        """
+        return self.levels[self.sha_index[sha]]
+
+    def generation(self, sha: str) -> int:
+        """Generation number (corrected commit date) of a commit
+
+        Args:
+            sha (str): sha of the commit
+
+        Returns:
+            int: generation number
+        """
+        return self.generations[self.sha_index[sha]]
+
+    def _cannot_reach(self, from_node, to_node):
+        if self.levels[to_node] >= self.levels[from_node]:
+            return True
+        if self.generations[to_node] >= self.generations[from_node]:
+            return True
+        return not (
+            self.low_order[from_node] <= self.low_order[to_node]
+            and self.post_order[to_node] <= self.post_order[from_node]
+        )
+
+    def _tree_reaches(self, from_node, to_node):
+        return self.pre_order[from_node] <= self.pre_order[to_node] \
+            and self.post_order[to_node] <= self.post_order[from_node]
+
+    def _reaches(self, from_node, to_node):
+        if from_node == to_node or self._tree_reaches(from_node, to_node):
+            return True
+        if self._cannot_reach(from_node, to_node):
+            return False
+
+        visited = {from_node}
+        stack = [from_node]
+
+        while stack:
+            node = stack.pop()
+            for parent in self.parents[node]:
+                if parent == to_node or self._tree_reaches(parent, to_node):
+                    return True
+                if parent in visited or self._cannot_reach(parent, to_node):
+                    continue
+                visited.add(parent)
+                stack.append(parent)
+
+        return False
+
+    def is_ancestor(self, ancestor_sha: str, descendant_sha: str) -> bool:
+        """Whether a commit is an ancestor of (or equal to) another commit
+
+        Args:
+            ancestor_sha (str): sha of the potential ancestor
+            descendant_sha (str): sha of the potential descendant
+
+        Returns:
+            bool: True if ancestor_sha is reachable from descendant_sha
+        """
+        return self._reaches(
+            self.sha_index[descendant_sha],
+            self.sha_index[ancestor_sha],
+        )
+
+    def merge_bases(self, sha_a: str, sha_b: str) -> List[str]:
+        """Best common ancestors of two commits (same as git merge-base --all)
+
+        Args:
+            sha_a (str): sha of the first commit
+            sha_b (str): sha of the second commit
+
+        Returns:
+            List[str]: best common ancestors ordered by descending generation
+        """
+        node_a = self.sha_index[sha_a]
+        node_b = self.sha_index[sha_b]
+
+        if self._reaches(node_b, node_a):
+            return [sha_a]
+        if self._reaches(node_a, node_b):
+            return [sha_b]
+
+        flags = {node_a: _PARENT1, node_b: _PARENT2}
+        queue = []
+        heappush(queue, (-self.generations[node_a], node_a))
+        heappush(queue, (-self.generations[node_b], node_b))
+        candidates = []
+
+        while any(not flags[node] & _STALE for _, node in queue):
+            _, node = heappop(queue)
+            node_flags = flags[node] & (_PARENT1 | _PARENT2 | _STALE)
+
+            if node_flags & (_PARENT1 | _PARENT2) == _PARENT1 | _PARENT2 \
+                    and not node_flags & _STALE:
+                candidates.append(node)
+                node_flags |= _STALE
+                flags[node] = node_flags
+
+            for parent in self.parents[node]:
+                parent_flags = flags.get(parent, 0)
+                if parent_flags & node_flags == node_flags:
+                    continue
+                flags[parent] = parent_flags | node_flags
+                heappush(queue, (-self.generations[parent], parent))
+
+        bases = [
+            node for node in candidates
+            if not any(
+                other != node and self._reaches(other, node)
+                for other in candidates
+            )
+        ]
+
+        return [
+            self.shas[x] for x in sorted(bases, key=lambda x: -self.generations[x])
+        ]
+
+    def merge_base(self, sha_a: str, sha_b: str) -> Optional[str]:
+        """Best common ancestor of two commits
+
+        Args:
+            sha_a (str): sha of the first commit
+            sha_b (str): sha of the second commit
+
+        Returns:
+            Optional[str]: sha of the merge base, None if there is none
+        """
+        bases = self.merge_bases(sha_a, sha_b)
+        return bases[0] if bases else None
+
+    def set_ref(self, ref_name: str, sha: str):
+        """Registers (or moves) a ref
+
+        Args:
+            ref_name (str): name of the ref
+            sha (str): sha the ref points to
+        """
+        node = self.sha_index[sha]
+
+        if ref_name in self.ref_index:
+            self.ref_shas[self.ref_index[ref_name]] = node
+        else:
+            self.ref_index[ref_name] = len(self.ref_names)
+            self.ref_names.append(ref_name)
+            self.ref_shas.append(node)
+
+        self._ref_masks = None
+
+    def _get_ref_masks(self):
+        if self._ref_masks is not None:
+            return self._ref_masks
+
+        masks = [0] * len(self.shas)
+
+        for bit, node in enumerate(self.ref_shas):
+            masks[node] |= 1 << bit
+
+        # children are finished after their parents --> reverse post order
+        for node in reversed(self.topo_order):
+            if not masks[node]:
+                continue
+            for parent in self.parents[node]:
+                masks[parent] |= masks[node]
+
+        self._ref_masks = masks
+        return masks
+
+    def refs_containing(self, sha: str) -> List[str]:
+        """Returns all registered refs that contain a commit
+
+        Args:
+            sha (str): sha of the commit
+
+        Returns:
+            List[str]: ref names in the order of registration
+        """
+        mask = self._get_ref_masks()[self.sha_index[sha]]
+        return [
+            ref_name for bit, ref_name in enumerate(self.ref_names)
+            if mask >> bit & 1
+        ]
+
+    def ref_contains(self, ref_name: str, sha: str) -> bool:
+        """Whether a registered ref contains a commit
+
+        Args:
+            ref_name (str): name of the ref
+            sha (str): sha of the commit
+
+        Returns:
+            bool: True if the commit is reachable from the ref
+        """
+        mask = self._get_ref_masks()[self.sha_index[sha]]
+        return bool(mask >> self.ref_index[ref_name] & 1)
@@ -3,8 +3,9 @@
 
 from __future__ import annotations
 
-from typing import Optional, List, Dict
-from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Dict, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
 from gitaudit.git.change_log_entry import ChangeLogEntry
 
 
@@ -14,12 +15,14 @@ class Segment(BaseModel):
     entries: List[ChangeLogEntry]
     children: Optional[Dict[str, Segment]] = Field(default_factory=dict)
     branch_name: Optional[str]
+    # number of entries collapsed between the retained entries and the start entry
+    compacted_count: int = 0
 
     @property
     def length(self):
-        """Returns the number of entries in this segment
+        """Returns the number of entries in this segment (including compacted entries)
         """
-        return len(self.entries)
+        return len(self.entries) + self.compacted_count
 
     @property
     def end_sha(self):
@@ -47,15 +50,86 @@ class Segment(BaseModel):
 
     @property
     def shas(self):
-        """Returns all shas in this segment as a list
+        """Returns all (retained) shas in this segment as a list
         """
         return list(map(lambda x: x.sha, self.entries))
 
+    def compact(self, keep_count: int):
+        """Collapses older entries of the segment into a summary stub. The end entry and
+        the start entry (connecting to the parent segment) are always retained.
+
+        Args:
+            keep_count (int): number of newest entries to retain next to the start entry
+        """
+        keep_count = max(keep_count, 1)
+
+        if keep_count >= len(self.entries) - 1:
+            return
+
+        self.compacted_count += len(self.entries) - 1 - keep_count
+        self.entries = self.entries[:keep_count] + self.entries[-1:]
+
+
+class _SegmentSpan:  # pylint: disable=too-few-public-methods
+    """Segment prototype referencing a range of first parent depths (distance from the
+    root commit) of a log without copying any entries
+    """
+
+    def __init__(self, log, start_depth, end_depth, branch_name) -> None:
+        self.log = log
+        self.start_depth = start_depth
+        self.end_depth = end_depth
+        self.branch_name = branch_name
+        self.children = {}
+
+    def sha_at(self, depth):
+        """Returns the sha of the log at a given depth
+        """
+        return self.log[len(self.log) - 1 - depth].sha
+
+    @property
+    def start_sha(self):
+        """Returns the sha of the first entry in this span
+        """
+        return self.sha_at(self.start_depth)
+
+    def to_segment(self):
+        """Creates the segment out of this span (without children)
+        """
+        return Segment(
+            entries=self.log[
+                (len(self.log) - 1 - self.end_depth):(len(self.log) - self.start_depth)
+            ],
+            branch_name=self.branch_name,
+        )
+
+    def to_segment_tree(self):
+        """Creates the segments out of this span and all its descendant spans
+        """
+        root_segment = self.to_segment()
+        queue = [(self, root_segment)]
+
+        while queue:
+            span, segment = queue.pop()
+            for start_sha, child_span in span.children.items():
+                child_segment = child_span.to_segment()
+                segment.children[start_sha] = child_segment
+                queue.append((child_span, child_segment))
+
+        return root_segment
+
 
 class Tree(BaseModel):
     """Branching tree out of segments
     """
     root: Segment = None
+    compacted: bool = False
+
+    # sha -> (segment, position in segment entries), built lazily on first query
+    # and kept up to date when logs are appended
+    _sha_index: Optional[Dict[str, Tuple[Segment, int]]] = PrivateAttr(default=None)
+    # segment start sha -> parent segment
+    _parent_map: Optional[Dict[str, Segment]] = PrivateAttr(default=None)
 
     def append_log(self, hier_log: List[ChangeLogEntry], branch_name: str):
         """Append a new hierarchy log history to the tre
@@ -64,6 +138,8 @@ class Tree(BaseModel):
             hier_log (List[ChangeLogEntry]): to be appended log
             branch_name (str): name of the branch / ref
         """
+        assert not self.compacted, "Logs cannot be appended to a compacted tree!"
+
         new_segment = Segment(
             entries=hier_log,
             branch_name=branch_name,
@@ -71,10 +147,11 @@ class Tree(BaseModel):
 
         if not self.root:
             self.root = new_segment
+            self._index_segment(new_segment, None)
         else:
             self._merge_segment(new_segment)
 
-    def _merge_segment(self, new_segment: Segment):
+    def _merge_segment(self, new_segment: Segment):  # pylint: disable=too-many-branches
         index = -1
 
         assert self.root.entries[index].sha == new_segment.entries[index].sha, \
@@ -110,14 +187,15 @@ class Tree(BaseModel):
                         index = -1
                     else:
                         current_segment.children[new_segment.start_sha] = new_segment
+                        self._index_segment(new_segment, current_segment)
                         new_segment = None
                 else:
                     if parent_segment:
                         parent_segment.children[new_segment.start_sha] = new_segment
-                        new_segment = None
                     else:
                         self.root = new_segment
-                        new_segment = None
+                    self._index_segment(new_segment, parent_segment)
+                    new_segment = None
             else:
                 current_segment_pre = Segment(
                     entries=current_segment.entries[(index+1):],
@@ -126,8 +204,10 @@ class Tree(BaseModel):
                 current_segment_post = Segment(
                     entries=current_segment.entries[:(index+1)],
                     branch_name=current_segment.branch_name,
-                    children=current_segment.children,
                 )
+                # assigned after construction so that validation does not copy the
+                # child segments
+                current_segment_post.children = current_segment.children
                 new_segment_post = Segment(
                     entries=new_segment.entries[:(index+1)],
                     branch_name=new_segment.branch_name,
@@ -138,10 +218,213 @@ class Tree(BaseModel):
 
                 if parent_segment:
                     parent_segment.children[current_segment_pre.start_sha] = current_segment_pre
-                    new_segment = None
                 else:
                     self.root = current_segment_pre
-                    new_segment = None
+
+                self._index_segment(current_segment_pre, parent_segment)
+                self._index_segment(current_segment_post, current_segment_pre)
+                self._index_segment(new_segment_post, current_segment_pre)
+                new_segment = None
+
+    @classmethod
+    def from_logs(cls, ref_log_map: Dict[str, List[ChangeLogEntry]]) -> Tree:
+        """Creates a tree out of multiple hierarchy logs at once. The result is the same
+        as appending the logs one after another in the order of the map. Split points are
+        determined via a shared sha index and each segment is created exactly once.
+
+        Args:
+            ref_log_map (Dict[str, List[ChangeLogEntry]]): ref name -> hierarchy log
+
+        Returns:
+            Tree: the branching tree
+        """
+        depth_map = {}
+        root_span = None
+
+        for branch_name, hier_log in ref_log_map.items():
+            new_count = 0
+            while new_count < len(hier_log) and hier_log[new_count].sha not in depth_map:
+                new_count += 1
+
+            tip_depth = len(hier_log) - 1
+            for index in range(new_count):
+                depth_map[hier_log[index].sha] = tip_depth - index
+
+            if not root_span:
+                root_span = _SegmentSpan(hier_log, 0, tip_depth, branch_name)
+                continue
+
+            assert new_count < len(hier_log), \
+                "Initial shas do not match which is a prerequisite!"
+
+            if new_count == 0:
+                # The new log does not exceed the exiting tree
+                continue
+
+            root_span = cls._merge_span(
+                root_span, hier_log, tip_depth - new_count, branch_name)
+
+        tree = cls()
+
+        if root_span:
+            tree.root = root_span.to_segment_tree()
+
+        return tree
+
+    @staticmethod
+    def _merge_span(root_span, hier_log, attach_depth, branch_name):
+        tip_depth = len(hier_log) - 1
+        parent_span = None
+        span = root_span
+
+        while span.end_depth < attach_depth:
+            parent_span = span
+            span = span.children[hier_log[tip_depth - span.end_depth - 1].sha]
+
+        new_span = _SegmentSpan(
+            hier_log, attach_depth + 1, tip_depth, branch_name)
+
+        if span.end_depth == attach_depth and span.children:
+            span.children[new_span.start_sha] = new_span
+            return root_span
+
+        if span.end_depth == attach_depth:
+            # extend the existing leaf segment
+            replace_span = _SegmentSpan(
+                hier_log, span.start_depth, tip_depth, branch_name)
+        else:
+            replace_span = _SegmentSpan(
+                span.log, span.start_depth, attach_depth, span.branch_name)
+            post_span = _SegmentSpan(
+                span.log, attach_depth + 1, span.end_depth, span.branch_name)
+            post_span.children = span.children
+
+            replace_span.children[post_span.start_sha] = post_span
+            replace_span.children[new_span.start_sha] = new_span
+
+        if parent_span:
+            parent_span.children[replace_span.start_sha] = replace_span
+            return root_span
+
+        return replace_span
+
+    def _index_segment(self, segment: Segment, parent_segment: Optional[Segment]):
+        if self._sha_index is None:
+            return
+
+        for position, entry in enumerate(segment.entries):
+            self._sha_index[entry.sha] = (segment, position)
+
+        if segment.compacted_count:
+            self._sha_index[segment.start_sha] = (segment, segment.length - 1)
+
+        self._parent_map[segment.start_sha] = parent_segment
+        for child_segment in segment.children.values():
+            self._parent_map[child_segment.start_sha] = segment
+
+    def _get_sha_index(self) -> Dict[str, Tuple[Segment, int]]:
+        if self._sha_index is None:
+            self._sha_index = {}
+            self._parent_map = {}
+
+            if self.root:
+                queue = [(self.root, None)]
+
+                while queue:
+                    segment, parent_segment = queue.pop()
+                    self._index_segment(segment, parent_segment)
+                    queue.extend((x, segment) for x in segment.children.values())
+
+        return self._sha_index
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self._get_sha_index()
+
+    def segment_of(self, sha: str) -> Segment:
+        """Returns the segment containing a sha
+
+        Args:
+            sha (str): sha of a first parent commit in the tree
+
+        Returns:
+            Segment: segment containing the sha
+        """
+        return self._get_sha_index()[sha][0]
+
+    def position_of(self, sha: str) -> int:
+        """Returns the position of a sha within its segment
+
+        Args:
+            sha (str): sha of a first parent commit in the tree
+
+        Returns:
+            int: number of first parent commits between the sha and the end entry of
+                the segment (0 is the end entry, compacted entries are accounted for)
+        """
+        return self._get_sha_index()[sha][1]
+
+    def path_to_root(self, sha: str) -> List[Segment]:
+        """Returns the segments from the segment containing a sha down to the root segment
+
+        Args:
+            sha (str): sha of a first parent commit in the tree
+
+        Returns:
+            List[Segment]: segments starting with the segment containing the sha and
+                ending with the root segment
+        """
+        segment = self.segment_of(sha)
+        path = []
+
+        while segment:
+            path.append(segment)
+            segment = self._parent_map[segment.start_sha]
+
+        return path
+
+    def compact(self, before: datetime = None, max_count: int = None):
+        """Collapses old entries of all segments into summary stubs to limit memory.
+        Start and end entries of all segments are retained so that the tree structure
+        and the start_sha / end_sha of all segments stay the same. Afterwards, no more
+        logs can be appended to the tree.
+
+        Args:
+            before (datetime, optional): entries with a commit date before are
+                collapsed. Defaults to None.
+            max_count (int, optional): entries further than max_count first parent
+                commits away from the nearest branch end are collapsed. Defaults to None.
+        """
+        if not self.root:
+            return
+
+        # first parent distance of the segment ends to the nearest branch end
+        end_distance_map = {}
+
+        for segment in reversed(self.flatten_segments()):
+            end_distance_map[segment.end_sha] = min(
+                (end_distance_map[x.end_sha] + x.length for x in segment.children.values()),
+                default=0,
+            )
+
+        for segment in self.iter_segments():
+            keep_count = len(segment.entries)
+
+            if before:
+                keep_count = next(
+                    (index for index, entry in enumerate(segment.entries)
+                     if entry.commit_date and entry.commit_date < before),
+                    keep_count,
+                )
+
+            if max_count is not None:
+                keep_count = min(
+                    keep_count, max_count - end_distance_map[segment.end_sha])
+
+            segment.compact(keep_count)
+
+        self.compacted = True
+        self._sha_index = None
+        self._parent_map = None
 
     def iter_segments(self):
         """Iterate Tree Segments
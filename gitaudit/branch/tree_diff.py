@@ -0,0 +1,152 @@
+"""Compare two branching tree snapshots
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from gitaudit.git.controller import Git
+from .hierarchy import get_ref_hierarchy_logs
+from .tree import Tree, Segment
+
+
+@dataclass
+class SegmentChange:
+    """Change of a segment of the old tree
+
+    old: segment of the old tree
+    new: segments of the new tree containing the commits of the old segment
+        (ordered from the start of the old segment towards its end)
+    """
+    old: Segment
+    new: List[Segment]
+
+
+@dataclass
+class TreeDiff:
+    """Difference between two tree snapshots
+
+    added: new segments that only contain commits unknown to the old tree
+    extended: old segments that gained commits at their end
+    split: old segments whose commits are now distributed over multiple new
+        segments (or that lost commits at their end)
+    merged: old segments that became part of a longer new segment (e.g. after the
+        ref of a branching segment was removed)
+    removed: old segments without any commit in the new tree
+    """
+    added: List[Segment] = field(default_factory=list)
+    extended: List[SegmentChange] = field(default_factory=list)
+    split: List[SegmentChange] = field(default_factory=list)
+    merged: List[SegmentChange] = field(default_factory=list)
+    removed: List[Segment] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether both trees have the same segments
+        """
+        return not (
+            self.added or self.extended or self.split or self.merged or self.removed
+        )
+
+    @property
+    def changed_segments(self) -> List[Segment]:
+        """Segments of the new tree that were added or changed
+        """
+        segments = list(self.added)
+        segment_ids = set(map(id, segments))
+
+        for change in self.extended + self.split + self.merged:
+            for segment in change.new:
+                if id(segment) not in segment_ids:
+                    segment_ids.add(id(segment))
+                    segments.append(segment)
+
+        return segments
+
+
+def _get_segment_parts(segment: Segment, tree: Tree) -> Tuple[List[Segment], bool]:
+    """Returns the segments of a tree containing the commits of a segment and whether
+    all commits are contained. As both are first parent lines, each lookup covers the
+    whole overlap with one segment of the tree (verified by the old commit at the end
+    of the overlap, e.g. a force pushed ref shares only the older commits).
+    """
+    parts = []
+    index = len(segment.entries) - 1
+    distance = segment.length - 1
+
+    while index >= 0 and segment.entries[index].sha in tree:
+        part = tree.segment_of(segment.entries[index].sha)
+        position = tree.position_of(segment.entries[index].sha)
+        if not parts or parts[-1] is not part:
+            parts.append(part)
+
+        # distance of the old commit at the end of the part
+        end_distance = distance - position
+
+        if end_distance >= index:
+            # retained entries of compacted segments are not consecutive commits
+            index -= 1
+        else:
+            check_index = max(end_distance, 0)
+            check_sha = segment.entries[check_index].sha
+
+            if check_sha in tree \
+                    and tree.segment_of(check_sha) is part \
+                    and tree.position_of(check_sha) == position - distance + check_index:
+                index = check_index - 1
+            else:
+                # lines diverge within the part
+                index -= 1
+
+        distance = index
+
+    return parts, index < 0
+
+
+def diff_trees(old_tree: Tree, new_tree: Tree) -> TreeDiff:
+    """Compares two tree snapshots, e.g. a persisted tree of a previous run and a
+    tree of the current refs.
+
+    Args:
+        old_tree (Tree): previous tree snapshot
+        new_tree (Tree): current tree snapshot
+
+    Returns:
+        TreeDiff: added, extended, split, merged, and removed segments
+    """
+    diff = TreeDiff()
+    part_ids = set()
+
+    if old_tree.root:
+        for segment in old_tree.iter_segments():
+            parts, complete = _get_segment_parts(segment, new_tree)
+            part_ids.update(map(id, parts))
+
+            if not parts:
+                diff.removed.append(segment)
+            elif parts[0].start_sha != segment.start_sha:
+                diff.merged.append(SegmentChange(old=segment, new=parts))
+            elif len(parts) > 1 or not complete:
+                diff.split.append(SegmentChange(old=segment, new=parts))
+            elif parts[0].end_sha != segment.end_sha:
+                diff.extended.append(SegmentChange(old=segment, new=parts))
+
+    if new_tree.root:
+        diff.added = list(filter(
+            lambda x: id(x) not in part_ids, new_tree.iter_segments()))
+
+    return diff
+
+
+def diff_tree_to_refs(old_tree: Tree, git: Git, refs: List[str]) -> Tuple[Tree, TreeDiff]:
+    """Compares a (persisted) tree snapshot with the current state of the refs
+
+    Args:
+        old_tree (Tree): previous tree snapshot
+        git (Git): Git instance
+        refs (List[str]): refs of the current tree
+
+    Returns:
+        Tuple[Tree, TreeDiff]: current tree and the difference to the old tree
+    """
+    new_tree = Tree.from_logs(get_ref_hierarchy_logs(git, refs))
+    return new_tree, diff_trees(old_tree, new_tree)
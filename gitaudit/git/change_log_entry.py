@@ -3,11 +3,12 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from hashlib import sha1
 import re
 import pytz
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 def extract_line_content(line, id_character):
@@ -58,8 +59,19 @@ def extract_tags_refs(tag_line):
     Returns:
         Tuple[List[str], List[str]]: List of tags and refs
     """
-    line_content = extract_line_content(tag_line, 'T')
-    refs = split_and_strip(line_content)
+    return split_tags_refs(extract_line_content(tag_line, 'T'))
+
+
+def split_tags_refs(decoration):
+    """Splits a git log decoration (%D) into tags and refs
+
+    Args:
+        decoration (str): Comma separated decoration text
+
+    Returns:
+        Tuple[List[str], List[str]]: List of tags and refs
+    """
+    refs = split_and_strip(decoration)
     tags = list(filter(lambda x: x.startswith('tag: '), refs))
     tags = list(map(lambda x: x[5:], tags))
     refs = list(filter(lambda x: not x.startswith('tag: '), refs))
@@ -107,6 +119,30 @@ def extract_submodule_update(numstat_text):
     }, content))
 
 
+def numstat_digest(numstat, with_additions_deletions=True):
+    """Calculates a sha1 hash out of numstat file changes
+
+    Args:
+        numstat (List[FileAdditionsDeletions]): File additions and deletions
+        with_additions_deletions (bool, optional): Whether additions and deletions shall be
+            accounted for. Defaults to True.
+
+    Returns:
+        str: sha1 hash
+    """
+    sorted_numstat = sorted(numstat, key=lambda x: x.path)
+
+    if with_additions_deletions:
+        file_add_del_texts = map(
+            lambda x: f"{x.path}({x.additions}|{x.deletions})", sorted_numstat)
+    else:
+        file_add_del_texts = map(lambda x: x.path, sorted_numstat)
+    return sha1("".join(file_add_del_texts).encode('utf-8')).hexdigest()
+
+
+_HIERARCHY_FIELDS = {'branch_offs', 'other_parents'}
+
+
 class FileAdditionsDeletions(BaseModel):
     """Dataclass for storing file additions and deletions
     """
@@ -123,6 +159,44 @@ class SubmoduleUpdate(BaseModel):
     to_sha: str
 
 
+class ChangeLogEntryView:
+    """Lightweight read only view on a ChangeLogEntry hiding the hierarchy
+    elements (branch_offs, other_parents)
+    """
+    __slots__ = ('entry',)
+
+    def __init__(self, entry: ChangeLogEntry) -> None:
+        self.entry = entry
+
+    def __getattr__(self, name):
+        if name in _HIERARCHY_FIELDS:
+            return []
+        return getattr(self.entry, name)
+
+    def __eq__(self, other):
+        if isinstance(other, ChangeLogEntryView):
+            other = other.entry
+        if not isinstance(other, ChangeLogEntry):
+            return NotImplemented
+        return self.entry.dict(exclude=_HIERARCHY_FIELDS) \
+            == other.dict(exclude=_HIERARCHY_FIELDS)
+
+    def __hash__(self):
+        return hash(self.entry.sha)
+
+    def __repr__(self):
+        return f"ChangeLogEntryView(sha={self.entry.sha!r})"
+
+    def copy_without_hierarchy(self):
+        """Copy the viewed entry without hierarchy elements
+        (branch_offs, other_parents)
+
+        Returns:
+            ChangeLogEntry: the copied entry
+        """
+        return self.entry.copy_without_hierarchy()
+
+
 class ChangeLogEntry(BaseModel):
     """Dataclass for storing change log data
     """
@@ -144,6 +218,30 @@ class ChangeLogEntry(BaseModel):
     ] = Field(default_factory=list)
     submodule_updates: Optional[List[SubmoduleUpdate]] = Field(
         default_factory=list)
+    # numstat digests are calculated lazily and kept until numstat is replaced
+    _numstat_digests: Optional[Tuple[List[FileAdditionsDeletions], Dict[bool, str]]] \
+        = PrivateAttr(default=None)
+
+    def get_numstat_sha1(self, with_additions_deletions=True) -> str:
+        """Cached sha1 hash of the numstat file changes
+
+        Args:
+            with_additions_deletions (bool, optional): Whether additions and deletions are
+                accounted for. Defaults to True.
+
+        Returns:
+            str: sha1 hash
+        """
+        if self._numstat_digests is None or self._numstat_digests[0] is not self.numstat:
+            self._numstat_digests = (self.numstat, {})
+
+        digests = self._numstat_digests[1]
+
+        if with_additions_deletions not in digests:
+            digests[with_additions_deletions] = numstat_digest(
+                self.numstat or [], with_additions_deletions)
+
+        return digests[with_additions_deletions]
 
     @property
     def sorted_numstat(self):
@@ -164,6 +262,16 @@ class ChangeLogEntry(BaseModel):
         copy_dict = self.dict(exclude={'branch_offs', 'other_parents'})
         return ChangeLogEntry.parse_obj(copy_dict)
 
+    def view_without_hierarchy(self):
+        """View on itself without hierarchy elements
+        (branch_offs, other_parents). Other than copy_without_hierarchy
+        no data is copied.
+
+        Returns:
+            ChangeLogEntryView: the view on the entry
+        """
+        return ChangeLogEntryView(self)
+
     @ classmethod
     def from_log_text(cls, log_text):  # pylint: disable=too-many-locals
         """Create ChangeLogEntry from logging text
@@ -223,12 +331,15 @@ class ChangeLogEntry(BaseModel):
             ChangeLogEntry: Change log entry dataclass
         """
         res = re.findall(
-            r'([a-f0-9]+)\[(?:([a-f0-9\s]+))?\](?:\((.*?)\))?', log_text)
+            r'([a-f0-9]+)\[(?:([a-f0-9\s]+))?\](?:\((.*?)\))?(?:\{(.*)\})?', log_text)
+        tags, refs = split_tags_refs(res[0][3])
         return ChangeLogEntry(
             sha=res[0][0],
             parent_shas=res[0][1].split(' ') if res[0][1] else [],
             commit_date=datetime.fromisoformat(
-                res[0][2]) if res[0][2] else None
+                res[0][2]) if res[0][2] else None,
+            tags=tags,
+            refs=refs,
         )
 
     @classmethod
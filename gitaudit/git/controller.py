@@ -7,6 +7,13 @@ import io
 from .change_log_entry import ChangeLogEntry
 
 
+_CHANGELOG_PRETTY = (
+    r"#CS#%n"
+    r"H:[%H]%nP:[%P]%nT:[%D]%nS:[%s]%nD:[%cI]%nA:[%an]%nM:[%ae]%n"
+    r"#SB#%n%b%n#EB#%n"
+)
+
+
 class GitError(Exception):
     """Generic git error for exceptions raised by the git class."""
 
@@ -83,7 +90,7 @@ def exec_sub_process_yield(args: List[str], verbose: bool) -> str:
         raise GitError(err)
 
 
-class Git:
+class Git:  # pylint: disable=too-many-public-methods
     """Class that communicated with local git installation.
     """
 
@@ -350,7 +357,9 @@ class Git:
         output = self._execute_git_cmd(*args)
         return output
 
-    def log_changelog(self, end_ref, start_ref=None, first_parent=False, patch=False):
+    def log_changelog(  # pylint: disable=too-many-arguments
+        self, end_ref, start_ref=None, first_parent=False, patch=False, numstat=True,
+    ):
         """Create changelog
 
         Args:
@@ -359,30 +368,57 @@ class Git:
                 Defaults to None.
             first_parent (bool, optional): If true git log only follows the
                 first parent. Defaults to False.
-            patch (bool, optional): _description_. Defaults to False.
             patch (bool, optional): Enable patch output or not. Defaults to False.
+            numstat (bool, optional): Enable numstat output or not. Defaults to True.
 
         Returns:
             List[ChangeLogEntry]: the changelog
         """
-        pretty = (
-            r"#CS#%n"
-            r"H:[%H]%nP:[%P]%nT:[%D]%nS:[%s]%nD:[%cI]%nA:[%an]%nM:[%ae]%n"
-            r"#SB#%n%b%n#EB#%n"
-        )
-
-        entries = []
-        collect_lines = []
-
-        for line in self._yield_line_log(
-            pretty=pretty,
+        return self._parse_changelog_lines(self._yield_line_log(
+            pretty=_CHANGELOG_PRETTY,
             end_ref=end_ref,
             start_ref=start_ref,
             submodule="diff",
-            other=["-m", "--numstat"],
+            other=["-m", "--numstat"] if numstat else None,
             patch=patch,
             first_parent=first_parent,
-        ):
+        ))
+
+    def log_changelog_entries(self, shas, patch=False, numstat=True, chunk_size=500):
+        """Create changelog entries for a list of commits only (without walking their
+        history). The commits are logged in chunks to limit the command line length.
+
+        Args:
+            shas (List[str]): shas of the commits to be logged
+            patch (bool, optional): Enable patch output or not. Defaults to False.
+            numstat (bool, optional): Enable numstat output or not. Defaults to True.
+            chunk_size (int, optional): Number of shas per git call. Defaults to 500.
+
+        Returns:
+            List[ChangeLogEntry]: changelog entries (merge commits can be contained
+                multiple times, once per parent)
+        """
+        entries = []
+
+        for index in range(0, len(shas), chunk_size):
+            chunk = shas[index:(index + chunk_size)]
+            entries.extend(self._parse_changelog_lines(self._yield_line_log(
+                pretty=_CHANGELOG_PRETTY,
+                end_ref=chunk[0],
+                submodule="diff",
+                other=["--no-walk=unsorted"] + chunk[1:] +
+                (["-m", "--numstat"] if numstat else []),
+                patch=patch,
+            )))
+
+        return entries
+
+    @staticmethod
+    def _parse_changelog_lines(lines):
+        entries = []
+        collect_lines = []
+
+        for line in lines:
             if line == '#CS#\n':
                 if collect_lines:
                     entries.append(ChangeLogEntry.from_log_text(
@@ -451,6 +487,87 @@ class Git:
 
         return entries
 
+    def log_parentlog_refs(self, refs):
+        """Runs a single git log over multiple refs and returns the union
+        of their histories as ChangeLogEntry list (linear log) with sha,
+        parent shas and decorations (tags / refs). Shared history is only
+        walked once.
+
+        Args:
+            refs (List[str]): Refs (branch, tag, sha) to be logged
+
+        Returns:
+            List[ChangeLogEntry]: Linear ChangeLogEntry log
+        """
+
+        entries = []
+
+        for line in self._yield_line_log(
+            pretty=r"%H[%P](%cI){%D}",
+            end_ref=refs[0],
+            other=list(refs[1:]),
+        ):
+            entries.append(ChangeLogEntry.from_head_log_text(line))
+
+        return entries
+
+    def log_parentlog_exclusive(self, end_ref, exclude_refs):
+        """Returns the parent log of the commits reachable from end_ref but not from any
+        of the exclude_refs (e.g. the merge bases of two refs). The boundary commits
+        (excluded parents of the logged commits) are returned separately and can be
+        used as attachment points.
+
+        Args:
+            end_ref (str): End Ref
+            exclude_refs (List[str]): Refs whose history is excluded
+
+        Returns:
+            Tuple[List[ChangeLogEntry], List[ChangeLogEntry]]: Linear ChangeLogEntry log
+                and boundary entries
+        """
+        entries = []
+        boundary_entries = []
+
+        for line in self._yield_line_log(
+            pretty=r"%m%H[%P](%cI)",
+            end_ref=end_ref,
+            other=["--boundary", "--not"] + list(exclude_refs),
+        ):
+            entry = ChangeLogEntry.from_head_log_text(line[1:])
+
+            if line.startswith('-'):
+                boundary_entries.append(entry)
+            else:
+                entries.append(entry)
+
+        return entries, boundary_entries
+
+    def merge_bases(self, ref_a, ref_b):
+        """Returns all best common ancestors of two refs (git merge-base --all)
+
+        Args:
+            ref_a (str): first ref
+            ref_b (str): second ref
+
+        Returns:
+            List[str]: shas of the merge bases (empty for unrelated histories)
+        """
+        return list(filter(None, self._execute_git_cmd_split_strip(
+            "merge-base", "--all", ref_a, ref_b)))
+
+    def rev_parse_commits(self, refs):
+        """Resolves refs to the shas of the commits they point to
+
+        Args:
+            refs (List[str]): Refs (branch, tag, sha)
+
+        Returns:
+            Dict[str, str]: ref -> commit sha map
+        """
+        shas = self._execute_git_cmd_split_strip(
+            "rev-parse", *map(lambda x: f"{x}^{{commit}}", refs))
+        return dict(zip(refs, shas))
+
     def show_parentlog_entry(self, ref):
         """Show parent log entry information
 
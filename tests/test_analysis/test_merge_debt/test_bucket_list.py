@@ -166,3 +166,159 @@ class TestBucketList(TestCase):
             bucket_list.entries[0].children[0].branch_shas,
             ["d"],
         )
+
+    def test_indexes_are_updated_on_prune(self):
+        hier_log = ChangeLogEntry.list_from_objects([{
+            "sha": "a",
+            "parent_shas": ["b", "c"],
+            "other_parents": [[
+                {
+                    "sha": "c",
+                    "parent_shas": ["d"],
+                    "cherry_pick_sha": "1",
+                    "numstat": [{"path": "x", "additions": 1, "deletions": 0}],
+                },
+                {
+                    "sha": "d",
+                    "parent_shas": [],
+                    "numstat": [{"path": "x", "additions": 1, "deletions": 0}],
+                }
+            ]]
+        }, {
+            "sha": "b",
+            "parent_shas": [],
+            "numstat": [{"path": "y", "additions": 2, "deletions": 2}],
+        }])
+
+        bucket_list = BucketList(hier_log)
+
+        self.assertListEqual(list(bucket_list.entry_map), ['a', 'c', 'd', 'b'])
+        self.assertListEqual(list(bucket_list.cherry_pick_entry_map), ['c'])
+        self.assertListEqual(
+            list(map(lambda x: x.sha, bucket_list.get_numstat_map().values())),
+            ['b'],
+        )
+
+        bucket_list.prune_sha('c')
+
+        self.assertListEqual(list(bucket_list.entry_map), ['a', 'd', 'b'])
+        self.assertDictEqual(bucket_list.cherry_pick_entry_map, {})
+        self.assertListEqual(
+            list(map(lambda x: x.sha, bucket_list.get_numstat_map().values())),
+            ['d', 'b'],
+        )
+
+        # collapsing the bucket removes the merge commit as well
+        bucket_list.prune_sha('d')
+
+        self.assertListEqual(list(bucket_list.entry_map), ['b'])
+        self.assertListEqual(list(bucket_list.bucket_map), ['b'])
+        self.assertListEqual(
+            list(map(lambda x: x.sha, bucket_list.get_numstat_map(False).values())),
+            ['b'],
+        )
+
+    def test_prune_many(self):
+        hier_log = ChangeLogEntry.list_from_objects([{
+            "sha": "a",
+            "parent_shas": ["b", "c"],
+            "other_parents": [[
+                {
+                    "sha": "c",
+                    "parent_shas": ["d", "e"],
+                    "other_parents": [[
+                        {
+                            "sha": "e",
+                            "parent_shas": []
+                        }
+                    ]]
+                },
+                {
+                    "sha": "d",
+                    "parent_shas": ["f"],
+                },
+                {
+                    "sha": "f",
+                    "parent_shas": [],
+                }
+            ]]
+        }, {
+            "sha": "b",
+            "parent_shas": []
+        }])
+
+        bucket_list = BucketList(hier_log)
+        bucket_list.prune_many(['e', 'd', '9'])
+
+        self.assertListEqual(
+            list(map(lambda x: x.merge_sha, bucket_list.entries)),
+            ['a', 'b'],
+        )
+        self.assertListEqual(bucket_list.entries[0].children[0].branch_shas, ['f'])
+        self.assertListEqual(bucket_list.entries[0].children[0].children_shas, [])
+
+        # collapses the nested buckets up to the top level bucket
+        bucket_list.prune_many(['f', 'b'])
+
+        self.assertListEqual(bucket_list.entries, [])
+        self.assertDictEqual(bucket_list.entry_map, {})
+
+    def test_prune_many_large_bucket(self):
+        hier_log = ChangeLogEntry.list_from_objects([{
+            "sha": "a",
+            "parent_shas": ["b", "c0"],
+            "other_parents": [[
+                {
+                    "sha": f"c{index}",
+                    "parent_shas": [f"c{index + 1}"] if index < 999 else [],
+                } for index in range(1000)
+            ]]
+        }])
+
+        bucket_list = BucketList(hier_log)
+        bucket_list.prune_many(f"c{index}" for index in range(0, 1000, 2))
+
+        self.assertEqual(len(bucket_list.entries[0].branch_commits), 500)
+        self.assertEqual(len(bucket_list.entry_map), 501)
+
+        bucket_list.prune_many(f"c{index}" for index in range(1, 1000, 2))
+
+        self.assertListEqual(bucket_list.entries, [])
+
+    def test_prune_sha_marks_lazily(self):
+        hier_log = ChangeLogEntry.list_from_objects([{
+            "sha": "a",
+            "parent_shas": ["b", "c0"],
+            "other_parents": [[
+                {
+                    "sha": f"c{index}",
+                    "parent_shas": [f"c{index + 1}"] if index < 99 else [],
+                } for index in range(100)
+            ]]
+        }])
+
+        bucket_list = BucketList(hier_log)
+        bucket = bucket_list.top_bucket_map['a']
+        branch_commits = bucket.branch_commits
+
+        for index in range(50):
+            bucket_list.prune_sha(f"c{index}")
+
+        # the bucket is only marked, its lists are not rebuilt per pruned sha
+        self.assertIs(bucket.branch_commits, branch_commits)
+        self.assertTrue(bucket.has_pruned_shas)
+        self.assertEqual(len(bucket_list.entry_map), 51)
+
+        # reading the entries compacts the buckets once
+        self.assertListEqual(
+            bucket_list.entries[0].branch_shas,
+            [f"c{index}" for index in range(50, 100)],
+        )
+        self.assertFalse(bucket.has_pruned_shas)
+
+        # already pruned shas are not counted twice
+        bucket_list.prune_many(['c0', 'c50'] + [f"c{index}" for index in range(51, 99)])
+        self.assertEqual(len(bucket_list.entries), 1)
+
+        bucket_list.prune_sha('c99')
+        self.assertListEqual(bucket_list.entries, [])
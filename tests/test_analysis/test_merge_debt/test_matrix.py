@@ -0,0 +1,146 @@
+from unittest import TestCase
+
+from gitaudit.git.change_log_entry import ChangeLogEntry
+from gitaudit.analysis.merge_debt.matrix import MergeDebtMatrix, get_fork_depth
+from gitaudit.analysis.merge_debt.matchers import \
+    SameCommitMatcher,\
+    DirectCherryPickMatcher,\
+    FilesChangedMatcher
+from .test_merge_debt import MockGit, MAIN_JSON_LOG, RELEASE_JSON_LOG
+
+
+HOTFIX_JSON_LOG = [
+    {
+        "sha": "h",
+        "parent_shas": ["e"],
+    },
+] + RELEASE_JSON_LOG[1:]
+
+
+class MockRefsGit(MockGit):
+    def log_parentlog_refs(self, refs):
+        shas = set().union(*map(self._get_reachable_shas, refs))
+        return [
+            ChangeLogEntry.parse_obj(x) for x in self._get_entry_map().values()
+            if x['sha'] in shas
+        ]
+
+    def rev_parse_commits(self, refs):
+        return {x: self.ref_logs[x][0]['sha'] for x in refs}
+
+
+def get_mock_git():
+    mock_git = MockRefsGit()
+    mock_git.append_ref('main', MAIN_JSON_LOG)
+    mock_git.append_ref('release', RELEASE_JSON_LOG)
+    mock_git.append_ref('hotfix', HOTFIX_JSON_LOG)
+
+    numstat = [{"path": "x", "additions": 1, "deletions": 1}]
+
+    mock_git.changelog_entries = {
+        "d": {"sha": "d", "parent_shas": ["c"], "numstat": numstat},
+        "c": {"sha": "c", "parent_shas": ["b"], "numstat": []},
+        "f": {"sha": "f", "parent_shas": ["e"], "numstat": numstat},
+        "e": {"sha": "e", "parent_shas": ["b"], "numstat": [],
+              "subject": "fix", "cherry_pick_sha": "c"},
+        "h": {"sha": "h", "parent_shas": ["e"], "numstat": numstat},
+    }
+
+    return mock_git
+
+
+PAIRS = [
+    ('release', 'main'),
+    ('hotfix', 'main'),
+    ('hotfix', 'release'),
+]
+
+
+class TestGetForkDepth(TestCase):
+    def get_log(self, shas):
+        return list(map(lambda x: ChangeLogEntry(sha=x), shas))
+
+    def test_normal(self):
+        self.assertEqual(get_fork_depth(
+            self.get_log("dcba"), self.get_log("feba")), 1)
+        self.assertEqual(get_fork_depth(
+            self.get_log("dcba"), self.get_log("ba")), 1)
+        self.assertEqual(get_fork_depth(
+            self.get_log("dcba"), self.get_log("dcba")), 3)
+
+    def test_disjoint(self):
+        self.assertEqual(get_fork_depth(
+            self.get_log("ba"), self.get_log("dc")), -1)
+        self.assertEqual(get_fork_depth(self.get_log("ba"), []), -1)
+
+
+class TestMergeDebtMatrix(TestCase):
+    def test_pair_hier_logs(self):
+        matrix = MergeDebtMatrix(get_mock_git(), PAIRS)
+
+        for (head_ref, base_ref), (head_shas, base_shas) in zip(PAIRS, [
+            (['f', 'e'], ['d', 'c']),
+            (['h', 'e'], ['d', 'c']),
+            (['h'], ['f']),
+        ]):
+            head, base = matrix.get_pair_hier_logs(head_ref, base_ref)
+            self.assertListEqual([x.sha for x in head], head_shas)
+            self.assertListEqual([x.sha for x in base], base_shas)
+
+    def test_shared_hydration(self):
+        mock_git = get_mock_git()
+        matrix = MergeDebtMatrix(mock_git, PAIRS)
+
+        pair_merge_debt_map = matrix.execute_matchers([
+            SameCommitMatcher(),
+            DirectCherryPickMatcher(),
+        ])
+
+        self.assertListEqual(list(pair_merge_debt_map), PAIRS)
+        self.assertListEqual(
+            [
+                [x.head.sha for x in pair_merge_debt_map[pair].report.matches]
+                for pair in PAIRS
+            ],
+            [['e'], ['e'], []],
+        )
+        self.assertListEqual(mock_git.changelog_entries_calls, [
+            (['c', 'd', 'e', 'f'], False, False),
+            (['c', 'e'], True, False),
+            (['h'], False, False),
+        ])
+
+        # pairs prune independently
+        self.assertListEqual(
+            list(pair_merge_debt_map[('hotfix', 'main')].head_buckets.entry_map),
+            ['h'],
+        )
+        self.assertListEqual(
+            list(pair_merge_debt_map[('hotfix', 'release')].head_buckets.entry_map),
+            ['h'],
+        )
+        self.assertIs(
+            pair_merge_debt_map[('release', 'main')].base_hier_log[0],
+            pair_merge_debt_map[('hotfix', 'main')].base_hier_log[0],
+        )
+
+    def test_processes(self):
+        matchers = [
+            SameCommitMatcher(),
+            DirectCherryPickMatcher(),
+            FilesChangedMatcher(),
+        ]
+
+        sequential = MergeDebtMatrix(get_mock_git(), PAIRS).execute_matchers(matchers)
+        parallel = MergeDebtMatrix(get_mock_git(), PAIRS).execute_matchers(
+            matchers, use_processes=True, max_workers=2)
+
+        for pair in PAIRS:
+            self.assertListEqual(
+                [(x.head.sha, x.base.sha) for x in parallel[pair].report.matches],
+                [(x.head.sha, x.base.sha) for x in sequential[pair].report.matches],
+            )
+            self.assertListEqual(
+                list(parallel[pair].head_buckets.entry_map),
+                list(sequential[pair].head_buckets.entry_map),
+            )
@@ -1,8 +1,20 @@
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
 from gitaudit.git.change_log_entry import ChangeLogEntry
 from gitaudit.branch.hierarchy import linear_log_to_hierarchy_log
-from gitaudit.analysis.merge_debt.merge_debt import get_head_base_hier_logs
+from gitaudit.analysis.merge_debt.merge_debt import get_head_base_hier_logs, MergeDebt
+from gitaudit.analysis.merge_debt.matchers import \
+    SameCommitMatcher,\
+    DirectCherryPickMatcher,\
+    ThirdPartyCherryPickMatcher,\
+    FilesChangedMatcher,\
+    MatchConfidence,\
+    MatchResult,\
+    Matcher
+from gitaudit.analysis.merge_debt.pipeline import MatcherPipeline
+from .test_merge_debt_matchers.test_case_cherry_picked import \
+    CHERRY_PICK_MAIN_LOG, CHERRY_PICK_DEV_LOG
 from gitaudit.analysis.merge_debt.buckets import \
     BucketEntry,\
     get_sha_to_bucket_entry_map,\
@@ -50,6 +62,8 @@ RELEASE_JSON_LOG = [
 class MockGit:
     def __init__(self, ) -> None:
         self.ref_logs = {}
+        self.changelog_entries = {}
+        self.changelog_entries_calls = []
 
     def append_ref(self, name, json_log):
         self.ref_logs[name] = json_log
@@ -67,6 +81,56 @@ class MockGit:
             self.ref_logs[end_ref],
         ))
 
+    def _get_entry_map(self):
+        return {x['sha']: x for log in self.ref_logs.values() for x in log}
+
+    def _get_reachable_shas(self, ref):
+        entry_map = self._get_entry_map()
+        reachable = set()
+        queue = [self.ref_logs[ref][0]['sha'] if ref in self.ref_logs else ref]
+
+        while queue:
+            sha = queue.pop()
+            if sha in reachable:
+                continue
+            reachable.add(sha)
+            queue.extend(entry_map[sha]['parent_shas'])
+
+        return reachable
+
+    def merge_bases(self, ref_a, ref_b):
+        common = self._get_reachable_shas(ref_a) & self._get_reachable_shas(ref_b)
+        return sorted(filter(
+            lambda x: not any(
+                x != y and x in self._get_reachable_shas(y) for y in common),
+            common,
+        ))
+
+    def log_parentlog_exclusive(self, end_ref, exclude_refs):
+        excluded = set().union(*map(self._get_reachable_shas, exclude_refs))
+        shas = self._get_reachable_shas(end_ref) - excluded
+        entry_map = self._get_entry_map()
+
+        entries = [
+            ChangeLogEntry.parse_obj(x) for x in self._get_entry_map().values()
+            if x['sha'] in shas
+        ]
+        boundary_shas = {
+            p for x in entries for p in x.parent_shas if p not in shas}
+
+        return entries, [
+            ChangeLogEntry.parse_obj(entry_map[x]) for x in sorted(boundary_shas)]
+
+    def log_changelog_entries(self, shas, patch=False, numstat=True):
+        self.changelog_entries_calls.append((sorted(shas), numstat, patch))
+        return list(map(
+            lambda x: ChangeLogEntry.parse_obj({
+                **self.changelog_entries[x],
+                "numstat": self.changelog_entries[x]["numstat"] if numstat else [],
+            }),
+            shas,
+        ))
+
 
 class TestGetHeadBaseHierLogs(TestCase):
     def test_normal(self):
@@ -85,6 +149,329 @@ class TestGetHeadBaseHierLogs(TestCase):
         )
 
 
+class TestGetSymmetricDifferenceHierLogs(TestCase):
+    def test_normal(self):
+        mock_git = MockGit()
+        mock_git.append_ref('main', MAIN_JSON_LOG)
+        mock_git.append_ref('release', RELEASE_JSON_LOG)
+
+        head, base = get_head_base_hier_logs(
+            mock_git, 'release', 'main', symmetric_difference=True)
+        self.assertListEqual(
+            list(map(lambda x: x.sha, head)),
+            ['f', 'e'],
+        )
+        self.assertListEqual(
+            list(map(lambda x: x.sha, base)),
+            ['d', 'c'],
+        )
+
+        head, _ = get_head_base_hier_logs(
+            mock_git, 'release', 'main', hydrate=False, symmetric_difference=True)
+        self.assertListEqual(
+            list(map(lambda x: x.sha, head[-1].branch_offs)),
+            ['b'],
+        )
+
+    def test_cross_merged(self):
+        mock_git = MockGit()
+        mock_git.append_ref('release', RELEASE_JSON_LOG)
+        mock_git.append_ref('main', [{
+            "sha": "9",
+            "parent_shas": ["d", "e"],
+        }] + MAIN_JSON_LOG)
+
+        head, base = get_head_base_hier_logs(
+            mock_git, 'main', 'release', hydrate=False, symmetric_difference=True)
+
+        self.assertListEqual(
+            list(map(lambda x: x.sha, head)),
+            ['9', 'd', 'c'],
+        )
+        self.assertListEqual(head[0].other_parents, [])
+        self.assertListEqual(
+            list(map(lambda x: x.sha, head[0].branch_offs)),
+            ['e'],
+        )
+        self.assertListEqual(
+            list(map(lambda x: x.sha, base)),
+            ['f'],
+        )
+
+    def test_contained(self):
+        mock_git = MockGit()
+        mock_git.append_ref('main', MAIN_JSON_LOG)
+        mock_git.append_ref('old', MAIN_JSON_LOG[2:])
+
+        head, base = get_head_base_hier_logs(
+            mock_git, 'main', 'old', symmetric_difference=True)
+
+        self.assertListEqual(
+            list(map(lambda x: x.sha, head)),
+            ['d', 'c'],
+        )
+        self.assertListEqual(base, [])
+
+
+class TestMergeDebtHydration(TestCase):
+    def get_mock_git(self):
+        mock_git = MockGit()
+        mock_git.append_ref('main', MAIN_JSON_LOG)
+        mock_git.append_ref('release', RELEASE_JSON_LOG)
+
+        numstat = [{"path": "x", "additions": 1, "deletions": 1}]
+
+        mock_git.changelog_entries = {
+            "d": {"sha": "d", "parent_shas": ["c"], "numstat": numstat},
+            "c": {"sha": "c", "parent_shas": ["b"], "numstat": []},
+            "f": {"sha": "f", "parent_shas": ["e"], "numstat": numstat},
+            "e": {"sha": "e", "parent_shas": ["b"], "numstat": [],
+                  "subject": "fix", "cherry_pick_sha": "c"},
+        }
+
+        return mock_git
+
+    def test_hydrate_on_demand(self):
+        mock_git = self.get_mock_git()
+        merge_debt = MergeDebt.from_git(mock_git, 'release', 'main')
+
+        merge_debt.execute_matcher(SameCommitMatcher())
+        self.assertListEqual(mock_git.changelog_entries_calls, [])
+
+        merge_debt.execute_matcher(DirectCherryPickMatcher())
+        self.assertListEqual(
+            [x.head.sha for x in merge_debt.report.matches], ['e'])
+        self.assertListEqual(mock_git.changelog_entries_calls, [
+            (['c', 'd', 'e', 'f'], False, False),
+            (['c', 'e'], True, False),
+        ])
+
+        merge_debt.execute_matcher(FilesChangedMatcher())
+        self.assertListEqual(
+            [x.head.sha for x in merge_debt.report.matches], ['e', 'f'])
+        self.assertListEqual(
+            mock_git.changelog_entries_calls[2:], [(['d', 'f'], True, False)])
+
+        self.assertDictEqual(merge_debt.report_dict()['unmatched'], {
+            'head_entries': [],
+            'base_entries': [],
+        })
+        self.assertEqual(len(mock_git.changelog_entries_calls), 3)
+
+
+class TestMergeDebtParallel(TestCase):
+    def get_merge_debt(self):
+        return MergeDebt(
+            linear_log_to_hierarchy_log(
+                ChangeLogEntry.list_from_objects(CHERRY_PICK_DEV_LOG)),
+            linear_log_to_hierarchy_log(
+                ChangeLogEntry.list_from_objects(CHERRY_PICK_MAIN_LOG)),
+        )
+
+    def get_matchers(self):
+        return [
+            SameCommitMatcher(),
+            DirectCherryPickMatcher(),
+            ThirdPartyCherryPickMatcher(),
+            FilesChangedMatcher(),
+        ]
+
+    def assert_same_result(self, merge_debt, expected_merge_debt):
+        self.assertTrue(expected_merge_debt.report.matches)
+        self.assertListEqual(
+            [(x.head.sha, x.base.sha) for x in merge_debt.report.matches],
+            [(x.head.sha, x.base.sha) for x in expected_merge_debt.report.matches],
+        )
+        self.assertListEqual(
+            list(merge_debt.head_buckets.entry_map),
+            list(expected_merge_debt.head_buckets.entry_map),
+        )
+        self.assertListEqual(
+            list(merge_debt.base_buckets.entry_map),
+            list(expected_merge_debt.base_buckets.entry_map),
+        )
+
+    def test_threads(self):
+        sequential = self.get_merge_debt()
+        sequential.execute_matchers(self.get_matchers())
+
+        parallel = self.get_merge_debt()
+        parallel.execute_matchers_parallel(self.get_matchers(), max_workers=4)
+
+        self.assert_same_result(parallel, sequential)
+
+    def test_processes(self):
+        sequential = self.get_merge_debt()
+        sequential.execute_matchers(self.get_matchers())
+
+        parallel = self.get_merge_debt()
+        parallel.execute_matchers_parallel(
+            self.get_matchers(), max_workers=2, use_processes=True)
+
+        self.assert_same_result(parallel, sequential)
+
+    def test_indexes_built_and_pruned_once(self):
+        merge_debt = self.get_merge_debt()
+        index_states = []
+
+        def match(head, base):
+            index_states.append(
+                (set(head.numstat_index_maps), set(base.numstat_index_maps)))
+            return []
+
+        numstat_matcher = MagicMock(required_fields=set(), match=match)
+
+        with patch.object(merge_debt.head_buckets, 'prune_many',
+                          wraps=merge_debt.head_buckets.prune_many) as head_prune_mock, \
+                patch.object(merge_debt.base_buckets, 'prune_many',
+                             wraps=merge_debt.base_buckets.prune_many) as base_prune_mock:
+            merge_debt.execute_matchers_parallel(
+                [numstat_matcher] + self.get_matchers(), max_workers=4)
+
+        self.assertListEqual(index_states, [({True, False}, {True, False})])
+        head_prune_mock.assert_called_once()
+        base_prune_mock.assert_called_once()
+
+
+class ListSameCommitMatcher(Matcher):
+    """Custom matcher written against the list of bucket entries contract"""
+
+    def match(self, head, base):
+        self.bucket_counts = (len(head), len(base))
+        self.first_merge_shas = (head[0].merge_sha, base[-1].merge_sha)
+
+        _, head_entry_map = get_sha_to_bucket_entry_map(head)
+        _, base_entry_map = get_sha_to_bucket_entry_map(base)
+
+        return [
+            MatchResult(
+                head=entry,
+                base=base_entry_map[sha],
+                confidence=MatchConfidence.ABSOLUTE,
+            ) for sha, entry in head_entry_map.items() if sha in base_entry_map
+        ]
+
+
+class TestListBasedMatcher(TestCase):
+    def get_merge_debt(self):
+        # full histories sharing b and a
+        return MergeDebt(
+            linear_log_to_hierarchy_log(
+                ChangeLogEntry.list_from_objects(RELEASE_JSON_LOG)),
+            linear_log_to_hierarchy_log(
+                ChangeLogEntry.list_from_objects(MAIN_JSON_LOG)),
+        )
+
+    def test_same_as_index_matcher(self):
+        merge_debt = self.get_merge_debt()
+        head_entries = merge_debt.head_buckets.entries
+        base_entries = merge_debt.base_buckets.entries
+
+        matcher = ListSameCommitMatcher()
+        merge_debt.execute_matcher(matcher)
+
+        self.assertEqual(matcher.bucket_counts, (len(head_entries), len(base_entries)))
+        self.assertEqual(
+            matcher.first_merge_shas,
+            (head_entries[0].merge_sha, base_entries[-1].merge_sha),
+        )
+
+        expected = self.get_merge_debt()
+        expected.execute_matcher(SameCommitMatcher())
+
+        self.assertTrue(expected.report.matches)
+        self.assertListEqual(
+            [(x.head.sha, x.base.sha) for x in merge_debt.report.matches],
+            [(x.head.sha, x.base.sha) for x in expected.report.matches],
+        )
+        self.assertListEqual(
+            list(merge_debt.head_buckets), expected.head_buckets.entries)
+
+
+class TestMatcherPipeline(TestCase):
+    def test_order(self):
+        pipeline = MatcherPipeline([
+            FilesChangedMatcher(with_additions_deletions=False),
+            FilesChangedMatcher(),
+            ThirdPartyCherryPickMatcher(),
+            SameCommitMatcher(),
+        ])
+
+        self.assertListEqual(
+            [(type(x).__name__, x.confidence) for x in pipeline.matchers],
+            [
+                ('SameCommitMatcher', MatchConfidence.ABSOLUTE),
+                ('ThirdPartyCherryPickMatcher', MatchConfidence.ABSOLUTE),
+                ('FilesChangedMatcher', MatchConfidence.STRONG),
+                ('FilesChangedMatcher', MatchConfidence.GOOD),
+            ],
+        )
+
+    def test_without_required_fields(self):
+        sha_matcher = ListSameCommitMatcher()
+        sha_matcher.required_fields = set()
+        sha_matcher.confidence = MatchConfidence.STRONG
+
+        pipeline = MatcherPipeline([FilesChangedMatcher(), sha_matcher])
+
+        self.assertEqual(sha_matcher.cost, 0)
+        self.assertListEqual(
+            [type(x).__name__ for x in pipeline.matchers],
+            ['ListSameCommitMatcher', 'FilesChangedMatcher'],
+        )
+
+    def test_stats(self):
+        merge_debt = MergeDebt(
+            linear_log_to_hierarchy_log(
+                ChangeLogEntry.list_from_objects(CHERRY_PICK_DEV_LOG)),
+            linear_log_to_hierarchy_log(
+                ChangeLogEntry.list_from_objects(CHERRY_PICK_MAIN_LOG)),
+        )
+        head_count = len(merge_debt.head_buckets.entry_map)
+
+        stats_list = MatcherPipeline([
+            FilesChangedMatcher(),
+            DirectCherryPickMatcher(),
+        ]).execute(merge_debt)
+
+        self.assertListEqual(
+            [x.matcher for x in stats_list],
+            ['DirectCherryPickMatcher', 'FilesChangedMatcher'],
+        )
+        self.assertEqual(stats_list[0].head_candidates, head_count)
+        self.assertEqual(
+            stats_list[1].head_candidates, head_count - stats_list[0].head_pruned)
+        self.assertEqual(
+            sum(map(lambda x: x.match_count, stats_list)),
+            len(merge_debt.report.matches),
+        )
+        self.assertEqual(
+            merge_debt.report_dict()['matcher_stats'],
+            [x.dict() for x in stats_list],
+        )
+
+    def test_early_exit(self):
+        merge_debt = MergeDebt(
+            linear_log_to_hierarchy_log(
+                ChangeLogEntry.list_from_objects(MAIN_JSON_LOG[2:])),
+            linear_log_to_hierarchy_log(
+                ChangeLogEntry.list_from_objects(MAIN_JSON_LOG)),
+        )
+        files_changed_matcher = FilesChangedMatcher()
+        files_changed_matcher.match = MagicMock()
+
+        stats_list = MatcherPipeline([
+            files_changed_matcher,
+            SameCommitMatcher(),
+        ]).execute(merge_debt)
+
+        self.assertListEqual(
+            [(x.matcher, x.head_pruned, x.skipped) for x in stats_list],
+            [('SameCommitMatcher', 2, False), ('FilesChangedMatcher', 0, True)],
+        )
+        files_changed_matcher.match.assert_not_called()
+
+
 class TestBucketEntry(TestCase):
     def test_branched_version(self):
         # a
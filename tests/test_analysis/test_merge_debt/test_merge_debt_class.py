@@ -1,3 +1,5 @@
+import json
+from io import StringIO
 from unittest import TestCase
 from gitaudit.git.change_log_entry import ChangeLogEntry
 from gitaudit.branch.hierarchy import linear_log_to_hierarchy_log
@@ -297,3 +299,48 @@ class TestMergeDebt(TestCase):
                    merge_debt.base_buckets.entries))),
             sorted(['9db', '657']),
         )
+
+    def test_write_report(self):
+        main_log = linear_log_to_hierarchy_log(
+            ChangeLogEntry.list_from_objects(CHERRY_PICK_DIFF_MAIN_LOG),
+        )
+        dev_log = linear_log_to_hierarchy_log(
+            ChangeLogEntry.list_from_objects(CHERRY_PICK_DIFF_DEV_LOG),
+        )
+
+        merge_debt = MergeDebt(dev_log, main_log)
+        merge_debt.execute_matcher(DirectCherryPickMatcher())
+
+        stream = StringIO()
+        merge_debt.write_report(stream)
+        records = list(map(json.loads, stream.getvalue().splitlines()))
+
+        commit_shas = [x["sha"] for x in records if x["type"] == "commit"]
+        self.assertEqual(len(commit_shas), len(set(commit_shas)))
+        self.assertTrue(all(
+            "other_parents" not in x for x in records if x["type"] == "commit"))
+
+        alerts = [x for x in records if x["type"] == "alert"]
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]["head"], "a6c")
+        self.assertEqual(alerts[0]["base"], "a19")
+
+        report_dict = merge_debt.report_dict()
+        self.assertEqual(
+            len([x for x in records if x["type"] == "match"]),
+            len(report_dict["matches"]),
+        )
+        self.assertListEqual(
+            [x["sha"] for x in records
+             if x["type"] == "unmatched" and x["side"] == "head"],
+            [x["sha"] for x in report_dict["unmatched"]["head_entries"]],
+        )
+
+        # referenced commits are written before the referencing record
+        written_shas = set()
+        for record in records:
+            if record["type"] == "commit":
+                written_shas.add(record["sha"])
+            for key in ["sha", "head", "base"]:
+                if record["type"] != "commit" and key in record:
+                    self.assertIn(record[key], written_shas)
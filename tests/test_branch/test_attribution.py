@@ -0,0 +1,61 @@
+from unittest import TestCase
+from gitaudit.branch.attribution import MergeAttributionIndex
+from gitaudit.branch.hierarchy import linear_log_to_hierarchy_log
+from gitaudit.git.change_log_entry import ChangeLogEntry
+
+
+EXAMPLE_C = [
+    "a[b f]",
+    "b[d c]",
+    "d[e]",
+    "c[d]",
+    "e[1]",
+    "1[]",
+    "f[2 4]",
+    "2[3]",
+    "3[1]",
+    "4[5]",
+    "5[3]",
+]
+
+
+def get_hier_log(data):
+    lin_log = list(map(
+        lambda x: ChangeLogEntry.from_head_log_text(x),
+        data,
+    ))
+    return linear_log_to_hierarchy_log(lin_log)
+
+
+class TestMergeAttributionIndex(TestCase):
+    def test_introducing_merge(self):
+        index = MergeAttributionIndex(get_hier_log(EXAMPLE_C))
+
+        self.assertEqual(len(index), 11)
+        self.assertEqual(index.introducing_merge('a').sha, 'a')
+        self.assertEqual(index.introducing_merge('d').sha, 'd')
+        self.assertEqual(index.introducing_merge('c').sha, 'b')
+        for sha in ['f', '2', '3', '4', '5']:
+            self.assertEqual(index.introducing_merge(sha).sha, 'a')
+
+        self.assertNotIn('9', index)
+
+    def test_enclosing_merge(self):
+        index = MergeAttributionIndex(get_hier_log(EXAMPLE_C))
+
+        self.assertIsNone(index.enclosing_merge('a'))
+        self.assertEqual(index.enclosing_merge('c').sha, 'b')
+        self.assertEqual(index.enclosing_merge('3').sha, 'a')
+        self.assertEqual(index.enclosing_merge('5').sha, 'f')
+
+    def test_merge_chain(self):
+        index = MergeAttributionIndex(get_hier_log(EXAMPLE_C))
+
+        self.assertListEqual(index.merge_chain('e'), [])
+        self.assertListEqual(
+            list(map(lambda x: x.sha, index.merge_chain('4'))),
+            ['f', 'a'],
+        )
+        self.assertEqual(index.depth('4'), 2)
+        self.assertEqual(index.depth('2'), 1)
+        self.assertEqual(index.depth('1'), 0)
@@ -1,6 +1,13 @@
-from unittest import TestCase
+import gc
+import os
+from io import StringIO
+from xml.etree import ElementTree
+from datetime import datetime, timedelta
+from time import perf_counter
+from unittest import TestCase, skipUnless
+from unittest.mock import patch, MagicMock
 from gitaudit.branch.tree import Tree
-from gitaudit.branch.plotting import TreePlot
+from gitaudit.branch.plotting import TreePlot, TextMetricsCache, Viewport
 from gitaudit.branch.hierarchy import linear_log_to_hierarchy_log
 from gitaudit.git.change_log_entry import ChangeLogEntry
 from tests.test_custom_assert import assert_equal_svg
@@ -366,3 +373,351 @@ class TestTreePlot(TestCase):
         )
 
         assert_equal_svg(plot)
+
+
+class TestTreePlotLevelOfDetail(TestCase):
+    EXAMPLE = [
+        "9[8](2022-01-09)",
+        "8[7](2022-01-08)",
+        "7[6](2022-01-07)",
+        "6[5](2022-01-06)",
+        "5[4](2022-01-05)",
+        "4[3](2022-01-04)",
+        "3[2](2022-01-03)",
+        "2[1](2022-01-02)",
+        "1[](2022-01-01)",
+    ]
+    EXAMPLE_BRANCH = [
+        "b[a](2022-01-05)",
+        "a[3](2022-01-04)",
+        "3[2](2022-01-03)",
+        "2[1](2022-01-02)",
+        "1[](2022-01-01)",
+    ]
+
+    def get_lanes(self, **kwargs):
+        tree = Tree()
+        tree.append_log(get_hier_log(self.EXAMPLE), 'main')
+        tree.append_log(get_hier_log(self.EXAMPLE_BRANCH), 'branch')
+
+        plot = TreePlot(tree, show_commit_callback=lambda _: True, **kwargs)
+        plot._create_lanes()
+
+        return {
+            lane.ref_name: [
+                [x.sha for x in item.collapsed_entries] if item.is_collapsed else item.id
+                for item in lane.items
+            ] for lane in plot.lanes
+        }
+
+    def test_disabled(self):
+        self.assertDictEqual(self.get_lanes(), {
+            'main': ['9', '8', '7', '6', '5', '4', '3', '2', '1'],
+            'branch': ['b', 'a'],
+        })
+
+    def test_collapse_runs(self):
+        self.assertDictEqual(self.get_lanes(collapse_min_count=3), {
+            'main': ['9', ['8', '7', '6', '5', '4'], '3', '2', '1'],
+            'branch': ['b', 'a'],
+        })
+
+    def test_collapse_commit_callback(self):
+        self.assertDictEqual(
+            self.get_lanes(
+                collapse_min_count=2,
+                collapse_commit_callback=lambda x: x.sha != '6',
+            ),
+            {
+                'main': ['9', ['8', '7'], '6', ['5', '4'], '3', ['2', '1']],
+                'branch': ['b', 'a'],
+            },
+        )
+
+
+class TestTreePlotViewport(TestCase):
+    def get_lanes(self, viewport):
+        tree = Tree()
+        tree.append_log(get_hier_log(NEW_EXAMPLE), 'main')
+        tree.append_log(get_hier_log(NEW_EXAMPLE_BRANCH), 'branch')
+        tree.append_log(get_hier_log(NEW_EXAMPLE_HOTFIX), 'hotfix')
+
+        plot = TreePlot(
+            tree,
+            show_commit_callback=lambda _: True,
+            viewport=viewport,
+        )
+        plot._create_lanes()
+
+        return plot, {
+            lane.ref_name: [
+                (x.entry.sha, x.continuation_count) if x.is_continuation else x.id
+                for x in lane.items
+            ] for lane in plot.lanes
+        }
+
+    def test_since(self):
+        plot, lanes = self.get_lanes(Viewport(since=datetime(2022, 1, 3)))
+
+        self.assertDictEqual(lanes, {
+            'main': ['d', 'c', ('b', 2)],
+            'branch': ['ab', 'f', 'e', ('b', 2)],
+            'hotfix': ['4'],
+        })
+        self.assertEqual(len(plot.connections), 1)
+        self.assertIn('b~main', plot.id_item_map)
+
+    def test_refs(self):
+        plot, lanes = self.get_lanes(Viewport(
+            since=datetime(2022, 1, 3, 12),
+            refs=['branch', 'hotfix'],
+        ))
+
+        self.assertDictEqual(lanes, {
+            'branch': ['ab', 'f', ('e', 4)],
+            'hotfix': ['4', ('e', 4)],
+        })
+        self.assertListEqual(plot.connections, [])
+
+    def test_empty(self):
+        for viewport in [Viewport(since=datetime(2023, 1, 1)), Viewport(refs=['unknown'])]:
+            plot, lanes = self.get_lanes(viewport)
+            self.assertDictEqual(lanes, {})
+
+            plot.layout()
+            stream = StringIO()
+            plot.write_svg(stream)
+
+            svg = ElementTree.fromstring(stream.getvalue())
+            self.assertEqual(svg.get('width'), '0')
+            self.assertListEqual(list(svg), [])
+
+
+class TestTreePlotStreaming(TestCase):
+    def test_write_svg(self):
+        tree = Tree()
+        tree.append_log(get_hier_log(NEW_EXAMPLE), 'main')
+        tree.append_log(get_hier_log(NEW_EXAMPLE_BRANCH), 'branch')
+        tree.append_log(get_hier_log(NEW_EXAMPLE_HOTFIX), 'hotfix')
+
+        plot = TreePlot(
+            tree,
+            active_refs=['main', 'branch', 'hotfix'],
+            show_commit_callback=lambda _: True,
+            ref_color_map={'main': '#bae1ff'},
+        )
+
+        stream = StringIO()
+        plot.write_svg(stream)
+
+        svg = ElementTree.fromstring(stream.getvalue())
+        namespace = '{http://www.w3.org/2000/svg}'
+
+        self.assertEqual(svg.tag, f'{namespace}svg')
+        self.assertEqual(
+            len(svg.findall(f'{namespace}circle')), len(plot.id_item_map))
+        self.assertListEqual(
+            [x.text for x in svg.findall(f'{namespace}text')][-3:],
+            ['main', 'branch', 'hotfix'],
+        )
+        self.assertIn('d (2022-01-04)', stream.getvalue())
+        self.assertEqual(
+            len(svg.findall(f'{namespace}path')),
+            len(plot.id_item_map) + len(plot.connections),
+        )
+
+    def test_callbacks_not_supported(self):
+        tree = Tree()
+        tree.append_log(get_hier_log(NEW_EXAMPLE), 'main')
+
+        plot = TreePlot(tree, sha_svg_append_callback=lambda _: [])
+
+        with self.assertRaises(AssertionError):
+            plot.write_svg(StringIO())
+
+
+class TestTreePlotUpdate(TestCase):
+    def assert_same_layout(self, plot, tree):
+        full_plot = TreePlot(tree, show_commit_callback=lambda _: True)
+        full_plot.layout()
+
+        self.assertListEqual(
+            [x.ref_name for x in plot.lanes],
+            [x.ref_name for x in full_plot.lanes],
+        )
+        self.assertSetEqual(
+            set(plot.id_item_map.keys()), set(full_plot.id_item_map.keys()))
+        for item_id, item in full_plot.id_item_map.items():
+            self.assertAlmostEqual(plot.id_item_map[item_id].ypos, item.ypos)
+
+    def get_plot(self):
+        tree = Tree()
+        tree.append_log(get_hier_log(NEW_EXAMPLE), 'main')
+        tree.append_log(get_hier_log(NEW_EXAMPLE_BRANCH), 'branch')
+
+        plot = TreePlot(tree, show_commit_callback=lambda _: True)
+        plot.layout()
+
+        return tree, plot
+
+    def test_extend_ref(self):
+        tree, plot = self.get_plot()
+        prev_ypos_map = {x: item.ypos for x, item in plot.id_item_map.items()}
+
+        plot.update({'main': get_hier_log([
+            "9f[d](2022-01-06)",
+            "d[c](2022-01-04)",
+            "c[b](2022-01-03)",
+            "b[a](2022-01-02)",
+            "a[](2022-01-01)",
+        ])})
+
+        self.assertIn('9f', plot.id_item_map)
+        # the previous layout is only shifted below the new commit
+        self.assertSetEqual(
+            {round(plot.id_item_map[x].ypos - ypos, 6) for x, ypos in prev_ypos_map.items()},
+            {round(plot.id_item_map['d'].ypos - prev_ypos_map['d'], 6)},
+        )
+        self.assert_same_layout(plot, tree)
+
+    def test_add_ref(self):
+        tree, plot = self.get_plot()
+
+        plot.update({'hotfix': get_hier_log(NEW_EXAMPLE_HOTFIX)})
+
+        self.assertListEqual(
+            [x.ref_name for x in plot.lanes], ['main', 'branch', 'hotfix'])
+        self.assert_same_layout(plot, tree)
+
+        stream = StringIO()
+        plot.write_svg(stream)
+        self.assertIn('4 (2022-01-04)', stream.getvalue())
+
+    def test_render_after_update(self):
+        tree, plot = self.get_plot()
+        plot.update({'hotfix': get_hier_log(NEW_EXAMPLE_HOTFIX)})
+        ypos_map = {x: item.ypos for x, item in plot.id_item_map.items()}
+
+        with patch.object(plot, '_create_lanes', wraps=plot._create_lanes) as create_lanes_mock, \
+                patch('gitaudit.branch.plotting.Svg._layout', create=True):
+            plot._layout(0, 0, 0, 0)
+
+        create_lanes_mock.assert_not_called()
+        self.assertListEqual(
+            [x.ref_name for x in plot.lanes], ['main', 'branch', 'hotfix'])
+        self.assertDictEqual(
+            {x: item.ypos for x, item in plot.id_item_map.items()}, ypos_map)
+        self.assert_same_layout(plot, tree)
+
+
+class TestTextMetricsCache(TestCase):
+    def test_content_class(self):
+        self.assertEqual(
+            TextMetricsCache.content_class('a1b2c3d (2022-01-04)', 'monospace'),
+            'wwwwwww (wwww-ww-ww)',
+        )
+        self.assertEqual(
+            TextMetricsCache.content_class('a1b2c3d', 'sans-serif'),
+            'a1b2c3d',
+        )
+
+    @patch('gitaudit.branch.plotting.create_label_svg')
+    def test_measured_once_per_shape(self, create_label_svg_mock):
+        text_mock = MagicMock(size=(10, 5))
+        label_mock = MagicMock(size=(20, 9))
+        create_label_svg_mock.return_value = (text_mock, label_mock)
+
+        cache = TextMetricsCache()
+
+        for label in ['a1b2c3d (2022-01-04)', 'ffffff0 (2021-12-31)']:
+            self.assertEqual(cache.label_sizes(label), ((10, 5), (20, 9)))
+
+        create_label_svg_mock.assert_called_once_with(
+            'a1b2c3d (2022-01-04)', 'monospace')
+
+        cache.label_sizes('12 commits')
+        cache.label_sizes('a1b2c3d (2022-01-04)', 'sans-serif')
+        self.assertEqual(create_label_svg_mock.call_count, 3)
+
+
+def get_large_tree(commit_count, branch_every=500, branch_length=10):
+    start_date = datetime(2022, 1, 1)
+    main_log = [
+        ChangeLogEntry(
+            sha=f"{index:x}0",
+            parent_shas=[f"{index-1:x}0"] if index else [],
+            commit_date=start_date + timedelta(minutes=10*index),
+        ) for index in range(commit_count - 1, -1, -1)
+    ]
+
+    ref_log_map = {'main': main_log}
+
+    for branch_index, index in enumerate(range(branch_every, commit_count, branch_every)):
+        branch_log = [
+            ChangeLogEntry(
+                sha=f"{index:05x}{offset:02x}1",
+                parent_shas=[f"{index:05x}{offset-1:02x}1" if offset else f"{index:x}0"],
+                commit_date=start_date + timedelta(minutes=10*index + offset + 1),
+            ) for offset in range(branch_length - 1, -1, -1)
+        ]
+        ref_log_map[f'branch_{branch_index}'] = \
+            branch_log + main_log[(commit_count - 1 - index):]
+
+    return Tree.from_logs(ref_log_map)
+
+
+class NoIndexList(list):
+    def index(self, *args, **kwargs):
+        raise AssertionError("linear search in lane items")
+
+
+class TestTreePlotScaling(TestCase):
+    def layout_seconds(self, commit_count, repeat=3):
+        tree = get_large_tree(commit_count)
+        durations = []
+
+        for _ in range(repeat):
+            plot = TreePlot(tree, show_commit_callback=lambda _: True)
+
+            # garbage collection runs grow with the number of live objects
+            gc.disable()
+            try:
+                start = perf_counter()
+                plot._create_lanes()
+                plot._calculate_positions()
+                plot._linear_position_correction()
+                durations.append(perf_counter() - start)
+            finally:
+                gc.enable()
+
+        self.assertEqual(len(plot.id_item_map), commit_count +
+                         (commit_count - 1) // 500 * 10)
+
+        return min(durations)
+
+    def test_sorted_once_without_lane_index_lookups(self):
+        tree = get_large_tree(2000)
+        plot = TreePlot(tree, show_commit_callback=lambda _: True)
+        plot._create_lanes()
+
+        for lane in plot.lanes:
+            lane.items = NoIndexList(lane.items)
+
+        with patch('gitaudit.branch.plotting.sorted', create=True, side_effect=sorted) \
+                as sorted_mock:
+            plot._calculate_positions()
+            plot._linear_position_correction()
+
+        item_count = len(plot.id_item_map)
+        self.assertEqual(item_count, 2000 + 3 * 10)
+        self.assertEqual(len([
+            x for x in sorted_mock.call_args_list if len(x[0][0]) == item_count
+        ]), 1)
+
+    @skipUnless(os.environ.get('GITAUDIT_BENCHMARK'), 'timing benchmark (set GITAUDIT_BENCHMARK=1)')
+    def test_near_linear_scaling(self):
+        small = self.layout_seconds(12500)
+        large = self.layout_seconds(50000)
+
+        # quadratic scaling would result in a factor of 16
+        self.assertLess(large / small, 10)
@@ -0,0 +1,147 @@
+from unittest import TestCase
+from gitaudit.branch.reachability import CommitGraph
+from gitaudit.git.change_log_entry import ChangeLogEntry
+
+
+# main dev
+#  |    |
+# ffc---|---\
+#  |    |    \
+# a39  f53    |
+#  | \  | \   |
+#  |  \ |  \  |
+#  |   \|   \ |
+# f07  b8b   a21
+#  |    | \   |
+#  |    | eae /
+#  |    | /  /
+# d05  a6c  /
+#  |   /   /
+#  |  /   /
+#  | /   /
+# cfd   /
+#  |   /
+#  |  /
+#  | /
+# cf7
+EXAMPLE = [
+    "ffc[a39 a21](2022-01-10)",
+    "f53[b8b a21](2022-01-09)",
+    "a39[f07 b8b](2022-01-08)",
+    "a21[cf7](2022-01-07)",
+    "b8b[a6c eae](2022-01-06)",
+    "eae[a6c](2022-01-05)",
+    "a6c[cfd](2022-01-04)",
+    "f07[d05](2022-01-04)",
+    "d05[cfd](2022-01-03)",
+    "cfd[cf7](2022-01-02)",
+    "cf7[](2022-01-01)",
+]
+
+
+def get_lin_log(data):
+    return list(map(lambda x: ChangeLogEntry.from_head_log_text(x), data))
+
+
+def brute_force_ancestors(lin_log, sha):
+    parent_map = {x.sha: x.parent_shas for x in lin_log}
+    ancestors = set()
+    queue = [sha]
+    while queue:
+        curr = queue.pop()
+        if curr in ancestors or curr not in parent_map:
+            continue
+        ancestors.add(curr)
+        queue.extend(parent_map[curr])
+    return ancestors
+
+
+class TestCommitGraph(TestCase):
+    def test_levels(self):
+        graph = CommitGraph(get_lin_log(EXAMPLE))
+
+        self.assertEqual(graph.level('cf7'), 1)
+        self.assertEqual(graph.level('cfd'), 2)
+        self.assertEqual(graph.level('a21'), 2)
+        self.assertEqual(graph.level('b8b'), 5)
+        self.assertEqual(graph.level('ffc'), 7)
+        self.assertGreater(graph.generation('ffc'), graph.generation('f53'))
+
+    def test_is_ancestor(self):
+        lin_log = get_lin_log(EXAMPLE)
+        graph = CommitGraph(lin_log)
+
+        for entry in lin_log:
+            ancestors = brute_force_ancestors(lin_log, entry.sha)
+            for other in lin_log:
+                self.assertEqual(
+                    graph.is_ancestor(other.sha, entry.sha),
+                    other.sha in ancestors,
+                    f"{other.sha} -> {entry.sha}",
+                )
+
+    def test_merge_base(self):
+        graph = CommitGraph(get_lin_log(EXAMPLE))
+
+        self.assertListEqual(
+            sorted(graph.merge_bases('ffc', 'f53')),
+            ['a21', 'b8b'],
+        )
+        self.assertEqual(graph.merge_base('f07', 'eae'), 'cfd')
+        self.assertEqual(graph.merge_base('a21', 'd05'), 'cf7')
+        self.assertEqual(graph.merge_base('ffc', 'a6c'), 'a6c')
+        self.assertEqual(graph.merge_base('a6c', 'ffc'), 'a6c')
+
+    def test_criss_cross_merge_bases(self):
+        graph = CommitGraph(get_lin_log([
+            "e[c d]",
+            "f[d c]",
+            "c[a]",
+            "d[b]",
+            "b[a]",
+            "a[]",
+        ]))
+
+        self.assertListEqual(
+            sorted(graph.merge_bases('e', 'f')),
+            ['c', 'd'],
+        )
+
+    def test_disconnected(self):
+        graph = CommitGraph(get_lin_log([
+            "b[a]",
+            "a[]",
+            "d[c]",
+            "c[]",
+        ]))
+
+        self.assertIsNone(graph.merge_base('b', 'd'))
+        self.assertFalse(graph.is_ancestor('a', 'd'))
+
+    def test_refs_containing(self):
+        graph = CommitGraph(get_lin_log(EXAMPLE), refs={
+            'main': 'ffc',
+            'dev': 'f53',
+        })
+
+        self.assertListEqual(graph.refs_containing('b8b'), ['main', 'dev'])
+        self.assertListEqual(graph.refs_containing('f07'), ['main'])
+        self.assertListEqual(graph.refs_containing('ffc'), ['main'])
+
+        graph.set_ref('release', 'a6c')
+        graph.set_ref('dev', 'a21')
+
+        self.assertListEqual(
+            graph.refs_containing('a6c'), ['main', 'release'])
+        self.assertListEqual(
+            graph.refs_containing('cf7'), ['main', 'dev', 'release'])
+        self.assertTrue(graph.ref_contains('dev', 'a21'))
+        self.assertFalse(graph.ref_contains('dev', 'b8b'))
+
+    def test_refs_from_entries(self):
+        lin_log = get_lin_log(EXAMPLE)
+        lin_log[0].refs = ['origin/main']
+
+        graph = CommitGraph(lin_log)
+
+        self.assertListEqual(graph.refs_containing('cf7'), ['origin/main'])
@@ -1,3 +1,4 @@
+from datetime import datetime
 from unittest import TestCase
 from gitaudit.branch.tree import Tree
 from gitaudit.branch.hierarchy import linear_log_to_hierarchy_log
@@ -278,3 +279,213 @@ class TestTree(TestCase):
             tree.root.children['3'].shas,
             ['4', '3'],
         )
+
+
+class TestTreeFromLogs(TestCase):
+    EXAMPLE = [
+        "d[c]",
+        "c[b]",
+        "b[a]",
+        "a[]",
+    ]
+    EXAMPLE_BRANCH = [
+        "f[e]",
+        "e[b]",
+        "b[a]",
+        "a[]",
+    ]
+    EXAMPLE_HOTFIX = [
+        "4[e]",
+        "e[b]",
+        "b[a]",
+        "a[]",
+    ]
+    EXAMPLE_BRANCH_EXTEND = [
+        "3[4]",
+        "4[f]",
+        "f[e]",
+        "e[b]",
+        "b[a]",
+        "a[]",
+    ]
+
+    def assert_same_as_append(self, ref_data_list):
+        tree = Tree()
+        for ref_name, data in ref_data_list:
+            tree.append_log(get_hier_log(data), ref_name)
+
+        batch_tree = Tree.from_logs({
+            ref_name: get_hier_log(data) for ref_name, data in ref_data_list
+        })
+
+        self.assertEqual(tree, batch_tree)
+        self.assertListEqual(
+            list(map(lambda x: (x.branch_name, x.shas), tree.flatten_segments())),
+            list(map(lambda x: (x.branch_name, x.shas),
+                 batch_tree.flatten_segments())),
+        )
+
+        return batch_tree
+
+    def test_empty(self):
+        self.assertIsNone(Tree.from_logs({}).root)
+
+    def test_across_branch_point(self):
+        tree = self.assert_same_as_append([
+            ('main', self.EXAMPLE),
+            ('branch', self.EXAMPLE_BRANCH),
+            ('hotfix', self.EXAMPLE_HOTFIX),
+        ])
+
+        self.assertEqual(tree.root.shas, ['b', 'a'])
+        self.assertEqual(tree.root.children['e'].shas, ['e'])
+        self.assertEqual(tree.root.children['e'].children['4'].shas, ['4'])
+
+    def test_extend_leaf(self):
+        tree = self.assert_same_as_append([
+            ('main', self.EXAMPLE[-2:]),
+            ('branch', self.EXAMPLE_BRANCH),
+            ('main_ext', self.EXAMPLE),
+            ('branch_ext', self.EXAMPLE_BRANCH_EXTEND),
+        ])
+
+        self.assertEqual(
+            tree.root.children['e'].shas,
+            ['3', '4', 'f', 'e'],
+        )
+        self.assertEqual(tree.root.children['e'].branch_name, 'branch_ext')
+
+    def test_contained_refs(self):
+        self.assert_same_as_append([
+            ('branch', self.EXAMPLE_BRANCH_EXTEND),
+            ('main', self.EXAMPLE),
+            ('old', self.EXAMPLE_BRANCH),
+            ('root', self.EXAMPLE[-1:]),
+        ])
+
+    def test_initial_sha_mismatch(self):
+        with self.assertRaises(AssertionError):
+            Tree.from_logs({
+                'main': get_hier_log(self.EXAMPLE),
+                'other': get_hier_log(["2[1]", "1[]"]),
+            })
+
+
+class TestTreeShaIndex(TestCase):
+    EXAMPLE = TestTreeFromLogs.EXAMPLE
+    EXAMPLE_BRANCH = TestTreeFromLogs.EXAMPLE_BRANCH
+    EXAMPLE_HOTFIX = [
+        "5[e]",
+        "e[b]",
+        "b[a]",
+        "a[]",
+    ]
+    EXAMPLE_BRANCH_EXTEND = TestTreeFromLogs.EXAMPLE_BRANCH_EXTEND
+
+    def assert_index_consistent(self, tree):
+        for segment in tree.flatten_segments():
+            for position, sha in enumerate(segment.shas):
+                self.assertIs(tree.segment_of(sha), segment)
+                self.assertEqual(tree.position_of(sha), position)
+
+    def test_maintained_on_append(self):
+        tree = Tree()
+        tree.append_log(get_hier_log(self.EXAMPLE), 'main')
+
+        self.assertIs(tree.segment_of('c'), tree.root)
+        self.assertEqual(tree.position_of('c'), 1)
+
+        tree.append_log(get_hier_log(self.EXAMPLE_BRANCH), 'branch')
+        self.assert_index_consistent(tree)
+        self.assertEqual(tree.position_of('c'), 1)
+        self.assertEqual(tree.position_of('b'), 0)
+
+        tree.append_log(get_hier_log(self.EXAMPLE_HOTFIX), 'hotfix')
+        tree.append_log(get_hier_log(self.EXAMPLE_BRANCH_EXTEND), 'branch_ext')
+        self.assert_index_consistent(tree)
+
+        self.assertListEqual(
+            list(map(lambda x: x.end_sha, tree.path_to_root('3'))),
+            ['3', 'e', 'b'],
+        )
+        self.assertListEqual(
+            list(map(lambda x: x.end_sha, tree.path_to_root('a'))),
+            ['b'],
+        )
+        self.assertNotIn('x', tree)
+
+    def test_from_logs(self):
+        tree = Tree.from_logs({
+            'main': get_hier_log(self.EXAMPLE),
+            'branch': get_hier_log(self.EXAMPLE_BRANCH),
+            'hotfix': get_hier_log(self.EXAMPLE_HOTFIX),
+        })
+        self.assert_index_consistent(tree)
+
+        tree.append_log(get_hier_log(self.EXAMPLE_BRANCH_EXTEND), 'branch_ext')
+        self.assert_index_consistent(tree)
+        self.assertListEqual(
+            list(map(lambda x: x.end_sha, tree.path_to_root('d'))),
+            ['d', 'b'],
+        )
+
+
+class TestTreeCompaction(TestCase):
+    EXAMPLE = [
+        "9[8](2023-01-09)",
+        "8[7](2023-01-08)",
+        "7[6](2023-01-07)",
+        "6[5](2023-01-06)",
+        "5[4](2023-01-05)",
+        "4[3](2023-01-04)",
+        "3[2](2023-01-03)",
+        "2[1](2023-01-02)",
+        "1[](2023-01-01)",
+    ]
+    EXAMPLE_BRANCH = [
+        "b[a](2023-01-06)",
+        "a[3](2023-01-05)",
+        "3[2](2023-01-03)",
+        "2[1](2023-01-02)",
+        "1[](2023-01-01)",
+    ]
+
+    def get_tree(self):
+        tree = Tree()
+        tree.append_log(get_hier_log(self.EXAMPLE), 'main')
+        tree.append_log(get_hier_log(self.EXAMPLE_BRANCH), 'branch')
+        return tree
+
+    def test_compact_by_count(self):
+        tree = self.get_tree()
+        tree.compact(max_count=3)
+
+        # nearest branch end of the root segment is b (2 commits away)
+        self.assertEqual(tree.root.shas, ['3', '1'])
+        self.assertEqual(tree.root.length, 3)
+        self.assertEqual(tree.root.start_sha, '1')
+        self.assertEqual(tree.root.end_sha, '3')
+        self.assertEqual(tree.root.children['4'].shas, ['9', '8', '7', '4'])
+        self.assertEqual(tree.root.children['4'].length, 6)
+        self.assertEqual(tree.root.children['a'].shas, ['b', 'a'])
+
+        self.assertEqual(tree.position_of('4'), 5)
+        self.assertIs(tree.segment_of('1'), tree.root)
+        self.assertNotIn('5', tree)
+
+        with self.assertRaises(AssertionError):
+            tree.append_log(get_hier_log(self.EXAMPLE), 'main')
+
+    def test_compact_by_date(self):
+        tree = self.get_tree()
+        tree.compact(before=datetime(2023, 1, 7))
+
+        self.assertEqual(tree.root.shas, ['3', '1'])
+        self.assertEqual(tree.root.children['4'].shas, ['9', '8', '7', '4'])
+        self.assertEqual(tree.root.children['a'].shas, ['b', 'a'])
+
+    def test_persisted(self):
+        tree = self.get_tree()
+        tree.compact(max_count=2)
+
+        self.assertEqual(Tree.parse_raw(tree.json()), tree)
@@ -0,0 +1,149 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+from gitaudit.branch.tree import Tree
+from gitaudit.branch.tree_diff import diff_trees, diff_tree_to_refs
+from gitaudit.branch.hierarchy import linear_log_to_hierarchy_log
+from gitaudit.git.change_log_entry import ChangeLogEntry
+
+
+def get_hier_log(data):
+    lin_log = list(map(
+        lambda x: ChangeLogEntry.from_head_log_text(x),
+        data,
+    ))
+    return linear_log_to_hierarchy_log(lin_log)
+
+
+def get_tree(ref_data_list):
+    tree = Tree()
+    for ref_name, data in ref_data_list:
+        tree.append_log(get_hier_log(data), ref_name)
+    return tree
+
+
+MAIN = [
+    "d[c]",
+    "c[b]",
+    "b[a]",
+    "a[]",
+]
+MAIN_EXTENDED = [
+    "f[e]",
+    "e[d]",
+] + MAIN
+BRANCH = [
+    "2[1]",
+    "1[b]",
+    "b[a]",
+    "a[]",
+]
+HOTFIX = [
+    "3[c]",
+    "c[b]",
+    "b[a]",
+    "a[]",
+]
+
+
+class TestDiffTrees(TestCase):
+    def test_same(self):
+        diff = diff_trees(
+            get_tree([('main', MAIN), ('branch', BRANCH)]),
+            get_tree([('main', MAIN), ('branch', BRANCH)]),
+        )
+        self.assertTrue(diff.is_empty)
+        self.assertListEqual(diff.changed_segments, [])
+
+    def test_added_and_extended(self):
+        new_tree = get_tree([('main', MAIN_EXTENDED), ('branch', BRANCH)])
+        diff = diff_trees(
+            get_tree([('main', MAIN)]),
+            new_tree,
+        )
+
+        self.assertListEqual(diff.removed, [])
+        self.assertListEqual(diff.merged, [])
+        # main was split at b by the new branch
+        self.assertEqual(len(diff.split), 1)
+        self.assertListEqual(diff.split[0].old.shas, ['d', 'c', 'b', 'a'])
+        self.assertListEqual(
+            list(map(lambda x: x.shas, diff.split[0].new)),
+            [['b', 'a'], ['f', 'e', 'd', 'c']],
+        )
+        self.assertListEqual(
+            list(map(lambda x: x.shas, diff.added)),
+            [['2', '1']],
+        )
+        self.assertEqual(len(diff.changed_segments), 3)
+
+    def test_extended(self):
+        diff = diff_trees(
+            get_tree([('main', MAIN), ('branch', BRANCH)]),
+            get_tree([('main', MAIN_EXTENDED), ('branch', BRANCH)]),
+        )
+
+        self.assertListEqual(diff.added, [])
+        self.assertListEqual(diff.split, [])
+        self.assertEqual(len(diff.extended), 1)
+        self.assertListEqual(diff.extended[0].old.shas, ['d', 'c'])
+        self.assertListEqual(diff.extended[0].new[0].shas, ['f', 'e', 'd', 'c'])
+
+    def test_force_pushed(self):
+        new_tree = get_tree([('main', ["f[e]", "e[a]", "a[]"])])
+        diff = diff_trees(get_tree([('main', ["c[b]", "b[a]", "a[]"])]), new_tree)
+
+        self.assertListEqual(diff.extended, [])
+        self.assertEqual(len(diff.split), 1)
+        self.assertListEqual(diff.split[0].old.shas, ['c', 'b', 'a'])
+        self.assertListEqual(diff.changed_segments, [new_tree.root])
+
+        # reset to an older commit
+        diff = diff_trees(
+            get_tree([('main', MAIN)]),
+            get_tree([('main', ["e[b]", "b[a]", "a[]"])]),
+        )
+        self.assertListEqual(diff.extended, [])
+        self.assertEqual(len(diff.split), 1)
+
+    def test_removed_and_merged(self):
+        old_tree = get_tree([('main', MAIN), ('branch', BRANCH), ('hotfix', HOTFIX)])
+        diff = diff_trees(old_tree, get_tree([('main', MAIN), ('hotfix', HOTFIX)]))
+
+        self.assertListEqual(
+            list(map(lambda x: x.shas, diff.removed)), [['2', '1']])
+        self.assertEqual(len(diff.merged), 1)
+        self.assertListEqual(diff.merged[0].old.shas, ['c'])
+        self.assertListEqual(diff.merged[0].new[0].shas, ['c', 'b', 'a'])
+        self.assertListEqual(diff.added, [])
+
+    def test_persisted_snapshot(self):
+        old_tree = Tree.parse_raw(get_tree([('main', MAIN)]).json())
+
+        git_mock = MagicMock()
+        git_mock.log_parentlog_refs.return_value = list(map(
+            lambda x: ChangeLogEntry.from_head_log_text(x), MAIN_EXTENDED))
+        git_mock.rev_parse_commits.return_value = {'main': 'f'}
+
+        new_tree, diff = diff_tree_to_refs(old_tree, git_mock, ['main'])
+
+        self.assertListEqual(new_tree.root.shas, ['f', 'e', 'd', 'c', 'b', 'a'])
+        self.assertEqual(len(diff.extended), 1)
+        self.assertIs(diff.extended[0].new[0], new_tree.root)
+
+    def test_compacted_snapshot(self):
+        old_tree = get_tree([('main', MAIN_EXTENDED)])
+        old_tree.compact(max_count=2)
+        self.assertEqual(old_tree.root.shas, ['f', 'e', 'a'])
+
+        diff = diff_trees(
+            old_tree,
+            get_tree([('main', MAIN_EXTENDED), ('hotfix', HOTFIX)]),
+        )
+
+        self.assertEqual(len(diff.split), 1)
+        self.assertListEqual(
+            list(map(lambda x: x.shas, diff.split[0].new)),
+            [['c', 'b', 'a'], ['f', 'e', 'd']],
+        )
+        self.assertListEqual(
+            list(map(lambda x: x.shas, diff.added)), [['3']])
@@ -1,5 +1,5 @@
 from unittest import TestCase
-from gitaudit.git.change_log_entry import ChangeLogEntry
+from gitaudit.git.change_log_entry import ChangeLogEntry, FileAdditionsDeletions
 import pytz
 from datetime import datetime
 
@@ -232,3 +232,36 @@ class TestChangeLogEntry(TestCase):
         self.assertEqual(entry.sha, 'a')
         self.assertListEqual(entry.parent_shas, ['b', 'c'])
         self.assertEqual(entry.commit_date, datetime(2023, 1, 1, 10))
+
+    def test_head_parent_log_with_decoration(self):
+        entry = ChangeLogEntry.from_head_log_text(
+            'a[b c](2023-01-01T10:00){HEAD -> main, origin/main, tag: 1.0.0}')
+        self.assertEqual(entry.sha, 'a')
+        self.assertListEqual(entry.parent_shas, ['b', 'c'])
+        self.assertEqual(entry.commit_date, datetime(2023, 1, 1, 10))
+        self.assertListEqual(entry.refs, ['main', 'origin/main'])
+        self.assertListEqual(entry.tags, ['1.0.0'])
+
+        entry = ChangeLogEntry.from_head_log_text('a[b](2023-01-01T10:00){}')
+        self.assertListEqual(entry.refs, [])
+        self.assertListEqual(entry.tags, [])
+
+    def test_numstat_digests(self):
+        entry = ChangeLogEntry.from_log_text(LOG_ENTRY_HEAD)
+        self.assertNotEqual(entry.get_numstat_sha1(True), entry.get_numstat_sha1(False))
+        self.assertNotIn('numstat_sha1', entry.dict())
+        self.assertNotIn('_numstat_digests', entry.dict())
+
+        other = ChangeLogEntry(sha='a', numstat=[FileAdditionsDeletions(
+            path='gitaudit/git/controller.py', additions=1, deletions=1)])
+        self.assertNotEqual(other.get_numstat_sha1(), entry.get_numstat_sha1())
+        self.assertEqual(other.get_numstat_sha1(False), entry.get_numstat_sha1(False))
+
+        other.numstat = entry.numstat
+        self.assertEqual(other.get_numstat_sha1(), entry.get_numstat_sha1())
+        self.assertEqual(
+            entry.copy_without_hierarchy().get_numstat_sha1(), entry.get_numstat_sha1())
+        self.assertEqual(
+            ChangeLogEntry(sha='b').get_numstat_sha1(),
+            'da39a3ee5e6b4b0d3255bfef95601890afd80709',
+        )
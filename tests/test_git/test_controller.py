@@ -234,6 +234,61 @@ class TestGit(TestCase):
             '--no-pager', 'log', '--pretty=%H[%P](%cI)', 'dummyref...main'
         )
 
+    def test_log_parentlog_refs(self):
+        self.append_process_return_text(
+            'd[b](2023-01-02){main}\nc[b](2023-01-02){tag: 1.0}\n'
+            'b[a](2023-01-01){}\na[](2023-01-01){}'
+        )
+        self.assertListEqual(
+            Git('', '').log_parentlog_refs(['main', '1.0']),
+            [
+                ChangeLogEntry(sha='d', parent_shas=['b'],
+                               commit_date=datetime(2023, 1, 2), refs=['main']),
+                ChangeLogEntry(sha='c', parent_shas=['b'],
+                               commit_date=datetime(2023, 1, 2), tags=['1.0']),
+                ChangeLogEntry(sha='b', parent_shas=['a'],
+                               commit_date=datetime(2023, 1, 1)),
+                ChangeLogEntry(sha='a', parent_shas=[],
+                               commit_date=datetime(2023, 1, 1)),
+            ],
+        )
+        self.assert_git_called_with_args(
+            '--no-pager', 'log', '--pretty=%H[%P](%cI){%D}', 'main', '1.0'
+        )
+
+    def test_log_parentlog_exclusive(self):
+        self.append_process_return_text(
+            '>c[b d]\n>b[a]\n-d[a]\n-a[]'
+        )
+        entries, boundary_entries = Git('', '').log_parentlog_exclusive(
+            end_ref='main', exclude_refs=['d'])
+
+        self.assertListEqual(
+            list(map(lambda x: x.sha, entries)), ['c', 'b'])
+        self.assertListEqual(
+            list(map(lambda x: x.sha, boundary_entries)), ['d', 'a'])
+        self.assert_git_called_with_args(
+            '--no-pager', 'log', '--pretty=%m%H[%P](%cI)', 'main',
+            '--boundary', '--not', 'd',
+        )
+
+    def test_merge_bases(self):
+        self.append_process_return_text('a\nb')
+        self.assertListEqual(Git('', '').merge_bases('main', 'dev'), ['a', 'b'])
+        self.assert_git_called_with_args('merge-base', '--all', 'main', 'dev')
+
+        self.append_process_return_text('')
+        self.assertListEqual(Git('', '').merge_bases('main', 'other'), [])
+
+    def test_rev_parse_commits(self):
+        self.append_process_return_text(output='d\nc')
+        self.assertDictEqual(
+            Git('', '').rev_parse_commits(['main', '1.0']),
+            {'main': 'd', '1.0': 'c'},
+        )
+        self.assert_git_called_with_args(
+            'rev-parse', 'main^{commit}', '1.0^{commit}')
+
     def test_log_changelog(self):
         self.append_process_return_text(
             "#CS#\n"+LOG_ENTRY_HEAD+"\n#CS#\n"+LOG_ENTRY_NO_PARENT
@@ -255,6 +310,28 @@ class TestGit(TestCase):
             ), '--submodule=diff', 'main', "-m", "--numstat"
         )
 
+    def test_log_changelog_entries(self):
+        self.append_process_return_text(
+            "#CS#\n"+LOG_ENTRY_HEAD+"\n#CS#\n"+LOG_ENTRY_NO_PARENT
+        )
+        changelog = Git('', '').log_changelog_entries(
+            shas=['b74', '8d0'], numstat=False)
+
+        self.assertListEqual(
+            list(map(lambda x: x.sha, changelog)),
+            [
+                "b74c293300e1afcec19c44369fc9cdc2236b2ee4",
+                "8d0be78827d398c01bc8288d7a381f5402fb1931",
+            ],
+        )
+        self.assert_git_called_with_args(
+            '--no-pager', 'log', (
+                r"--pretty=#CS#%n"
+                r"H:[%H]%nP:[%P]%nT:[%D]%nS:[%s]%nD:[%cI]%nA:[%an]%nM:[%ae]%n"
+                r"#SB#%n%b%n#EB#%n"
+            ), '--submodule=diff', 'b74', "--no-walk=unsorted", "8d0"
+        )
+
     def test_show(self):
         self.append_process_return_text(
             '27686336213'
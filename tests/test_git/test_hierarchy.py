@@ -2,11 +2,30 @@ from unittest import TestCase
 from unittest.mock import MagicMock
 from gitaudit.branch.hierarchy import \
     linear_log_to_hierarchy_log, \
+    extend_hierarchy_log, \
     hierarchy_log_to_linear_log, \
+    iter_hierarchy_log, \
+    linear_log_to_ref_hierarchy_logs, \
+    get_ref_hierarchy_logs, \
     changelog_hydration
 from gitaudit.git.change_log_entry import ChangeLogEntry
 
 
+def get_deep_merge_lin_log(depth):
+    """Synthetic history where every merge brings in another merge
+    (m0 <- m1 <- ... <- m<depth-1>) all branched off the root commit
+    """
+    lin_log = []
+    for index in range(depth):
+        merged_sha = f"m{index+1}" if index < depth - 1 else "root"
+        lin_log.append(ChangeLogEntry(
+            sha=f"m{index}", parent_shas=[f"b{index}", merged_sha]))
+        lin_log.append(ChangeLogEntry(
+            sha=f"b{index}", parent_shas=["root"]))
+    lin_log.append(ChangeLogEntry(sha="root", parent_shas=[]))
+    return lin_log
+
+
 class TestLinearLogToHierarchyLog(TestCase):
     def test_example_a(self):
         EXAMPLE_A = [
@@ -151,6 +170,100 @@ class TestLinearLogToHierarchyLog(TestCase):
 
         self.assertEqual([_2b2, _c9c, _63b], hier_log)
 
+    def test_deep_nested_merges(self):
+        depth = 5000
+        hier_log = linear_log_to_hierarchy_log(get_deep_merge_lin_log(depth))
+
+        self.assertListEqual(
+            ['m0', 'b0', 'root'],
+            list(map(lambda x: x.sha, hier_log)),
+        )
+
+        level = 0
+        merge_line = hier_log
+        while merge_line[0].other_parents:
+            self.assertEqual(merge_line[0].sha, f"m{level}")
+            merge_line = merge_line[0].other_parents[0]
+            level += 1
+            self.assertListEqual(
+                [f"m{level}", f"b{level}"],
+                list(map(lambda x: x.sha, merge_line)),
+            )
+            self.assertListEqual(
+                ['root'],
+                list(map(lambda x: x.sha, merge_line[-1].branch_offs)),
+            )
+
+        self.assertEqual(level, depth - 1)
+
+
+class TestExtendHierarchyLog(TestCase):
+    EXAMPLE_C = [
+        "a[b f]",
+        "b[d c]",
+        "d[e]",
+        "c[d]",
+        "e[1]",
+        "1[]",
+        "f[2 4]",
+        "2[3]",
+        "3[1]",
+        "4[5]",
+        "5[3]",
+    ]
+    EXAMPLE_C_ADVANCED = [
+        "ab[aa bc]",
+        "bc[bd be]",
+        "be[2]",
+        "bd[b]",
+        "aa[a]",
+    ]
+
+    def get_lin_log(self, data):
+        return list(map(lambda x: ChangeLogEntry.from_head_log_text(x), data))
+
+    def test_extend_matches_full_rebuild(self):
+        hier_log = linear_log_to_hierarchy_log(
+            self.get_lin_log(self.EXAMPLE_C))
+        full_hier_log = linear_log_to_hierarchy_log(self.get_lin_log(
+            self.EXAMPLE_C_ADVANCED + self.EXAMPLE_C))
+
+        ext_hier_log = extend_hierarchy_log(
+            hier_log,
+            self.get_lin_log(self.EXAMPLE_C_ADVANCED),
+        )
+
+        self.assertEqual(full_hier_log, ext_hier_log)
+        self.assertListEqual(
+            ['ab', 'aa', 'a', 'b', 'd', 'e', '1'],
+            list(map(lambda x: x.sha, ext_hier_log)),
+        )
+        for old_entry, ext_entry in zip(hier_log, ext_hier_log[2:]):
+            self.assertIs(old_entry, ext_entry)
+
+        bc_entry, bd_entry = ext_hier_log[0].other_parents[0]
+        be_entry = bc_entry.other_parents[0][0]
+        self.assertListEqual(['b'], [x.sha for x in bd_entry.branch_offs])
+        self.assertListEqual(['2'], [x.sha for x in be_entry.branch_offs])
+
+    def test_extend_empty(self):
+        hier_log = linear_log_to_hierarchy_log(
+            self.get_lin_log(self.EXAMPLE_C))
+
+        self.assertListEqual(hier_log, extend_hierarchy_log(hier_log, []))
+        self.assertListEqual(
+            ['aa', 'a'],
+            list(map(lambda x: x.sha, extend_hierarchy_log(
+                [], self.get_lin_log(["aa[a]", "a[]"])))),
+        )
+
+    def test_extend_not_continuing(self):
+        hier_log = linear_log_to_hierarchy_log(
+            self.get_lin_log(self.EXAMPLE_C))
+
+        with self.assertRaises(AssertionError):
+            extend_hierarchy_log(hier_log, self.get_lin_log(["aa[b]"]))
+
 
 class TestHierarchyLogToLinearLog(TestCase):
     def test_multi_merge(self):
@@ -228,6 +341,188 @@ class TestHierarchyLogToLinearLog(TestCase):
         )
 
 
+class TestRefHierarchyLogs(TestCase):
+    # main     release  feature
+    #  |         |        |
+    # 6a1------- | ------ 5f4
+    #  |         |        |
+    # 4d2------ 3c7       |
+    #  |  \      |        |
+    #  |   \---- 2b9 ---- 1e8
+    #  |         |
+    # 0a0 ----- 0a0
+    UNION_LOG = [
+        "6a1[4d2 5f4]",
+        "5f4[1e8]",
+        "4d2[0a0 2b9]",
+        "3c7[2b9]",
+        "2b9[0a0 1e8]",
+        "1e8[0a0]",
+        "0a0[]",
+    ]
+    REF_SHA_MAP = {
+        'main': '6a1',
+        'release': '3c7',
+        'feature': '5f4',
+    }
+
+    def get_ref_lin_log(self, tip_sha, union_log=None):
+        union_log = union_log if union_log else self.UNION_LOG
+        lin_log_map = {
+            x.sha: x for x in map(
+                lambda x: ChangeLogEntry.from_head_log_text(x), union_log)
+        }
+        shas = set()
+        queue = [tip_sha]
+        while queue:
+            sha = queue.pop()
+            if sha not in shas:
+                shas.add(sha)
+                queue.extend(lin_log_map[sha].parent_shas)
+        return [lin_log_map[x.split('[')[0]] for x in union_log if x.split('[')[0] in shas]
+
+    def test_same_as_single_ref(self):
+        lin_log = list(
+            map(lambda x: ChangeLogEntry.from_head_log_text(x), self.UNION_LOG))
+        ref_hier_logs = linear_log_to_ref_hierarchy_logs(
+            lin_log, self.REF_SHA_MAP)
+
+        for ref_name, sha in self.REF_SHA_MAP.items():
+            self.assertListEqual(
+                linear_log_to_hierarchy_log(self.get_ref_lin_log(sha)),
+                list(ref_hier_logs[ref_name]),
+            )
+
+        self.assertListEqual(
+            ['6a1', '4d2', '0a0'],
+            list(map(lambda x: x.sha, ref_hier_logs['main'])),
+        )
+        self.assertListEqual(
+            ['3c7', '2b9', '0a0'],
+            list(map(lambda x: x.sha, ref_hier_logs['release'])),
+        )
+        self.assertEqual(ref_hier_logs['release'][-1].sha, '0a0')
+        self.assertListEqual(
+            ['2b9', '0a0'],
+            list(map(lambda x: x.sha, ref_hier_logs['release'][1:])),
+        )
+        self.assertIs(ref_hier_logs['main'][-1], ref_hier_logs['release'][-1])
+
+        # 1e8 is merged into release and feature in different contexts
+        self.assertListEqual(
+            ['1e8'],
+            list(map(lambda x: x.sha, ref_hier_logs['feature'][1:2])),
+        )
+        self.assertListEqual(
+            ['1e8'],
+            [x[0].sha for x in ref_hier_logs['release'][1].other_parents],
+        )
+
+    def test_multiple_roots(self):
+        # main merges the unrelated history of other
+        union_logs = [
+            ["c[a b]", "b[]", "a[]"],
+            ["c[a b]", "a[]", "b[]"],
+            ["e[c d]", "d[b]", "c[a b]", "b[]", "a[]"],
+        ]
+        ref_sha_maps = [
+            {'main': 'c', 'other': 'b'},
+            {'other': 'b', 'main': 'c'},
+            {'other': 'd', 'main': 'e', 'old': 'c'},
+        ]
+
+        for union_log in union_logs:
+            for ref_sha_map in ref_sha_maps:
+                if not set(ref_sha_map.values()).issubset(
+                        map(lambda x: x.split('[')[0], union_log)):
+                    continue
+
+                ref_hier_logs = linear_log_to_ref_hierarchy_logs(
+                    list(map(
+                        lambda x: ChangeLogEntry.from_head_log_text(x), union_log)),
+                    ref_sha_map,
+                )
+
+                for ref_name, sha in ref_sha_map.items():
+                    self.assertListEqual(
+                        linear_log_to_hierarchy_log(
+                            self.get_ref_lin_log(sha, union_log)),
+                        list(ref_hier_logs[ref_name]),
+                        f"{union_log} {ref_name}",
+                    )
+
+    def test_get_ref_hierarchy_logs(self):
+        git_mock = MagicMock()
+        git_mock.log_parentlog_refs.return_value = list(
+            map(lambda x: ChangeLogEntry.from_head_log_text(x), self.UNION_LOG))
+        git_mock.rev_parse_commits.return_value = self.REF_SHA_MAP
+
+        ref_hier_logs = get_ref_hierarchy_logs(
+            git_mock, ['main', 'release', 'feature'])
+
+        git_mock.log_parentlog_refs.assert_called_once_with(
+            ['main', 'release', 'feature'])
+        self.assertListEqual(
+            ['5f4', '1e8', '0a0'],
+            list(map(lambda x: x.sha, ref_hier_logs['feature'])),
+        )
+
+
+class TestIterHierarchyLog(TestCase):
+    def test_same_order_as_linear_log(self):
+        EXAMPLE_C = [
+            "a[b f]",
+            "b[d c]",
+            "d[e]",
+            "c[d]",
+            "e[1]",
+            "1[]",
+            "f[2 4]",
+            "2[3]",
+            "3[1]",
+            "4[5]",
+            "5[3]",
+        ]
+
+        lin_log = list(
+            map(lambda x: ChangeLogEntry.from_head_log_text(x), EXAMPLE_C))
+        hier_log = linear_log_to_hierarchy_log(lin_log)
+
+        self.assertListEqual(
+            list(iter_hierarchy_log(hier_log)),
+            hierarchy_log_to_linear_log(hier_log),
+        )
+
+    def test_hierarchy_hidden(self):
+        EXAMPLE_B = [
+            "d[b c]",
+            "c[a]",
+            "b[a]",
+            "a[]",
+        ]
+
+        lin_log = list(
+            map(lambda x: ChangeLogEntry.from_head_log_text(x), EXAMPLE_B))
+        hier_log = linear_log_to_hierarchy_log(lin_log)
+
+        d_view, c_view, _, _ = iter_hierarchy_log(hier_log)
+
+        self.assertEqual(d_view.sha, 'd')
+        self.assertListEqual(d_view.parent_shas, ['b', 'c'])
+        self.assertListEqual(d_view.other_parents, [])
+        self.assertListEqual(c_view.branch_offs, [])
+        self.assertIs(d_view.entry, hier_log[0])
+        self.assertEqual(len(hier_log[0].other_parents), 1)
+        self.assertEqual(c_view, c_view.copy_without_hierarchy())
+
+    def test_deep_nested_merges(self):
+        depth = 5000
+        hier_log = linear_log_to_hierarchy_log(get_deep_merge_lin_log(depth))
+
+        self.assertEqual(len(list(iter_hierarchy_log(hier_log))), 2*depth+1)
+        self.assertEqual(len(hierarchy_log_to_linear_log(hier_log)), 2*depth+1)
+
+
 class TestChangeLogHydration(TestCase):
     def test_changelog_hydration(self):
         EXAMPLE_B = [
@@ -273,3 +568,29 @@ class TestChangeLogHydration(TestCase):
         )
         self.assertEqual(hier_log[1].subject, 'B Commit')
         self.assertEqual(hier_log[2].subject, 'A Commit')
+
+    def test_deep_nested_merges(self):
+        depth = 5000
+        lin_log = get_deep_merge_lin_log(depth)
+        hier_log = linear_log_to_hierarchy_log(lin_log)
+
+        git_mock = MagicMock()
+        git_mock.log_changelog.return_value = list(map(
+            lambda x: ChangeLogEntry(
+                sha=x.sha,
+                parent_shas=x.parent_shas,
+                subject=f"{x.sha} Commit",
+            ),
+            lin_log,
+        ))
+
+        hier_log = changelog_hydration(hier_log, git_mock)
+
+        level = 0
+        merge_line = hier_log
+        while merge_line[0].other_parents:
+            self.assertEqual(merge_line[0].subject, f"m{level} Commit")
+            merge_line = merge_line[0].other_parents[0]
+            level += 1
+        self.assertEqual(level, depth - 1)
+        self.assertEqual(merge_line[1].subject, f"b{level} Commit")